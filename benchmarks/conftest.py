@@ -0,0 +1,27 @@
+import asyncio
+import os
+import sys
+from typing import Iterator
+
+import pytest
+
+# Make the custom component importable when the suite is run from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+# Account counts every scaling benchmark is run with
+ACCOUNT_COUNTS = [1, 10, 100, 500]
+
+
+@pytest.fixture
+def private_loop(socket_enabled: None) -> Iterator[asyncio.AbstractEventLoop]:
+    """
+    Provide an event loop for the benchmarks that run without Home Assistant.
+
+    Sockets are enabled so the client can reach the local stub server.
+    """
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
@@ -0,0 +1,280 @@
+import asyncio
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# Endpoint names used for call counting and error injection
+TOKEN_NEW = "token_new"
+TOKEN_REFRESH = "token_refresh"
+REQUISITION = "requisition"
+AGREEMENT = "agreement"
+DETAILS = "details"
+BALANCES = "balances"
+TRANSACTIONS = "transactions"
+
+_ERROR_BODIES: Dict[int, Dict[str, Any]] = {
+    401: {"summary": "Invalid token", "detail": "Token is invalid or expired"},
+    409: {"summary": "Account is processing", "detail": "Account is being processed, try again later."},
+    428: {
+        "summary": "End User Agreement (EUA) expired",
+        "detail": "Access to accounts has expired as set in End User Agreement.",
+    },
+    429: {
+        "summary": "Rate limit exceeded",
+        "detail": "Request was throttled. Expected available in 3600 seconds.",
+    },
+}
+
+# Rate-limit headers sent with 429 responses: the account budget is used up for an hour
+_RATE_LIMITED_HEADERS: Dict[str, str] = {
+    "HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_LIMIT": "4",
+    "HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_REMAINING": "0",
+    "HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_RESET": "3600",
+}
+
+
+class GoCardlessStub:
+    """
+    Local stand-in for the GoCardless Bank Account Data API.
+
+    Serves the token, requisition, agreement, account details, balances and transactions
+    endpoints for a configurable number of requisitions and accounts. Every agreement was
+    accepted 30 days ago and is valid for 90 days. Every call is counted per endpoint, a fixed
+    latency can be added to every response, the balances of single accounts can be stalled, and
+    error responses can be queued per endpoint.
+    """
+
+    def __init__(
+            self,
+            accounts: int = 1,
+            requisitions: int = 1,
+            latency: float = 0.0,
+            transactions: int = 50,
+    ) -> None:
+        """
+        Initialize the stub.
+
+        Args:
+            accounts (int): Number of accounts linked to every requisition.
+            requisitions (int): Number of requisitions, named "req0", "req1", ...
+            latency (float): Seconds added to every response.
+            transactions (int): Number of booked transactions returned per account.
+        """
+        self.accounts: int = accounts
+        self.requisitions: int = requisitions
+        self.latency: float = latency
+        self.transactions: int = transactions
+        self.calls: Counter = Counter()
+        self._errors: Dict[Optional[str], List[int]] = {}
+        self._stalled: Dict[str, float] = {}
+        self._server: Optional[TestServer] = None
+
+    @property
+    def requisition_ids(self) -> List[str]:
+        """
+        Get the IDs of the served requisitions.
+        """
+        return [f"req{index}" for index in range(self.requisitions)]
+
+    @property
+    def url(self) -> str:
+        """
+        Get the base URL to pass to the API client.
+        """
+        return str(self._server.make_url("/api/v2"))
+
+    def account_ids(self, requisition_id: str) -> List[str]:
+        """
+        Get the IDs of the accounts linked to a requisition.
+
+        Args:
+            requisition_id (str): The requisition ID.
+
+        Returns:
+            List[str]: The account IDs.
+        """
+        return [f"{requisition_id}-acc{index}" for index in range(self.accounts)]
+
+    def inject(self, status: int, endpoint: Optional[str] = None, times: int = 1) -> None:
+        """
+        Queue error responses.
+
+        Args:
+            status (int): The HTTP status to return, e.g. 401, 409, 428 or 429.
+            endpoint (Optional[str]): The endpoint name that fails; any endpoint when omitted.
+            times (int): Number of consecutive calls that fail.
+        """
+        self._errors.setdefault(endpoint, []).extend([status] * times)
+
+    def stall(self, account_id: str, seconds: float) -> None:
+        """
+        Delay the balances of one account, as a bank that stops answering would.
+
+        Args:
+            account_id (str): The account ID.
+            seconds (float): Seconds added to its balances responses.
+        """
+        self._stalled[account_id] = seconds
+
+    def reset(self) -> None:
+        """
+        Clear the call counters, any queued errors and stalled accounts.
+        """
+        self.calls.clear()
+        self._errors.clear()
+        self._stalled.clear()
+
+    async def start(self) -> None:
+        """
+        Start serving on a free local port.
+        """
+        app = web.Application()
+        app.router.add_post("/api/v2/token/new/", self._token_new)
+        app.router.add_post("/api/v2/token/refresh/", self._token_refresh)
+        app.router.add_get("/api/v2/requisitions/{id}/", self._requisition)
+        app.router.add_get("/api/v2/agreements/enduser/{id}/", self._agreement)
+        app.router.add_get("/api/v2/accounts/{id}/details/", self._details)
+        app.router.add_get("/api/v2/accounts/{id}/balances/", self._balances)
+        app.router.add_get("/api/v2/accounts/{id}/transactions/", self._transactions)
+        self._server = TestServer(app)
+        await self._server.start_server()
+
+    async def close(self) -> None:
+        """
+        Stop serving.
+        """
+        if self._server is not None:
+            await self._server.close()
+            self._server = None
+
+    async def _respond(self, endpoint: str, body: Dict[str, Any]) -> web.Response:
+        """
+        Count a call and return its response, or a queued error.
+
+        Args:
+            endpoint (str): The endpoint name.
+            body (Dict[str, Any]): The response body when no error is queued.
+
+        Returns:
+            web.Response: The JSON response.
+        """
+        self.calls[endpoint] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        for key in (endpoint, None):
+            queued = self._errors.get(key)
+            if queued:
+                status = queued.pop(0)
+                error = {**_ERROR_BODIES.get(status, {"summary": "Error", "detail": "Error"}), "status_code": status}
+                headers = _RATE_LIMITED_HEADERS if status == 429 else None
+                return web.json_response(error, status=status, headers=headers)
+
+        return web.json_response(body)
+
+    async def _token_new(self, request: web.Request) -> web.Response:
+        """
+        Serve a new access and refresh token pair.
+        """
+        return await self._respond(
+            TOKEN_NEW,
+            {"access": "access", "access_expires": 86400, "refresh": "refresh", "refresh_expires": 2592000},
+        )
+
+    async def _token_refresh(self, request: web.Request) -> web.Response:
+        """
+        Serve a new access token for a refresh token.
+        """
+        return await self._respond(TOKEN_REFRESH, {"access": "access", "access_expires": 86400})
+
+    async def _requisition(self, request: web.Request) -> web.Response:
+        """
+        Serve a linked requisition with its accounts.
+        """
+        requisition_id = request.match_info["id"]
+        return await self._respond(
+            REQUISITION,
+            {
+                "id": requisition_id,
+                "status": "LN",
+                "institution_id": "SANDBOXFINANCE_SFIN0000",
+                "reference": requisition_id,
+                "agreement": f"{requisition_id}-agreement",
+                "accounts": self.account_ids(requisition_id),
+            },
+        )
+
+    async def _agreement(self, request: web.Request) -> web.Response:
+        """
+        Serve an end user agreement.
+        """
+        accepted = datetime.now(timezone.utc) - timedelta(days=30)
+        return await self._respond(
+            AGREEMENT,
+            {
+                "id": request.match_info["id"],
+                "created": accepted.isoformat(),
+                "accepted": accepted.isoformat(),
+                "access_valid_for_days": 90,
+                "institution_id": "SANDBOXFINANCE_SFIN0000",
+            },
+        )
+
+    async def _details(self, request: web.Request) -> web.Response:
+        """
+        Serve the details of an account.
+        """
+        account_id = request.match_info["id"]
+        return await self._respond(
+            DETAILS,
+            {"account": {"name": f"Account {account_id}", "status": "enabled", "currency": "EUR"}},
+        )
+
+    async def _balances(self, request: web.Request) -> web.Response:
+        """
+        Serve the balances of an account.
+        """
+        stalled = self._stalled.get(request.match_info["id"])
+        if stalled:
+            await asyncio.sleep(stalled)
+        today = date.today().isoformat()
+        return await self._respond(
+            BALANCES,
+            {
+                "balances": [
+                    {
+                        "balanceAmount": {"amount": "1913.12", "currency": "EUR"},
+                        "balanceType": "closingBooked",
+                        "referenceDate": today,
+                    },
+                    {
+                        "balanceAmount": {"amount": "1900.00", "currency": "EUR"},
+                        "balanceType": "interimAvailable",
+                        "referenceDate": today,
+                    },
+                ]
+            },
+        )
+
+    async def _transactions(self, request: web.Request) -> web.Response:
+        """
+        Serve the booked transactions of an account, filtered by date_from.
+        """
+        account_id = request.match_info["id"]
+        today = date.today()
+        booked = [
+            {
+                "transactionId": f"{account_id}-t{index}",
+                "bookingDate": (today - timedelta(days=index)).isoformat(),
+                "transactionAmount": {"amount": f"-{index % 97}.50", "currency": "EUR"},
+                "remittanceInformationUnstructured": f"Payment {index}",
+            }
+            for index in range(self.transactions)
+        ]
+        date_from = request.query.get("date_from")
+        if date_from:
+            booked = [transaction for transaction in booked if transaction["bookingDate"] >= date_from]
+        return await self._respond(TRANSACTIONS, {"transactions": {"booked": booked, "pending": []}})
@@ -0,0 +1,234 @@
+from functools import partial
+from typing import Callable, Iterator
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.nordigen_account.const import BREAKER_FAILURE_THRESHOLD, DOMAIN, STORAGE_KEY_SNAPSHOT
+from custom_components.nordigen_account.coordinator import NordigenDataUpdateCoordinator
+from custom_components.nordigen_account.nordigen_wrapper import NordigenWrapper
+from custom_components.nordigen_account.quota import QuotaLedger
+
+from conftest import ACCOUNT_COUNTS
+from stub_server import BALANCES, REQUISITION, GoCardlessStub
+
+# Repeated benchmark rounds must not run out of the daily call budget
+UNLIMITED_QUOTA = 10 ** 9
+
+# One total per currency, per institution and per balance type served by the stub
+TOTAL_SENSORS = 4
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> Iterator[None]:
+    """
+    Allow Home Assistant to load the integration from custom_components.
+    """
+    yield
+
+
+@pytest.fixture
+def run(hass: HomeAssistant, socket_enabled: None) -> Callable:
+    """
+    Provide a helper that runs a coroutine on the Home Assistant loop and waits for its side effects.
+    """
+    def _run(coro):
+        result = hass.loop.run_until_complete(coro)
+        hass.loop.run_until_complete(hass.async_block_till_done())
+        return result
+
+    return _run
+
+
+@pytest.fixture
+def stub(run: Callable) -> Iterator[GoCardlessStub]:
+    """
+    Serve a stub API; tests set the number of accounts before setting up the entry.
+    """
+    stub = GoCardlessStub()
+    run(stub.start())
+    yield stub
+    run(stub.close())
+
+
+@pytest.fixture
+def setup_entry(hass: HomeAssistant, stub: GoCardlessStub, run: Callable) -> Callable:
+    """
+    Provide a helper that sets up a config entry for every requisition served by the stub.
+    """
+    patches = [
+        patch(
+            "custom_components.nordigen_account.coordinator.NordigenWrapper",
+            partial(NordigenWrapper, base_url=stub.url),
+        ),
+        patch(
+            "custom_components.nordigen_account.coordinator.QuotaLedger",
+            partial(QuotaLedger, daily_limit=UNLIMITED_QUOTA),
+        ),
+    ]
+    for active in patches:
+        active.start()
+
+    def _setup() -> MockConfigEntry:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={"secret_id": "secret_id", "secret_key": "secret_key", "requisition_ids": stub.requisition_ids},
+        )
+        entry.add_to_hass(hass)
+        assert run(hass.config_entries.async_setup(entry.entry_id))
+        return entry
+
+    yield _setup
+    for active in patches:
+        active.stop()
+
+
+def _coordinator(hass: HomeAssistant, entry: MockConfigEntry) -> NordigenDataUpdateCoordinator:
+    return hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+
+@pytest.mark.parametrize("accounts", ACCOUNT_COUNTS)
+def test_entity_setup(benchmark, hass, stub, setup_entry, accounts):
+    """Time to set up an entry, from the first refresh to all sensors being added."""
+    stub.accounts = accounts
+
+    entry = benchmark.pedantic(setup_entry, rounds=1, iterations=1)
+
+    benchmark.extra_info["api_calls"] = sum(stub.calls.values())
+    assert len(hass.states.async_entity_ids("sensor")) == 2 * accounts + TOTAL_SENSORS
+    assert _coordinator(hass, entry).last_update_success
+
+
+@pytest.mark.parametrize("accounts", ACCOUNT_COUNTS)
+def test_coordinator_refresh(benchmark, hass, stub, setup_entry, run, accounts):
+    """Latency of a full refresh cycle, including the sensor listeners."""
+    stub.accounts = accounts
+    coordinator = _coordinator(hass, setup_entry())
+
+    stub.reset()
+    benchmark(lambda: run(coordinator.async_refresh()))
+    assert coordinator.last_update_success
+
+    stub.reset()
+    run(coordinator.async_refresh())
+    benchmark.extra_info["api_calls_per_cycle"] = sum(stub.calls.values())
+    assert stub.calls == {BALANCES: accounts}
+
+
+@pytest.mark.parametrize("accounts", ACCOUNT_COUNTS)
+def test_listener_dispatch(benchmark, hass, stub, setup_entry, accounts):
+    """Cost of notifying the sensor platform and every sensor of new coordinator data."""
+    stub.accounts = accounts
+    coordinator = _coordinator(hass, setup_entry())
+
+    benchmark(coordinator.async_update_listeners)
+    assert len(hass.states.async_entity_ids("sensor")) == 2 * accounts + TOTAL_SENSORS
+
+
+def test_refresh_recovers_from_401(benchmark, hass, stub, setup_entry, run):
+    """A rejected access token is refreshed and the cycle is retried once."""
+    stub.accounts = 10
+    coordinator = _coordinator(hass, setup_entry())
+
+    def inject():
+        stub.reset()
+        stub.inject(401, BALANCES)
+
+    benchmark.pedantic(lambda: run(coordinator.async_refresh()), setup=inject, rounds=10)
+
+    benchmark.extra_info["api_calls_per_cycle"] = sum(stub.calls.values())
+    assert coordinator.last_update_success
+
+
+def test_refresh_rate_limited(benchmark, hass, stub, setup_entry, run):
+    """Accounts answering 429 keep their data and are skipped until their budget resets."""
+    stub.accounts = 10
+    coordinator = _coordinator(hass, setup_entry())
+    stub.reset()
+    stub.inject(429, BALANCES, times=5)
+
+    benchmark.pedantic(lambda: run(coordinator.async_refresh()), rounds=10)
+
+    benchmark.extra_info["api_calls_per_cycle"] = sum(stub.calls.values())
+    assert coordinator.last_update_success
+    # The five limited accounts are called once, the others once per round
+    assert stub.calls[BALANCES] <= 5 + 5 * 10
+
+
+def test_refresh_with_failing_accounts(benchmark, hass, stub, setup_entry, run):
+    """Failing accounts do not fail the cycle and are paused after repeated failures."""
+    stub.accounts = 10
+    coordinator = _coordinator(hass, setup_entry())
+
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        stub.reset()
+        stub.inject(409, BALANCES, times=3)
+        run(coordinator.async_refresh())
+        assert coordinator.last_update_success
+
+    assert len(coordinator.failed_accounts) == 3
+    unavailable = [state for state in hass.states.async_all("sensor") if state.state == "unavailable"]
+    assert len(unavailable) == 2 * 3
+
+    # The paused accounts are not called until their cool-off ends
+    cycles = []
+
+    def cycle():
+        cycles.append(None)
+        run(coordinator.async_refresh())
+
+    stub.reset()
+    benchmark(cycle)
+
+    benchmark.extra_info["api_calls_per_cycle"] = sum(stub.calls.values()) / len(cycles)
+    assert coordinator.last_update_success
+    assert stub.calls == {BALANCES: 7 * len(cycles)}
+
+
+def test_refresh_expired_requisition(benchmark, hass, stub, setup_entry, run):
+    """An expired requisition fails the cycle, notifies the user and suspends polling."""
+    stub.accounts = 10
+    entry = setup_entry()
+    coordinator = _coordinator(hass, entry)
+
+    def inject():
+        stub.reset()
+        # Reassigning the requisitions makes the next cycle look them up again
+        coordinator.wrapper.requisition_ids = stub.requisition_ids
+        stub.inject(428, REQUISITION)
+
+    benchmark.pedantic(lambda: run(coordinator.async_refresh()), setup=inject, rounds=10)
+
+    benchmark.extra_info["api_calls_per_cycle"] = sum(stub.calls.values())
+    assert not coordinator.last_update_success
+    assert coordinator.update_interval is None
+
+    # A suspended entry makes no API calls until it is set up with a new requisition
+    stub.reset()
+    run(coordinator.async_refresh())
+    assert not stub.calls
+
+
+def test_first_refresh_with_failing_accounts(benchmark, hass, hass_storage, stub, setup_entry, run):
+    """Accounts failing the first refresh after a cold start keep their registry entries."""
+    stub.accounts = 10
+    entry = setup_entry()
+    entity_registry = er.async_get(hass)
+    registered = {entity.unique_id for entity in er.async_entries_for_config_entry(entity_registry, entry.entry_id)}
+    assert run(hass.config_entries.async_unload(entry.entry_id))
+    hass_storage.pop(f"{STORAGE_KEY_SNAPSHOT}.{entry.entry_id}", None)
+
+    def setup():
+        stub.reset()
+        stub.inject(409, BALANCES, times=3)
+
+    benchmark.pedantic(lambda: run(hass.config_entries.async_setup(entry.entry_id)), setup=setup, rounds=1)
+
+    coordinator = _coordinator(hass, entry)
+    assert len(coordinator.failed_accounts) == 3
+    assert registered <= {
+        entity.unique_id for entity in er.async_entries_for_config_entry(entity_registry, entry.entry_id)
+    }
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from custom_components.nordigen_account.posting_schedule import DAY, HOUR, PostingSchedule, next_fetch_time
+from custom_components.nordigen_account.quota import QuotaLedger
+
+# A Monday at midnight UTC
+START = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+WEEKS = 8
+MIN_INTERVAL = 15 * 60
+
+
+def _posting_times() -> List[float]:
+    """A bank that books one batch on weekdays, somewhere between 06:00 and 07:00."""
+    return [
+        START + day * DAY + 6 * HOUR + (day * 37 % 60) * 60
+        for day in range(WEEKS * 7)
+        if day % 7 < 5
+    ]
+
+
+def _simulate(learned: bool) -> Tuple[float, float]:
+    """
+    Fetch one account with the quota's even spacing, or with the learned schedule.
+
+    Returns the balances calls per day and the average hours a posting waited to be fetched,
+    over the second half of the run so the schedule had time to learn.
+    """
+    postings = _posting_times()
+    schedule = PostingSchedule(tz=timezone.utc)
+    quota = QuotaLedger()
+    now, last, calls, delays = START, None, 0, []
+    while now < START + WEEKS * 7 * DAY:
+        if learned:
+            fetch_at = next_fetch_time(schedule, quota, "acc", now)
+        else:
+            fetch_at = quota.next_call_time("acc", "balances", now)
+        fetch_at = max(fetch_at, now + MIN_INTERVAL)
+
+        posted = [posting for posting in postings if last is not None and last < posting <= fetch_at]
+        if fetch_at >= START + WEEKS * 7 * DAY / 2:
+            delays.extend(fetch_at - posting for posting in posted)
+        quota.record("acc", "balances", fetch_at)
+        schedule.observe("acc", fetch_at, bool(posted))
+        calls += 1
+        now = last = fetch_at
+
+    return calls / (WEEKS * 7), sum(delays) / len(delays) / HOUR
+
+
+def test_posting_schedule_staleness(benchmark):
+    """Hours a new balance waits to be fetched, with evenly spaced and learned fetch times."""
+    even_calls, even_delay = _simulate(learned=False)
+    learned_calls, learned_delay = benchmark.pedantic(_simulate, args=(True,), rounds=1)
+
+    benchmark.extra_info["even_delay_hours"] = round(even_delay, 2)
+    benchmark.extra_info["learned_delay_hours"] = round(learned_delay, 2)
+    benchmark.extra_info["learned_calls_per_day"] = round(learned_calls, 2)
+    assert learned_calls <= even_calls
+    assert learned_delay < even_delay / 2
+
+
+def test_future_probe_keeps_ledger():
+    """Asking whether a call fits at a later time neither forgets calls nor reported limits."""
+    now = START + 30 * DAY
+    quota = QuotaLedger()
+    for hours in (20, 15, 10, 5):
+        quota.record("acc", "balances", now - hours * HOUR)
+    quota.observe("acc", "details", remaining=0, reset_after=6 * HOUR, now=now)
+    assert quota.used("acc", "balances", now) == 4
+    assert not quota.has_budget("acc", "balances", now)
+
+    assert quota.has_budget("acc", "balances", now + 12 * HOUR)
+    quota.next_call_time("acc", "balances", now + 12 * HOUR)
+    assert quota.has_budget("acc", "details", now + 12 * HOUR)
+
+    assert quota.used("acc", "balances", now) == 4
+    assert not quota.has_budget("acc", "balances", now)
+    assert quota.remaining("acc", "details", now) == 0
+    assert quota.next_call_time("acc", "details", now) == now + 6 * HOUR
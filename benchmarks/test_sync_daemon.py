@@ -0,0 +1,61 @@
+import asyncio
+from typing import Tuple
+
+import pytest
+from aiohttp import ClientSession
+from aiohttp.test_utils import TestServer
+
+from custom_components.nordigen_account.sync_client import SyncDaemonClient
+from custom_components.nordigen_account.sync_daemon import SyncDaemon
+
+from stub_server import BALANCES, GoCardlessStub
+
+
+async def _async_start(stub: GoCardlessStub, state_path: str) -> Tuple[ClientSession, TestServer]:
+    """
+    Start the stub, refresh a daemon against it once and serve the daemon's snapshot.
+    """
+    await stub.start()
+    session = ClientSession()
+    daemon = SyncDaemon(session, "secret_id", "secret_key", stub.requisition_ids, state_path, base_url=stub.url)
+    await daemon.async_refresh()
+    server = TestServer(daemon.build_app())
+    await server.start_server()
+    return session, server
+
+
+async def _async_stop(stub: GoCardlessStub, session: ClientSession, server: TestServer) -> None:
+    """
+    Stop serving the snapshot, close the client session and stop the stub.
+    """
+    await server.close()
+    await session.close()
+    await stub.close()
+
+
+@pytest.mark.parametrize("consumers", [1, 10, 50])
+def test_sync_daemon_consumers(benchmark, private_loop, tmp_path, consumers):
+    """Latency of a poll by every consumer of the daemon; the API calls are made by the daemon alone."""
+    stub = GoCardlessStub(accounts=100)
+    session, server = private_loop.run_until_complete(_async_start(stub, str(tmp_path / "state.json")))
+    assert stub.calls[BALANCES] == 100
+
+    stub.reset()
+    clients = [SyncDaemonClient(session, str(server.make_url("/"))) for _ in range(consumers)]
+
+    async def _async_poll():
+        return await asyncio.gather(*(client.async_get_snapshot() for client in clients))
+
+    def poll():
+        return private_loop.run_until_complete(_async_poll())
+
+    snapshots = poll()
+    assert all(len(snapshot["accounts"]) == 100 for snapshot in snapshots)
+
+    # Unchanged snapshots are answered with 304 and no body
+    result = benchmark(poll)
+    assert all(snapshot is None for snapshot in result)
+
+    benchmark.extra_info["api_calls_per_consumer_poll"] = sum(stub.calls.values())
+    assert not stub.calls
+    private_loop.run_until_complete(_async_stop(stub, session, server))
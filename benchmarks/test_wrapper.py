@@ -0,0 +1,151 @@
+import asyncio
+import gc
+import tracemalloc
+from typing import Iterator, Tuple
+
+import pytest
+from aiohttp import ClientSession
+
+from custom_components.nordigen_account.nordigen_wrapper import NordigenWrapper
+from custom_components.nordigen_account.quota import QuotaLedger
+from custom_components.nordigen_account.snapshot import AccountsSnapshot
+
+from conftest import ACCOUNT_COUNTS
+from stub_server import BALANCES, DETAILS, GoCardlessStub
+
+# Repeated benchmark rounds must not run out of the daily call budget
+UNLIMITED_QUOTA = 10 ** 9
+
+
+async def _async_open(stub: GoCardlessStub, max_concurrency: int, **kwargs) -> Tuple[ClientSession, NordigenWrapper]:
+    """
+    Start the stub and create a wrapper for all its requisitions; extra arguments go to the wrapper.
+    """
+    await stub.start()
+    session = ClientSession()
+    wrapper = NordigenWrapper(
+        session,
+        "secret_id",
+        "secret_key",
+        stub.requisition_ids,
+        max_concurrency=max_concurrency,
+        quota=QuotaLedger(daily_limit=UNLIMITED_QUOTA),
+        base_url=stub.url,
+        **kwargs,
+    )
+    return session, wrapper
+
+
+async def _async_close(stub: GoCardlessStub, session: ClientSession) -> None:
+    """
+    Close the client session and stop the stub.
+    """
+    await session.close()
+    await stub.close()
+
+
+@pytest.fixture
+def open_wrapper(private_loop: asyncio.AbstractEventLoop) -> Iterator:
+    """
+    Provide a factory that serves a stub and returns an initialized wrapper for it.
+    """
+    opened = []
+
+    def _open(stub: GoCardlessStub, max_concurrency: int = 4, **kwargs) -> NordigenWrapper:
+        session, wrapper = private_loop.run_until_complete(_async_open(stub, max_concurrency, **kwargs))
+        opened.append((stub, session))
+        private_loop.run_until_complete(wrapper.async_initialize())
+        return wrapper
+
+    yield _open
+    for stub, session in opened:
+        private_loop.run_until_complete(_async_close(stub, session))
+
+
+@pytest.mark.parametrize("accounts", ACCOUNT_COUNTS)
+def test_update_all_accounts(benchmark, private_loop, open_wrapper, accounts):
+    """Refresh latency of a warm cycle, where account details come from the cache."""
+    stub = GoCardlessStub(accounts=accounts)
+    wrapper = open_wrapper(stub)
+    private_loop.run_until_complete(wrapper.async_update_all_accounts())
+
+    stub.reset()
+    result = benchmark(lambda: private_loop.run_until_complete(wrapper.async_update_all_accounts()))
+    assert len(result) == accounts
+
+    stub.reset()
+    private_loop.run_until_complete(wrapper.async_update_all_accounts())
+    benchmark.extra_info["api_calls_per_cycle"] = sum(stub.calls.values())
+    assert stub.calls == {BALANCES: accounts}
+
+
+@pytest.mark.parametrize("accounts", ACCOUNT_COUNTS)
+def test_cold_update_all_accounts(benchmark, private_loop, open_wrapper, accounts):
+    """Refresh latency of the first cycle, which also fetches the account details."""
+    stub = GoCardlessStub(accounts=accounts)
+    wrapper = open_wrapper(stub)
+
+    cycles = []
+
+    def cold_cycle():
+        for acc in wrapper.accounts:
+            wrapper.invalidate_metadata(acc.account_id)
+        cycles.append(None)
+        return private_loop.run_until_complete(wrapper.async_update_all_accounts())
+
+    stub.reset()
+    result = benchmark.pedantic(cold_cycle, rounds=5)
+    assert len(result) == accounts
+
+    benchmark.extra_info["api_calls_per_cycle"] = sum(stub.calls.values()) / len(cycles)
+    assert stub.calls == {BALANCES: len(cycles) * accounts, DETAILS: len(cycles) * accounts}
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4, 16])
+def test_update_all_accounts_with_latency(benchmark, private_loop, open_wrapper, max_concurrency):
+    """Refresh latency against a slow API, showing the effect of the concurrency limit."""
+    stub = GoCardlessStub(accounts=32, latency=0.01)
+    wrapper = open_wrapper(stub, max_concurrency)
+    private_loop.run_until_complete(wrapper.async_update_all_accounts())
+
+    result = benchmark.pedantic(
+        lambda: private_loop.run_until_complete(wrapper.async_update_all_accounts()), rounds=3
+    )
+    assert len(result) == 32
+
+
+def test_update_all_accounts_with_stalled_account(benchmark, private_loop, open_wrapper):
+    """Refresh latency when one bank stops answering: the deadline bounds the whole cycle."""
+    stub = GoCardlessStub(accounts=16)
+    wrapper = open_wrapper(stub, refresh_deadline=0.2, retry_attempts=0)
+    private_loop.run_until_complete(wrapper.async_update_all_accounts())
+    stalled = wrapper.accounts[0].account_id
+
+    stub.stall(stalled, 60)
+    result = benchmark.pedantic(
+        lambda: private_loop.run_until_complete(wrapper.async_update_all_accounts()), rounds=3
+    )
+    assert result[stalled].error is not None
+    assert all(outcome.ok for account_id, outcome in result.items() if account_id != stalled)
+    assert wrapper.metrics.deadlines_exceeded["refresh"] >= 1
+
+
+@pytest.mark.parametrize("accounts", [100, 500])
+def test_memory_per_account(benchmark, private_loop, open_wrapper, accounts):
+    """Memory retained per account by the wrapper, and the cost of building a snapshot of its balances."""
+    stub = GoCardlessStub(accounts=accounts)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        wrapper = open_wrapper(stub)
+        private_loop.run_until_complete(wrapper.async_update_all_accounts())
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    benchmark.extra_info["bytes_per_account"] = retained // accounts
+    snapshot = benchmark(AccountsSnapshot, wrapper.accounts)
+    assert len(snapshot.balances) == 2 * accounts
@@ -1,20 +1,57 @@
 import logging
+import os
 from typing import Dict
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-
-from .const import DOMAIN
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    DOMAIN,
+    STORAGE_VERSION,
+    STORAGE_KEY_METADATA,
+    STORAGE_KEY_QUOTA,
+    STORAGE_KEY_SNAPSHOT,
+    STORAGE_KEY_STATISTICS,
+    STORAGE_KEY_EXCHANGE_RATES,
+    STORAGE_KEY_ROLLING,
+    STORAGE_KEY_POSTING,
+    TRANSACTIONS_DB_FILENAME,
+)
 from .coordinator import NordigenDataUpdateCoordinator
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """
+    Set up the services of the integration, shared by all config entries.
+
+    Args:
+        hass (HomeAssistant): The Home Assistant instance.
+        config (ConfigType): The Home Assistant configuration.
+
+    Returns:
+        bool: True once the services are registered.
+    """
+    async_setup_services(hass)
+    return True
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """
     Set up the Nordigen Account integration.
 
     This method initializes the integration by creating and storing the data coordinator,
-    ensuring platform setups are forwarded, and triggering the first data refresh.
+    ensuring platform setups are forwarded, and triggering the first data refresh. When
+    balances saved by a previous run are available, they are restored instead and the first
+    refresh is deferred, so setup makes no API calls. When every requisition has expired, the
+    setup completes without accounts and polling stays suspended until a new requisition is saved.
 
     Args:
         hass (HomeAssistant): The Home Assistant instance.
@@ -27,9 +64,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     coordinator: NordigenDataUpdateCoordinator = NordigenDataUpdateCoordinator(hass, entry)
     await coordinator.async_initialize(hass)
-    await coordinator.async_config_entry_first_refresh()
+    if not await coordinator.async_restore_snapshot():
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data[DOMAIN][entry.entry_id]: Dict[str, NordigenDataUpdateCoordinator] = {"coordinator": coordinator}
+    entry.async_on_unload(entry.add_update_listener(async_update_entry))
 
     _LOGGER.warning("Setting up Nordigen sensors...")
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
@@ -38,11 +77,32 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """
+    Set the integration up again when its settings change.
+
+    Saving a new requisition in the options resumes polling after the previous one expired.
+    Tokens stored by the coordinator also update the entry, but do not cause a reload.
+
+    Args:
+        hass (HomeAssistant): The Home Assistant instance.
+        entry (ConfigEntry): The updated configuration entry.
+    """
+    coordinator: NordigenDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    if not coordinator.requires_reload():
+        return
+
+    _LOGGER.debug("Nordigen settings changed, reloading the integration")
+    coordinator.async_dismiss_requisition_notifications()
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """
     Unload the Nordigen Account integration.
 
     Removes the integration’s platforms and cleans up resources when the config entry is removed.
+    The coordinator is dropped once the platforms are unloaded, so services no longer reach it.
 
     Args:
         hass (HomeAssistant): The Home Assistant instance.
@@ -51,4 +111,31 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     Returns:
         bool: True if the integration is successfully unloaded.
     """
-    return await hass.config_entries.async_unload_platforms(entry, ["sensor"])
+    unloaded = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
+    if unloaded:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+    return unloaded
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """
+    Remove the data stored on disk for a config entry when it is deleted.
+
+    Args:
+        hass (HomeAssistant): The Home Assistant instance.
+        entry (ConfigEntry): The configuration entry being removed.
+    """
+    for key in (
+            STORAGE_KEY_METADATA,
+            STORAGE_KEY_QUOTA,
+            STORAGE_KEY_SNAPSHOT,
+            STORAGE_KEY_STATISTICS,
+            STORAGE_KEY_EXCHANGE_RATES,
+            STORAGE_KEY_ROLLING,
+            STORAGE_KEY_POSTING,
+    ):
+        await Store(hass, STORAGE_VERSION, f"{key}.{entry.entry_id}").async_remove()
+
+    db_path = hass.config.path(TRANSACTIONS_DB_FILENAME.format(entry_id=entry.entry_id))
+    if await hass.async_add_executor_job(os.path.exists, db_path):
+        await hass.async_add_executor_job(os.remove, db_path)
@@ -0,0 +1,168 @@
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Mapping, NamedTuple, Optional, Set, Tuple
+
+from .const import AGGREGATE_BALANCE_TYPES
+from .snapshot import AccountSnapshot, AccountsSnapshot, BalanceSnapshot
+
+# Aggregate groups
+GROUP_CURRENCY = "currency"
+GROUP_INSTITUTION = "institution"
+GROUP_BALANCE_TYPE = "balance_type"
+GROUP_TOTAL = "total"
+
+# Key of the single aggregate of the total group
+TOTAL_KEY = "all"
+
+# Group, key (currency, institution ID, balance type or "all") and currency of an aggregate
+AggregateKey = Tuple[str, str, str]
+
+# Converted totals are rounded to this precision
+CONVERTED_PRECISION = Decimal("0.01")
+
+# Converts an amount from a currency to the base currency, or returns None without a rate
+Converter = Callable[[Decimal, str, str], Optional[Decimal]]
+
+
+class AggregateTotal(NamedTuple):
+    """A sum of balances over several accounts, computed once per refresh."""
+
+    group: str
+    key: str
+    currency: str
+    amount: Decimal
+    accounts: Tuple[str, ...]
+    unconverted: Tuple[str, ...] = ()
+
+
+def preferred_balance(account: AccountSnapshot) -> Optional[BalanceSnapshot]:
+    """
+    Pick the balance of an account that counts towards totals holding one balance per account.
+
+    Args:
+        account (AccountSnapshot): The account.
+
+    Returns:
+        Optional[BalanceSnapshot]: The valid balance of the most preferred type, or None.
+    """
+    valid = {bal.balance_type: bal for bal in account.balances if bal.valid}
+    for balance_type in AGGREGATE_BALANCE_TYPES:
+        if balance_type in valid:
+            return valid[balance_type]
+    return next(iter(valid.values()), None)
+
+
+class _Accumulator:
+    """Collects the amounts, accounts and unconvertible currencies of one aggregate."""
+
+    __slots__ = ("amount", "accounts", "unconverted", "converted")
+
+    def __init__(self) -> None:
+        self.amount: Decimal = Decimal(0)
+        self.accounts: Set[str] = set()
+        self.unconverted: Set[str] = set()
+        self.converted: bool = False
+
+
+def compute_aggregates(
+        snapshot: AccountsSnapshot,
+        institutions: Mapping[str, str],
+        base_currency: Optional[str] = None,
+        convert: Optional[Converter] = None,
+) -> Dict[AggregateKey, AggregateTotal]:
+    """
+    Sum the balances of a snapshot per currency, per institution and per balance type.
+
+    Totals per currency and per institution hold the preferred balance of every account, so the
+    balance types an account reports are not counted twice. Totals per balance type hold every
+    valid balance of that type. Without a base currency, institution and balance type totals are
+    kept per currency. With a base currency they are converted into it, rounded to cents, and a
+    grand total over all accounts is added; balances without an exchange rate are left out and
+    their currencies are listed in the aggregate.
+
+    Args:
+        snapshot (AccountsSnapshot): The published accounts and balances.
+        institutions (Mapping[str, str]): The institution ID of every account ID.
+        base_currency (Optional[str]): The currency to convert institution, balance type and
+            grand totals to.
+        convert (Optional[Converter]): Converts amounts to the base currency.
+
+    Returns:
+        Dict[AggregateKey, AggregateTotal]: The totals keyed by group, key and currency.
+    """
+    totals: Dict[AggregateKey, _Accumulator] = {}
+
+    def add(group: str, key: str, account_id: str, balance: BalanceSnapshot, native: bool = False) -> None:
+        if native or not base_currency:
+            target = totals.setdefault((group, key, balance.currency), _Accumulator())
+            target.amount += balance.amount
+            target.accounts.add(account_id)
+            return
+
+        target = totals.setdefault((group, key, base_currency), _Accumulator())
+        converted = convert(balance.amount, balance.currency, base_currency) if convert else None
+        if converted is None:
+            target.unconverted.add(balance.currency)
+            return
+        target.amount += converted
+        target.accounts.add(account_id)
+        target.converted = target.converted or balance.currency != base_currency
+
+    for account in snapshot:
+        preferred = preferred_balance(account)
+        if preferred is not None:
+            add(GROUP_CURRENCY, preferred.currency, account.account_id, preferred, native=True)
+            add(GROUP_INSTITUTION, institutions.get(account.account_id) or "unknown", account.account_id, preferred)
+            if base_currency:
+                add(GROUP_TOTAL, TOTAL_KEY, account.account_id, preferred)
+        for balance in account.balances:
+            if balance.valid:
+                add(GROUP_BALANCE_TYPE, balance.balance_type, account.account_id, balance)
+
+    return {
+        key: AggregateTotal(
+            group=key[0],
+            key=key[1],
+            currency=key[2],
+            amount=total.amount.quantize(CONVERTED_PRECISION) if total.converted else total.amount,
+            accounts=tuple(sorted(total.accounts)),
+            unconverted=tuple(sorted(total.unconverted)),
+        )
+        for key, total in totals.items()
+    }
+
+
+def diff_aggregates(
+        old: Mapping[AggregateKey, AggregateTotal], new: Mapping[AggregateKey, AggregateTotal]
+) -> Set[AggregateKey]:
+    """
+    Find the aggregates that were added, removed or changed between two refreshes.
+
+    Args:
+        old (Mapping[AggregateKey, AggregateTotal]): The aggregates of the previous refresh.
+        new (Mapping[AggregateKey, AggregateTotal]): The aggregates of the current refresh.
+
+    Returns:
+        Set[AggregateKey]: The keys whose totals differ.
+    """
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+def institutions_by_account(requisitions: Mapping[str, Mapping], account_ids: Iterable[str]) -> Dict[str, str]:
+    """
+    Map accounts to the institution of their requisition.
+
+    Args:
+        requisitions (Mapping[str, Mapping]): The requisition records keyed by requisition ID.
+        account_ids (Iterable[str]): The account IDs to map.
+
+    Returns:
+        Dict[str, str]: The institution ID keyed by account ID, for the accounts that have one.
+    """
+    wanted = set(account_ids)
+    return {
+        account_id: requisition["institution_id"]
+        for requisition in requisitions.values()
+        if requisition.get("institution_id")
+        for account_id in requisition.get("accounts", [])
+        if account_id in wanted
+    }
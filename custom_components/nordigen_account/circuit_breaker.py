@@ -0,0 +1,156 @@
+import random
+import time
+from typing import Any, Dict, Optional
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_COOLDOWN_MINUTES,
+    BREAKER_MAX_COOLDOWN_HOURS,
+)
+
+# Circuit states
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Get an exponential backoff delay with full jitter.
+
+    Args:
+        attempt (int): The number of the retry, starting at 0.
+        base (float): The delay of the first retry in seconds.
+        cap (float): The longest delay in seconds.
+
+    Returns:
+        float: A random delay between 0 and the capped exponential delay.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Stop calling accounts that keep failing.
+
+    After a number of consecutive failed refreshes the circuit of an account opens and the
+    account is skipped for a cool-off period, so a broken bank connection does not spend the
+    daily quota or slow down the other accounts. Once the cool-off has passed a single trial
+    refresh is allowed: a success closes the circuit, a failure opens it again with a cool-off
+    that doubles every time, up to a maximum. The cool-off gets a random spread so accounts that
+    failed together are not retried together.
+    """
+
+    def __init__(
+            self,
+            failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+            cooldown: float = BREAKER_COOLDOWN_MINUTES * 60,
+            max_cooldown: float = BREAKER_MAX_COOLDOWN_HOURS * 3600,
+    ) -> None:
+        """
+        Initialize the breaker with every circuit closed.
+
+        Args:
+            failure_threshold (int): Consecutive failures after which a circuit opens.
+            cooldown (float): Seconds an account is skipped after its circuit opened the first time.
+            max_cooldown (float): Longest cool-off in seconds.
+        """
+        self._failure_threshold: int = max(1, failure_threshold)
+        self._cooldown: float = cooldown
+        self._max_cooldown: float = max_cooldown
+        self._circuits: Dict[str, Dict[str, Any]] = {}
+
+    def state(self, account_id: str, now: Optional[float] = None) -> str:
+        """
+        Get the state of the circuit of an account.
+
+        Args:
+            account_id (str): The account ID.
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            str: "closed", "open" while the account is skipped, or "half_open" when a trial
+                refresh is allowed.
+        """
+        circuit = self._circuits.get(account_id)
+        if circuit is None or circuit["open_until"] is None:
+            return STATE_CLOSED
+        now = time.time() if now is None else now
+        return STATE_OPEN if now < circuit["open_until"] else STATE_HALF_OPEN
+
+    def allow(self, account_id: str, now: Optional[float] = None) -> bool:
+        """
+        Check whether an account may be called right now.
+
+        Args:
+            account_id (str): The account ID.
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            bool: False while the circuit of the account is open.
+        """
+        return self.state(account_id, now) != STATE_OPEN
+
+    def open_until(self, account_id: str) -> Optional[float]:
+        """
+        Get the time at which an open circuit allows a trial refresh again.
+
+        Args:
+            account_id (str): The account ID.
+
+        Returns:
+            Optional[float]: The timestamp, or None if the circuit is closed.
+        """
+        return self._circuits.get(account_id, {}).get("open_until")
+
+    def record_success(self, account_id: str) -> None:
+        """
+        Close the circuit of an account after a successful refresh.
+
+        Args:
+            account_id (str): The account ID.
+        """
+        self._circuits.pop(account_id, None)
+
+    def record_failure(self, account_id: str, now: Optional[float] = None) -> bool:
+        """
+        Count a failed refresh of an account, opening its circuit when the threshold is reached.
+
+        A failed trial refresh opens the circuit again right away with a longer cool-off.
+
+        Args:
+            account_id (str): The account ID.
+            now (Optional[float]): Timestamp of the failure; defaults to the current time.
+
+        Returns:
+            bool: True if the circuit opened.
+        """
+        now = time.time() if now is None else now
+        circuit = self._circuits.setdefault(account_id, {"failures": 0, "trips": 0, "open_until": None})
+        circuit["failures"] += 1
+        if circuit["failures"] < self._failure_threshold and circuit["open_until"] is None:
+            return False
+
+        cooldown = min(self._max_cooldown, self._cooldown * 2 ** circuit["trips"])
+        circuit["trips"] += 1
+        circuit["open_until"] = now + cooldown * random.uniform(1.0, 1.25)
+        return True
+
+    def as_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get the circuits that are not closed or have recent failures, suitable for diagnostics.
+
+        Args:
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            Dict[str, Any]: The state, consecutive failures and reopen time keyed by account ID.
+        """
+        return {
+            account_id: {
+                "state": self.state(account_id, now),
+                "failures": circuit["failures"],
+                "open_until": circuit["open_until"],
+            }
+            for account_id, circuit in self._circuits.items()
+        }
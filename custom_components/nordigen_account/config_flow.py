@@ -1,23 +1,68 @@
+import asyncio
 import logging
+import time
+import uuid
 import voluptuous as vol
 from datetime import datetime
+from typing import Optional
 
 from homeassistant import config_entries
 from homeassistant.core import callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.network import NoURLAvailableError, get_url
+from homeassistant.helpers.selector import (
+    SelectOptionDict,
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
+    TextSelector,
+    TextSelectorConfig,
+)
 
 from .const import (
     DOMAIN,
     CONF_SECRET_ID,
     CONF_SECRET_KEY,
     CONF_REQUISITION_ID,
+    CONF_REQUISITION_IDS,
     CONF_REFRESH_TOKEN,
+    CONF_ACCESS_TOKEN,
+    CONF_ACCESS_EXPIRES_AT,
+    CONF_REFRESH_EXPIRES_AT,
+    CONF_MAX_CONCURRENCY,
+    CONF_METADATA_TTL_HOURS,
+    CONF_SYNC_TRANSACTIONS,
+    CONF_BASE_CURRENCY,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SYNC_DAEMON_URL,
+    CONF_SYNC_DAEMON_TOKEN,
+    CONF_COUNTRY,
+    CONF_SEARCH,
+    CONF_INSTITUTION_ID,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_METADATA_TTL_HOURS,
     ERROR_INVALID_CREDENTIALS,
     ERROR_INVALID_REQUISITION,
     ERROR_API_FAILURE,
     ERROR_EXPIRED_REQUISITION,
-    ERROR_NO_LINKED_ACCOUNTS
+    ERROR_NO_LINKED_ACCOUNTS,
+    ERROR_NO_INSTITUTIONS,
+    INSTITUTION_PICKER_LIMIT,
+    REQUEST_TIMEOUT_SECONDS,
+    LINK_COUNTRIES,
+    LINK_POLL_INTERVAL_SECONDS,
+    LINK_REDIRECT_URL,
+    LINK_TIMEOUT_MINUTES,
+)
+from .coordinator import requisition_ids_from_entry_data
+from .institutions import Institution, async_get_catalogue
+from .nordigen_wrapper import (
+    NordigenAPIError,
+    NordigenWrapper,
+    STATUS_EXPIRED,
+    STATUS_LINKED,
+    STATUS_REJECTED,
 )
-from .nordigen_wrapper import NordigenAPIError, NordigenWrapper
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,12 +71,27 @@ class NordigenAccountConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION: int = 1
 
+    def __init__(self) -> None:
+        """Initialize the state shared by the steps that link a bank from the flow."""
+        self._secret_id: Optional[str] = None
+        self._secret_key: Optional[str] = None
+        self._existing_entry: Optional[config_entries.ConfigEntry] = None
+        self._wrapper: Optional[NordigenWrapper] = None
+        self._country: Optional[str] = None
+        self._search: str = ""
+        self._requisition_id: Optional[str] = None
+        self._link: Optional[str] = None
+        self._link_status: Optional[str] = None
+        self._poll_task: Optional[asyncio.Task] = None
+
     async def async_step_user(self, user_input: dict | None = None) -> config_entries.FlowResult:
         """Handle the user input step in the configuration flow.
 
         Args:
             user_input (dict, optional): Dictionary containing user-provided configuration data.
                 Expected keys are CONF_SECRET_ID, CONF_SECRET_KEY, CONF_REQUISITION_ID, and CONF_REFRESH_TOKEN.
+                If the credentials are already configured, the requisition is added to that entry.
+                Without a requisition ID, the flow continues with picking a bank to link.
 
         Returns:
             Config entry or an error message prompting the user to correct input issues.
@@ -41,52 +101,41 @@ class NordigenAccountConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             secret_id = user_input[CONF_SECRET_ID].strip()
             secret_key = user_input[CONF_SECRET_KEY].strip()
-            requisition_id = user_input[CONF_REQUISITION_ID].strip()
+            requisition_id = (user_input.get(CONF_REQUISITION_ID) or "").strip()
             refresh_token = user_input.get(CONF_REFRESH_TOKEN)
             refresh_token = refresh_token.strip() if refresh_token else None
 
             try:
-                new_refresh_token = refresh_token
+                # The same credentials may already be configured; the requisition is then added
+                # to that entry so every bank shares one authenticated client
+                existing_entry = await self.async_set_unique_id(secret_id)
+
+                if not requisition_id:
+                    # Authenticate now, so the bank picker can list institutions right away
+                    self._secret_id = secret_id
+                    self._secret_key = secret_key
+                    self._existing_entry = existing_entry
+                    self._wrapper = self._create_wrapper([], existing_entry, refresh_token)
+                    await self._wrapper.async_ensure_access_token()
+                    return await self.async_step_country()
+
+                if existing_entry is not None:
+                    return await self._async_add_requisition(existing_entry, requisition_id)
 
                 # Validate requisition ID before creating the entry
-                wrapper = await self.hass.async_add_executor_job(
-                    NordigenWrapper,
+                wrapper = NordigenWrapper(
+                    async_get_clientsession(self.hass),
                     secret_id,
                     secret_key,
-                    requisition_id,
-                    new_refresh_token
-                )
-
-                data = {
-                    CONF_SECRET_ID: secret_id,
-                    CONF_SECRET_KEY: secret_key,
-                    CONF_REQUISITION_ID: requisition_id,
-                    CONF_REFRESH_TOKEN: new_refresh_token
-                }
-
-                await self.async_set_unique_id(secret_id)
-                self._abort_if_unique_id_configured()
-
-                institution_id = wrapper.manager.institution_id
-                reference = wrapper.manager.reference
-
-                return self.async_create_entry(
-                    title=f"{institution_id} - {reference}",
-                    data=data
+                    [requisition_id],
+                    refresh_token
                 )
+                await wrapper.async_initialize()
+                return self._async_create_entry(secret_id, secret_key, requisition_id, wrapper)
 
             except NordigenAPIError as e:
                 _LOGGER.error("Nordigen API error: %s", e)
-                if e.status_code == 401:
-                    errors["base"] = ERROR_INVALID_CREDENTIALS
-                elif e.status_code == 400:
-                    errors["base"] = ERROR_INVALID_REQUISITION
-                elif e.status_code == 410:
-                    errors["base"] = ERROR_NO_LINKED_ACCOUNTS
-                elif e.status_code == 428:
-                    errors["base"] = ERROR_EXPIRED_REQUISITION
-                else:
-                    errors["base"] = ERROR_API_FAILURE
+                errors["base"] = _error_for(e)
             except Exception as e:
                 _LOGGER.exception("Unexpected error during setup: %s", str(e))
                 errors["base"] = "unknown_error"
@@ -95,12 +144,320 @@ class NordigenAccountConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             {
                 vol.Required(CONF_SECRET_ID): str,
                 vol.Required(CONF_SECRET_KEY): str,
-                vol.Required(CONF_REQUISITION_ID): str,
+                vol.Optional(CONF_REQUISITION_ID): str,
                 vol.Optional(CONF_REFRESH_TOKEN): str,
             }
         )
         return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
 
+    async def async_step_country(self, user_input: dict | None = None) -> config_entries.FlowResult:
+        """Handle the choice of the country of the bank to link.
+
+        The institutions of the country are downloaded only if the cached catalogue has none or
+        has expired.
+
+        Args:
+            user_input (dict, optional): Expected keys are CONF_COUNTRY and CONF_SEARCH, a prefix
+                of the bank's name, BIC or ID narrowing down the institutions offered.
+
+        Returns:
+            The institution step, or the country form with an error.
+        """
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            self._country = user_input[CONF_COUNTRY]
+            self._search = user_input.get(CONF_SEARCH, "").strip()
+            try:
+                catalogue = await async_get_catalogue(self.hass)
+                await self._wrapper.async_ensure_access_token()
+                await catalogue.async_refresh(self._wrapper.client, self._country)
+            except NordigenAPIError as e:
+                _LOGGER.error("Failed to list Nordigen institutions: %s", e)
+                errors["base"] = _error_for(e)
+            else:
+                if catalogue.search(self._country, self._search, limit=1):
+                    return await self.async_step_institution()
+                errors["base"] = ERROR_NO_INSTITUTIONS
+
+        default_country = self._country or (
+            self.hass.config.country if self.hass.config.country in LINK_COUNTRIES else LINK_COUNTRIES[0]
+        )
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_COUNTRY, default=default_country): SelectSelector(
+                    SelectSelectorConfig(options=list(LINK_COUNTRIES), mode=SelectSelectorMode.DROPDOWN)
+                ),
+                vol.Optional(CONF_SEARCH, default=self._search): str,
+            }
+        )
+        return self.async_show_form(step_id="country", data_schema=schema, errors=errors)
+
+    async def async_step_institution(self, user_input: dict | None = None) -> config_entries.FlowResult:
+        """Handle the choice of the bank to link, and send the user to authenticate with it.
+
+        An end user agreement and a requisition are created for the chosen institution; the
+        flow then waits until the bank confirms the link.
+
+        Args:
+            user_input (dict, optional): Expected key is CONF_INSTITUTION_ID.
+
+        Returns:
+            The external link step, or the institution form with an error.
+        """
+        errors: dict[str, str] = {}
+        catalogue = await async_get_catalogue(self.hass)
+
+        if user_input is not None:
+            institution = catalogue.get(self._country, user_input[CONF_INSTITUTION_ID])
+            if institution is None:
+                errors["base"] = ERROR_NO_INSTITUTIONS
+            else:
+                try:
+                    await self._async_create_link(institution)
+                except NordigenAPIError as e:
+                    _LOGGER.error("Failed to create Nordigen requisition: %s", e)
+                    errors["base"] = _error_for(e)
+                else:
+                    return await self.async_step_link()
+
+        options = [
+            SelectOptionDict(value=institution.institution_id, label=institution.name)
+            for institution in catalogue.search(self._country, self._search, limit=INSTITUTION_PICKER_LIMIT)
+        ]
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_INSTITUTION_ID): SelectSelector(
+                    SelectSelectorConfig(options=options, mode=SelectSelectorMode.DROPDOWN)
+                ),
+            }
+        )
+        return self.async_show_form(step_id="institution", data_schema=schema, errors=errors)
+
+    async def async_step_link(self, user_input: dict | None = None) -> config_entries.FlowResult:
+        """Send the user to the bank, until the link is polled to completion.
+
+        Args:
+            user_input (dict, optional): The final requisition status, passed by the polling task.
+
+        Returns:
+            The external step, or its completion once the requisition left the pending states.
+        """
+        if user_input is None:
+            return self.async_external_step(step_id="link", url=self._link)
+
+        self._link_status = user_input.get("status")
+        return self.async_external_step_done(next_step_id="finish")
+
+    async def async_step_finish(self, user_input: dict | None = None) -> config_entries.FlowResult:
+        """Validate the linked requisition and create the entry or add it to the existing one.
+
+        Args:
+            user_input (dict, optional): Not used; the step has no form.
+
+        Returns:
+            Config entry, or an abort result if the link was not completed.
+        """
+        if self._link_status != STATUS_LINKED:
+            _LOGGER.warning(
+                "Nordigen requisition %s was not linked (status %s)", self._requisition_id, self._link_status
+            )
+            return self.async_abort(reason="link_failed")
+
+        try:
+            if self._existing_entry is not None:
+                return await self._async_add_requisition(self._existing_entry, self._requisition_id)
+
+            # Reuse the tokens obtained when the flow started
+            token_state = self._wrapper.token_state
+            wrapper = NordigenWrapper(
+                async_get_clientsession(self.hass),
+                self._secret_id,
+                self._secret_key,
+                [self._requisition_id],
+                token_state["refresh_token"],
+                access_token=token_state["access_token"],
+                access_expires_at=token_state["access_expires_at"],
+                refresh_expires_at=token_state["refresh_expires_at"],
+            )
+            await wrapper.async_initialize()
+            return self._async_create_entry(self._secret_id, self._secret_key, self._requisition_id, wrapper)
+
+        except NordigenAPIError as e:
+            _LOGGER.error("Failed to validate the linked Nordigen requisition: %s", e)
+            return self.async_abort(reason="link_failed")
+
+    @callback
+    def async_remove(self) -> None:
+        """Stop polling the link when the flow is closed."""
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+
+    async def _async_create_link(self, institution: Institution) -> None:
+        """Create the agreement and requisition for an institution and start polling the link.
+
+        The agreement asks for the full transaction history and access period the institution
+        supports.
+
+        Args:
+            institution (Institution): The institution to link.
+
+        Raises:
+            NordigenAPIError: If the agreement or the requisition cannot be created.
+        """
+        client = self._wrapper.client
+        await self._wrapper.async_ensure_access_token()
+        agreement = await client.create_agreement(
+            institution.institution_id,
+            institution.transaction_total_days,
+            institution.max_access_valid_for_days,
+        )
+        requisition = await client.create_requisition(
+            institution.institution_id, self._redirect_url(), agreement["id"], uuid.uuid4().hex
+        )
+        self._requisition_id = requisition["id"]
+        self._link = requisition["link"]
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+        self._poll_task = self.hass.async_create_task(self._async_poll_link())
+
+    async def _async_poll_link(self) -> None:
+        """Poll the requisition until the user completed, refused or abandoned the link.
+
+        The flow moves on with the last status seen, once the requisition is linked, rejected or
+        expired, or when the link timed out.
+        """
+        deadline = time.monotonic() + LINK_TIMEOUT_MINUTES * 60
+        status: Optional[str] = None
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LINK_POLL_INTERVAL_SECONDS)
+            try:
+                await self._wrapper.async_ensure_access_token()
+                requisition = await self._wrapper.client.get_requisition(self._requisition_id)
+            except NordigenAPIError as e:
+                _LOGGER.debug("Failed to poll Nordigen requisition %s: %s", self._requisition_id, e)
+                continue
+            status = requisition.get("status")
+            if status in (STATUS_LINKED, STATUS_REJECTED, STATUS_EXPIRED):
+                break
+
+        self._poll_task = None
+        await self.hass.config_entries.flow.async_configure(flow_id=self.flow_id, user_input={"status": status})
+
+    def _redirect_url(self) -> str:
+        """Get the URL the bank sends the user back to, preferably this Home Assistant instance."""
+        try:
+            return get_url(self.hass)
+        except NoURLAvailableError:
+            return LINK_REDIRECT_URL
+
+    def _create_wrapper(
+            self,
+            requisition_ids: list[str],
+            entry: Optional[config_entries.ConfigEntry],
+            refresh_token: Optional[str],
+    ) -> NordigenWrapper:
+        """Create a wrapper for the flow's credentials, reusing the tokens of an existing entry.
+
+        Args:
+            requisition_ids (list[str]): The requisition IDs to load.
+            entry (ConfigEntry, optional): The entry already holding the same credentials.
+            refresh_token (str, optional): The refresh token entered by the user.
+
+        Returns:
+            NordigenWrapper: The wrapper; nothing is requested yet.
+        """
+        if entry is None:
+            return NordigenWrapper(
+                async_get_clientsession(self.hass), self._secret_id, self._secret_key, requisition_ids, refresh_token
+            )
+        return NordigenWrapper(
+            async_get_clientsession(self.hass),
+            entry.data[CONF_SECRET_ID],
+            entry.data[CONF_SECRET_KEY],
+            requisition_ids,
+            entry.data.get(CONF_REFRESH_TOKEN),
+            access_token=entry.data.get(CONF_ACCESS_TOKEN),
+            access_expires_at=entry.data.get(CONF_ACCESS_EXPIRES_AT),
+            refresh_expires_at=entry.data.get(CONF_REFRESH_EXPIRES_AT),
+        )
+
+    def _async_create_entry(
+            self, secret_id: str, secret_key: str, requisition_id: str, wrapper: NordigenWrapper
+    ) -> config_entries.FlowResult:
+        """Create the config entry for a validated requisition.
+
+        Args:
+            secret_id (str): API secret ID.
+            secret_key (str): API secret key.
+            requisition_id (str): The validated requisition ID.
+            wrapper (NordigenWrapper): The initialized wrapper holding the tokens to store.
+
+        Returns:
+            The created config entry.
+        """
+        token_state = wrapper.token_state
+        data = {
+            CONF_SECRET_ID: secret_id,
+            CONF_SECRET_KEY: secret_key,
+            CONF_REQUISITION_ID: requisition_id,
+            CONF_REQUISITION_IDS: [requisition_id],
+            CONF_REFRESH_TOKEN: token_state["refresh_token"],
+            CONF_ACCESS_TOKEN: token_state["access_token"],
+            CONF_ACCESS_EXPIRES_AT: token_state["access_expires_at"],
+            CONF_REFRESH_EXPIRES_AT: token_state["refresh_expires_at"],
+        }
+
+        institution_id = wrapper.institution_id
+        reference = wrapper.reference
+
+        return self.async_create_entry(
+            title=f"{institution_id} - {reference}",
+            data=data
+        )
+
+    async def _async_add_requisition(
+            self, entry: config_entries.ConfigEntry, requisition_id: str
+    ) -> config_entries.FlowResult:
+        """Validate a requisition and add it to an existing config entry with the same credentials.
+
+        The requisition is validated with the tokens already stored in the entry, so no new
+        authentication is needed.
+
+        Args:
+            entry (ConfigEntry): The config entry holding the same credentials.
+            requisition_id (str): The requisition ID to add.
+
+        Returns:
+            An abort result telling the user whether the requisition was added.
+
+        Raises:
+            NordigenAPIError: If the requisition cannot be validated.
+        """
+        requisition_ids = requisition_ids_from_entry_data(entry.data)
+        if requisition_id in requisition_ids:
+            return self.async_abort(reason="already_configured")
+
+        wrapper = self._create_wrapper([requisition_id], entry, None)
+        await wrapper.async_initialize()
+
+        token_state = wrapper.token_state
+        self.hass.config_entries.async_update_entry(
+            entry,
+            data={
+                **entry.data,
+                CONF_REQUISITION_IDS: [*requisition_ids, requisition_id],
+                CONF_REFRESH_TOKEN: token_state["refresh_token"],
+                CONF_ACCESS_TOKEN: token_state["access_token"],
+                CONF_ACCESS_EXPIRES_AT: token_state["access_expires_at"],
+                CONF_REFRESH_EXPIRES_AT: token_state["refresh_expires_at"],
+            },
+        )
+        if entry.state is not config_entries.ConfigEntryState.LOADED:
+            # A loaded entry is reloaded by its update listener
+            await self.hass.config_entries.async_reload(entry.entry_id)
+        return self.async_abort(reason="requisition_added")
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry: config_entries.ConfigEntry) -> config_entries.OptionsFlow:
@@ -115,6 +472,26 @@ class NordigenAccountConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return NordigenAccountOptionsFlow(config_entry)
 
 
+def _error_for(error: NordigenAPIError) -> str:
+    """Map a Nordigen API error to the error key shown in a form.
+
+    Args:
+        error (NordigenAPIError): The error raised by the API.
+
+    Returns:
+        str: The error key.
+    """
+    if error.status_code == 401:
+        return ERROR_INVALID_CREDENTIALS
+    if error.status_code == 400:
+        return ERROR_INVALID_REQUISITION
+    if error.status_code == 410:
+        return ERROR_NO_LINKED_ACCOUNTS
+    if error.status_code == 428:
+        return ERROR_EXPIRED_REQUISITION
+    return ERROR_API_FAILURE
+
+
 class NordigenAccountOptionsFlow(config_entries.OptionsFlow):
     """Manage the options flow for updating Nordigen Account configuration"""
 
@@ -126,26 +503,74 @@ class NordigenAccountOptionsFlow(config_entries.OptionsFlow):
 
         Args:
             user_input (dict, optional): Dictionary containing updated configuration settings.
-                Expected keys are CONF_REQUISITION_ID and CONF_REFRESH_TOKEN.
+                Expected keys are CONF_REQUISITION_IDS, CONF_REFRESH_TOKEN, CONF_MAX_CONCURRENCY,
+                CONF_METADATA_TTL_HOURS, CONF_SYNC_TRANSACTIONS, CONF_BASE_CURRENCY,
+                CONF_REQUEST_TIMEOUT, CONF_SYNC_DAEMON_URL and CONF_SYNC_DAEMON_TOKEN.
 
         Returns:
             Config entry update or a form prompting the user for correct input.
         """
-        if user_input is not None:
+        errors: dict[str, str] = {}
+
+        requisition_ids = [
+            requisition_id.strip()
+            for requisition_id in (user_input or {}).get(CONF_REQUISITION_IDS, [])
+            if requisition_id.strip()
+        ]
+        if user_input is not None and not requisition_ids:
+            errors["base"] = ERROR_INVALID_REQUISITION
+        elif user_input is not None:
             data = dict(self.config_entry.data)
-            data[CONF_REQUISITION_ID] = user_input[CONF_REQUISITION_ID].strip()
+            data[CONF_REQUISITION_IDS] = requisition_ids
+            data[CONF_REQUISITION_ID] = requisition_ids[0]
             data[CONF_REFRESH_TOKEN] = user_input.get(CONF_REFRESH_TOKEN, "").strip()
+            data[CONF_MAX_CONCURRENCY] = user_input.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)
+            data[CONF_METADATA_TTL_HOURS] = user_input.get(CONF_METADATA_TTL_HOURS, DEFAULT_METADATA_TTL_HOURS)
+            data[CONF_SYNC_TRANSACTIONS] = user_input.get(CONF_SYNC_TRANSACTIONS, False)
+            data[CONF_BASE_CURRENCY] = user_input.get(CONF_BASE_CURRENCY, "").strip().upper()
+            data[CONF_REQUEST_TIMEOUT] = user_input.get(CONF_REQUEST_TIMEOUT, REQUEST_TIMEOUT_SECONDS)
+            data[CONF_SYNC_DAEMON_URL] = user_input.get(CONF_SYNC_DAEMON_URL, "").strip()
+            data[CONF_SYNC_DAEMON_TOKEN] = user_input.get(CONF_SYNC_DAEMON_TOKEN, "").strip()
+            if data[CONF_REFRESH_TOKEN] != self.config_entry.data.get(CONF_REFRESH_TOKEN):
+                # The expiry stored for the previous refresh token does not apply to the new one
+                data[CONF_REFRESH_EXPIRES_AT] = None
 
             self.hass.config_entries.async_update_entry(self.config_entry, data=data)
             return self.async_create_entry(title="", data={})
 
-        current_requisition_id = self.config_entry.data.get(CONF_REQUISITION_ID, "")
+        current_requisition_ids = requisition_ids_from_entry_data(self.config_entry.data)
         current_refresh_token = self.config_entry.data.get(CONF_REFRESH_TOKEN, "")
+        current_max_concurrency = self.config_entry.data.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)
+        current_metadata_ttl = self.config_entry.data.get(CONF_METADATA_TTL_HOURS, DEFAULT_METADATA_TTL_HOURS)
+        current_sync_transactions = self.config_entry.data.get(CONF_SYNC_TRANSACTIONS, False)
+        current_base_currency = self.config_entry.data.get(CONF_BASE_CURRENCY, "")
+        current_request_timeout = self.config_entry.data.get(CONF_REQUEST_TIMEOUT, REQUEST_TIMEOUT_SECONDS)
+        current_sync_daemon_url = self.config_entry.data.get(CONF_SYNC_DAEMON_URL, "")
+        current_sync_daemon_token = self.config_entry.data.get(CONF_SYNC_DAEMON_TOKEN, "")
 
         schema = vol.Schema(
             {
-                vol.Required(CONF_REQUISITION_ID, default=current_requisition_id): str,
+                vol.Required(CONF_REQUISITION_IDS, default=current_requisition_ids): TextSelector(
+                    TextSelectorConfig(multiple=True)
+                ),
                 vol.Optional(CONF_REFRESH_TOKEN, default=current_refresh_token): str,
+                vol.Optional(CONF_MAX_CONCURRENCY, default=current_max_concurrency): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=16)
+                ),
+                vol.Optional(CONF_METADATA_TTL_HOURS, default=current_metadata_ttl): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=24 * 30)
+                ),
+                vol.Optional(CONF_SYNC_TRANSACTIONS, default=current_sync_transactions): bool,
+                vol.Optional(CONF_BASE_CURRENCY, default=current_base_currency): vol.All(
+                    str, vol.Match(r"^\s*([A-Za-z]{3})?\s*$")
+                ),
+                vol.Optional(CONF_REQUEST_TIMEOUT, default=current_request_timeout): vol.All(
+                    vol.Coerce(int), vol.Range(min=5, max=120)
+                ),
+                vol.Optional(CONF_SYNC_DAEMON_URL, default=current_sync_daemon_url): vol.All(
+                    str, vol.Match(r"^\s*((https?://|unix:)\S+)?\s*$")
+                ),
+                vol.Optional(CONF_SYNC_DAEMON_TOKEN, default=current_sync_daemon_token): str,
             }
         )
-        return self.async_show_form(step_id="init", data_schema=schema)
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
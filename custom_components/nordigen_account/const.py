@@ -4,14 +4,151 @@ DOMAIN = "nordigen_account"
 CONF_SECRET_ID = "secret_id"
 CONF_SECRET_KEY = "secret_key"
 CONF_REQUISITION_ID = "requisition_id"
+CONF_REQUISITION_IDS = "requisition_ids"
 CONF_REFRESH_TOKEN = "refresh_token"
+CONF_ACCESS_TOKEN = "access_token"
+CONF_ACCESS_EXPIRES_AT = "access_expires_at"
+CONF_REFRESH_EXPIRES_AT = "refresh_expires_at"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_METADATA_TTL_HOURS = "metadata_ttl_hours"
+CONF_SYNC_TRANSACTIONS = "sync_transactions"
+CONF_BASE_CURRENCY = "base_currency"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_COUNTRY = "country"
+CONF_SEARCH = "search"
+CONF_INSTITUTION_ID = "institution_id"
+CONF_SYNC_DAEMON_URL = "sync_daemon_url"
+CONF_SYNC_DAEMON_TOKEN = "sync_daemon_token"
 
 # How often to poll the Nordigen API -> 4 times a day = every 6 hours
+# Used until the quota ledger has enough history to schedule refreshes itself
 UPDATE_INTERVAL_HOURS = 6
 
+# GoCardless allows a few calls per account and endpoint in a rolling 24 hour window
+DAILY_CALL_LIMIT = 4
+QUOTA_WINDOW_HOURS = 24
+ENDPOINT_DETAILS = "details"
+ENDPOINT_BALANCES = "balances"
+ENDPOINT_TRANSACTIONS = "transactions"
+
+# Rate-limit headers sent by GoCardless, most specific first. The account success limit is the
+# per-account daily budget; the general limit applies to every endpoint.
+RATE_LIMIT_REMAINING_HEADERS = ("HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_REMAINING", "HTTP_X_RATELIMIT_REMAINING")
+RATE_LIMIT_RESET_HEADERS = ("HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_RESET", "HTTP_X_RATELIMIT_RESET")
+
+# Bounds on the refresh interval picked by the quota-aware scheduler
+MIN_UPDATE_INTERVAL_MINUTES = 15
+STARTUP_JITTER_MINUTES = 10
+
+# GoCardless Bank Account Data (Nordigen) API
+API_BASE_URL = "https://bankaccountdata.gocardless.com/api/v2"
+REQUEST_TIMEOUT_SECONDS = 30
+
+# Deadlines bounding a whole refresh or transaction sync, and every call to the local transaction
+# database; accounts still running at the deadline are cancelled and count as failed
+REFRESH_DEADLINE_SECONDS = 300
+STORE_CALL_TIMEOUT_SECONDS = 60
+
+# Transient account failures (network errors, timeouts, 5xx) are retried within a refresh with
+# exponential backoff and jitter
+RETRY_ATTEMPTS = 2
+RETRY_BASE_DELAY_SECONDS = 1
+RETRY_MAX_DELAY_SECONDS = 10
+
+# Accounts that fail this many refreshes in a row are skipped for a cool-off period that doubles
+# with every failed trial refresh
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_MINUTES = 30
+BREAKER_MAX_COOLDOWN_HOURS = 24
+
+# End user agreements usually expire after 90 days; a warning is raised this many days before
+EXPIRY_WARNING_DAYS = (7, 1)
+
+# Events fired for automations
+EVENT_REQUISITION_EXPIRING = "nordigen_requisition_expiring"
+EVENT_REQUISITION_EXPIRED = "nordigen_requisition_expired"
+
+# Access tokens are refreshed this long before they expire
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+# Maximum number of Nordigen API calls made at the same time during a refresh
+DEFAULT_MAX_CONCURRENCY = 4
+
+# How long account details (name, status, currency) are cached before they are requested again
+DEFAULT_METADATA_TTL_HOURS = 24
+
+# Totals use one balance per account, of the first type in this list the account reports
+AGGREGATE_BALANCE_TYPES = ("interimAvailable", "interimBooked", "closingAvailable", "closingBooked", "expected")
+
+# Euro reference rates of the European Central Bank, used to convert totals to a base currency
+EXCHANGE_RATES_URL = "https://www.ecb.europa.eu/stats/eurofxref/eurofxref-daily.xml"
+EXCHANGE_RATE_TTL_HOURS = 24
+EXCHANGE_RATE_RETRY_MINUTES = 60
+
+# Spend and income sensors sum the booked transactions of the last this many days, today included
+ROLLING_WINDOWS = {"day": 1, "week": 7, "month": 30}
+
+# Learned posting windows: balance changes are learned per account and hour of the week, with
+# observations counting half after this many days; fetches follow the learned schedule once
+# this many changes were observed, and gaps between fetches longer than this are not learned from
+POSTING_HALF_LIFE_DAYS = 28
+POSTING_MIN_CHANGES = 5
+POSTING_MAX_INTERVAL_DAYS = 7
+
+# Bank linking from the config flow: the institutions of a country are cached for a week, the
+# picker lists at most this many matches and a new link is polled until the bank confirms it
+INSTITUTIONS_TTL_HOURS = 24 * 7
+INSTITUTION_PICKER_LIMIT = 250
+LINK_POLL_INTERVAL_SECONDS = 5
+LINK_TIMEOUT_MINUTES = 15
+LINK_REDIRECT_URL = "https://www.home-assistant.io/"
+LINK_COUNTRIES = (
+    "AT", "BE", "BG", "CY", "CZ", "DE", "DK", "EE", "ES", "FI", "FR", "GB", "GR", "HR", "HU", "IE",
+    "IS", "IT", "LI", "LT", "LU", "LV", "MT", "NL", "NO", "PL", "PT", "RO", "SE", "SI", "SK",
+)
+DATA_INSTITUTIONS = f"{DOMAIN}_institutions"
+
+# Sync daemon: one process refreshes the accounts and serves versioned snapshots to any number
+# of Home Assistant instances, which poll it this often instead of calling the API
+SYNC_DAEMON_HOST = "127.0.0.1"
+SYNC_DAEMON_PORT = 8765
+SYNC_DAEMON_POLL_SECONDS = 300
+SYNC_DAEMON_STATE_FILE = "nordigen_sync.json"
+SYNC_SNAPSHOT_PATH = "/snapshot"
+SYNC_REFRESH_PATH = "/refresh"
+SYNC_SNAPSHOT_FORMAT = 1
+
+# Transactions are synced from the latest stored booking date minus this overlap, so pending
+# transactions that were booked since the last sync are picked up
+TRANSACTION_OVERLAP_DAYS = 3
+TRANSACTION_BATCH_SIZE = 500
+TRANSACTIONS_DB_FILENAME = "nordigen_account.{entry_id}.db"
+
+# Upper bounds of the API latency histogram buckets, in seconds
+LATENCY_BUCKETS_SECONDS = [0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+# Services
+SERVICE_REFRESH = "refresh"
+ATTR_ACCOUNT_ID = "account_id"
+
+# Persistent storage
+STORAGE_VERSION = 1
+STORAGE_KEY_METADATA = f"{DOMAIN}.metadata"
+STORAGE_KEY_QUOTA = f"{DOMAIN}.quota"
+STORAGE_KEY_SNAPSHOT = f"{DOMAIN}.snapshot"
+STORAGE_KEY_STATISTICS = f"{DOMAIN}.statistics"
+STORAGE_KEY_EXCHANGE_RATES = f"{DOMAIN}.exchange_rates"
+STORAGE_KEY_ROLLING = f"{DOMAIN}.rolling"
+STORAGE_KEY_INSTITUTIONS = f"{DOMAIN}.institutions"
+STORAGE_KEY_POSTING = f"{DOMAIN}.posting_schedule"
+
+# Delay before the first live refresh when the restored snapshot is already stale
+SNAPSHOT_REFRESH_DELAY_SECONDS = 30
+
 # Nordigen API Error Constants
 ERROR_INVALID_CREDENTIALS = "invalid_credentials"
 ERROR_NO_LINKED_ACCOUNTS = "no_linked_accounts"
 ERROR_EXPIRED_REQUISITION = "expired_requisition"
 ERROR_API_FAILURE = "api_failure"
 ERROR_INVALID_REQUISITION = "invalid_requisition"
+ERROR_NO_INSTITUTIONS = "no_institutions"
@@ -1,19 +1,145 @@
+import asyncio
 import logging
-from datetime import timedelta
-from typing import Optional, Dict, Any, List
+import math
+import random
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Optional, Dict, Any, Callable, Iterable, List, Mapping, Set, Tuple
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.helpers.event import async_call_later
-from homeassistant.components.persistent_notification import async_create
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.components.persistent_notification import async_create, async_dismiss
 from homeassistant.config_entries import ConfigEntry
-from nordigen_account import BankAccount
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, UPDATE_INTERVAL_HOURS
-from .nordigen_wrapper import NordigenWrapper, NordigenAPIError
+from .const import (
+    DOMAIN,
+    UPDATE_INTERVAL_HOURS,
+    CONF_ACCESS_TOKEN,
+    CONF_ACCESS_EXPIRES_AT,
+    CONF_REFRESH_TOKEN,
+    CONF_REFRESH_EXPIRES_AT,
+    CONF_REQUISITION_ID,
+    CONF_REQUISITION_IDS,
+    CONF_SECRET_ID,
+    CONF_SECRET_KEY,
+    CONF_MAX_CONCURRENCY,
+    CONF_METADATA_TTL_HOURS,
+    CONF_SYNC_TRANSACTIONS,
+    CONF_BASE_CURRENCY,
+    CONF_REQUEST_TIMEOUT,
+    CONF_SYNC_DAEMON_URL,
+    CONF_SYNC_DAEMON_TOKEN,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_METADATA_TTL_HOURS,
+    EVENT_REQUISITION_EXPIRED,
+    EVENT_REQUISITION_EXPIRING,
+    EXPIRY_WARNING_DAYS,
+    MIN_UPDATE_INTERVAL_MINUTES,
+    REFRESH_DEADLINE_SECONDS,
+    REQUEST_TIMEOUT_SECONDS,
+    ROLLING_WINDOWS,
+    STARTUP_JITTER_MINUTES,
+    STORAGE_VERSION,
+    STORAGE_KEY_METADATA,
+    STORAGE_KEY_QUOTA,
+    STORAGE_KEY_SNAPSHOT,
+    STORAGE_KEY_EXCHANGE_RATES,
+    STORAGE_KEY_ROLLING,
+    STORAGE_KEY_POSTING,
+    SNAPSHOT_REFRESH_DELAY_SECONDS,
+    SYNC_DAEMON_POLL_SECONDS,
+    TRANSACTIONS_DB_FILENAME,
+)
+from .aggregates import AggregateKey, AggregateTotal, compute_aggregates, diff_aggregates, institutions_by_account
+from .exchange_rates import ExchangeRateTable
+from .nordigen_client import retry_after
+from .nordigen_wrapper import AccountResult, NordigenWrapper, NordigenAPIError
+from .posting_schedule import PostingSchedule, next_fetch_time
+from .quota import QuotaLedger
+from .rolling import RollingTotals
+from .snapshot import AccountSnapshot, AccountsSnapshot, BalanceSnapshot
+from .statistics import BalanceStatisticsImporter, balance_points, history_points
+from .sync_client import SyncDaemonClient
+from .transactions import TransactionStore
 
 _LOGGER = logging.getLogger(__name__)
 
+# Delay before cached data is written to disk, so bursts of changes are batched
+METADATA_SAVE_DELAY_SECONDS = 10
+QUOTA_SAVE_DELAY_SECONDS = 10
+SNAPSHOT_SAVE_DELAY_SECONDS = 10
+
+
+def requisition_ids_from_entry_data(data: Dict[str, Any]) -> List[str]:
+    """
+    Get the requisition IDs managed by a config entry.
+
+    Entries created before several requisitions were supported only hold a single ID.
+
+    Args:
+        data (Dict[str, Any]): The config entry data.
+
+    Returns:
+        List[str]: The requisition IDs.
+    """
+    requisition_ids = data.get(CONF_REQUISITION_IDS)
+    if requisition_ids:
+        return list(requisition_ids)
+    return [data[CONF_REQUISITION_ID]] if data.get(CONF_REQUISITION_ID) else []
+
+
+def entry_settings(data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Get the settings of a config entry that only take effect when the entry is set up.
+
+    The tokens are left out, since the coordinator stores new ones in the entry by itself.
+
+    Args:
+        data (Dict[str, Any]): The config entry data.
+
+    Returns:
+        Tuple[Any, ...]: The credentials, requisition IDs and options.
+    """
+    return (
+        data.get(CONF_SECRET_ID),
+        data.get(CONF_SECRET_KEY),
+        requisition_ids_from_entry_data(data),
+        data.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+        data.get(CONF_METADATA_TTL_HOURS, DEFAULT_METADATA_TTL_HOURS),
+        data.get(CONF_SYNC_TRANSACTIONS, False),
+        data.get(CONF_BASE_CURRENCY) or None,
+        data.get(CONF_REQUEST_TIMEOUT, REQUEST_TIMEOUT_SECONDS),
+        data.get(CONF_SYNC_DAEMON_URL) or None,
+        data.get(CONF_SYNC_DAEMON_TOKEN) or None,
+    )
+
+
+def diff_balance_index(
+        old: Mapping[Tuple[str, str], BalanceSnapshot], new: Mapping[Tuple[str, str], BalanceSnapshot]
+) -> Set[Tuple[str, str]]:
+    """
+    Find the balances that were added, removed or changed between two refreshes.
+
+    Args:
+        old (Mapping[Tuple[str, str], BalanceSnapshot]): The balances of the previous refresh.
+        new (Mapping[Tuple[str, str], BalanceSnapshot]): The balances of the current refresh.
+
+    Returns:
+        Set[Tuple[str, str]]: The keys whose amount or currency differ.
+    """
+    return {
+        key for key in old.keys() | new.keys()
+        if key not in old or key not in new
+        or (old[key].amount, old[key].currency) != (new[key].amount, new[key].currency)
+    }
+
 
 class NordigenDataUpdateCoordinator(DataUpdateCoordinator):
     """Coordinator for fetching and managing Nordigen account data in Home Assistant."""
@@ -38,135 +164,945 @@ class NordigenDataUpdateCoordinator(DataUpdateCoordinator):
         _LOGGER.warning("Type of self.entry: %s", type(self.entry))
 
         self.wrapper: Optional[NordigenWrapper] = None  # Initialize as None
+        self._metadata_store: Store = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_METADATA}.{self.entry.entry_id}"
+        )
+        self.quota: QuotaLedger = QuotaLedger()
+        self._quota_store: Store = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_QUOTA}.{self.entry.entry_id}"
+        )
+        self._snapshot_store: Store = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_SNAPSHOT}.{self.entry.entry_id}"
+        )
+        self.posting: PostingSchedule = PostingSchedule(tz=dt_util.DEFAULT_TIME_ZONE)
+        self._posting_store: Store = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_POSTING}.{self.entry.entry_id}"
+        )
+        self._startup_jitter_pending: bool = True
+        self.error_counts: Dict[int, int] = {}
+        self.failed_accounts: Set[str] = set()
+        self._entry_settings: Tuple[Any, ...] = entry_settings(self.entry.data)
+        self._scheduled_expiries: Dict[str, float] = {}
+        self._unsub_expiry_warnings: List[Callable[[], None]] = []
+        self._notified_expired: Set[str] = set()
+        self._pending_accounts: Set[str] = set()
+        self._inflight_accounts: Set[str] = set()
+        self._targeted_refresh: Optional[asyncio.Task] = None
+        self.data: Optional[AccountsSnapshot] = None
+        self.changed_balance_keys: Set[Tuple[str, str]] = set()
+        self.base_currency: Optional[str] = self.entry.data.get(CONF_BASE_CURRENCY) or None
+        self.exchange_rates: Optional[ExchangeRateTable] = None
+        self._exchange_rates_store: Store = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_EXCHANGE_RATES}.{self.entry.entry_id}"
+        )
+        self.aggregates: Mapping[AggregateKey, AggregateTotal] = {}
+        self.changed_aggregate_keys: Set[AggregateKey] = set()
+        self.statistics: Optional[BalanceStatisticsImporter] = None
+        if "recorder" in hass.config.components:
+            self.statistics = BalanceStatisticsImporter(hass, self.entry.entry_id)
+        self.transaction_store: Optional[TransactionStore] = None
+        self.rolling: Optional[RollingTotals] = None
+        self.changed_rolling_accounts: Set[str] = set()
+        self._rolling_store: Store = Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_ROLLING}.{self.entry.entry_id}"
+        )
+        self.io_executor: Optional[ThreadPoolExecutor] = None
+        self.daemon: Optional[SyncDaemonClient] = None
+        # Entries reading from a sync daemon make no API calls, so they cannot sync transactions
+        if self.entry.data.get(CONF_SYNC_TRANSACTIONS, False) and not self.entry.data.get(CONF_SYNC_DAEMON_URL):
+            self.transaction_store = TransactionStore(
+                hass.config.path(TRANSACTIONS_DB_FILENAME.format(entry_id=self.entry.entry_id))
+            )
+            self.rolling = RollingTotals()
+            # The transaction database gets its own threads, so a slow disk only holds up this entry
+            self.io_executor = ThreadPoolExecutor(
+                max_workers=self.entry.data.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+                thread_name_prefix=f"{DOMAIN}_{self.entry.entry_id}",
+            )
 
     async def async_initialize(self, hass: HomeAssistant) -> None:
         """
-        Initialize the Nordigen API wrapper asynchronously.
+        Create the Nordigen API wrapper on Home Assistant's shared aiohttp session.
+
+        No API calls are made here; the wrapper authenticates and looks up the requisitions on the
+        first refresh. Cached account details and the quota ledger are loaded from disk.
 
         Args:
             hass (HomeAssistant): The Home Assistant instance.
-
-        Raises:
-            NordigenAPIError: If the API authentication or requisition retrieval fails.
         """
         secret_id: str = self.entry.data["secret_id"]
         secret_key: str = self.entry.data["secret_key"]
-        requisition_id: str = self.entry.data["requisition_id"]
+        requisition_ids: List[str] = requisition_ids_from_entry_data(self.entry.data)
         refresh_token: Optional[str] = self.entry.data.get("refresh_token")
+        max_concurrency: int = self.entry.data.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)
+        metadata_ttl_hours: float = self.entry.data.get(CONF_METADATA_TTL_HOURS, DEFAULT_METADATA_TTL_HOURS)
 
-        _LOGGER.warning("Refresh Token: %s", refresh_token)
-
-        self.wrapper = await hass.async_add_executor_job(
-            NordigenWrapper,
+        self.wrapper = NordigenWrapper(
+            async_get_clientsession(hass),
             secret_id,
             secret_key,
-            requisition_id,
-            refresh_token
+            requisition_ids,
+            refresh_token,
+            max_concurrency,
+            metadata_ttl_hours * 3600,
+            self.quota,
+            self.entry.data.get(CONF_ACCESS_TOKEN),
+            self.entry.data.get(CONF_ACCESS_EXPIRES_AT),
+            self.entry.data.get(CONF_REFRESH_EXPIRES_AT),
+            request_timeout=self.entry.data.get(CONF_REQUEST_TIMEOUT, REQUEST_TIMEOUT_SECONDS),
+            executor=self.io_executor,
+        )
+
+        if self.entry.data.get(CONF_SYNC_DAEMON_URL):
+            self.daemon = SyncDaemonClient(
+                async_get_clientsession(hass),
+                self.entry.data[CONF_SYNC_DAEMON_URL],
+                self.entry.data.get(CONF_SYNC_DAEMON_TOKEN) or None,
+                self.entry.data.get(CONF_REQUEST_TIMEOUT, REQUEST_TIMEOUT_SECONDS),
+            )
+
+        stored_quota = await self._quota_store.async_load()
+        if stored_quota:
+            self.quota.load(stored_quota)
+
+        stored_posting = await self._posting_store.async_load()
+        if stored_posting:
+            self.posting.load(stored_posting)
+
+        stored_metadata = await self._metadata_store.async_load()
+        if stored_metadata:
+            self.wrapper.load_metadata_cache(stored_metadata.get("accounts", {}))
+
+        if self.statistics is not None:
+            await self.statistics.async_load()
+
+        if self.rolling is not None:
+            stored_rolling = await self._rolling_store.async_load()
+            if stored_rolling:
+                self.rolling.load(stored_rolling)
+
+        if self.base_currency is not None:
+            self.exchange_rates = ExchangeRateTable(async_get_clientsession(hass))
+            stored_rates = await self._exchange_rates_store.async_load()
+            if stored_rates:
+                self.exchange_rates.load(stored_rates)
+
+        self.entry.async_on_unload(self._async_cancel_expiry_warnings)
+
+    async def async_restore_snapshot(self) -> bool:
+        """
+        Load the balances saved after the last successful refresh.
+
+        The restored accounts become the coordinator data so sensors can be created without any
+        API call, and the first live refresh is deferred until the accounts are due again
+        according to the quota ledger.
+
+        Returns:
+            bool: True if a snapshot for the configured requisitions was restored.
+        """
+        snapshot = await self._snapshot_store.async_load()
+        if not snapshot or snapshot.get("requisition_ids") != self.wrapper.requisition_ids:
+            return False
+
+        self.wrapper.restore_accounts(snapshot)
+        if not self.wrapper.accounts:
+            return False
+
+        self._async_publish_snapshot(AccountsSnapshot(self.wrapper.accounts))
+        self._async_schedule_next_refresh(SNAPSHOT_REFRESH_DELAY_SECONDS)
+        self._async_update_requisition_state()
+        _LOGGER.debug(
+            "Restored %d Nordigen accounts saved at %s", len(self.data), snapshot.get("saved_at")
         )
+        return True
+
+    @callback
+    def _async_store_tokens(self) -> None:
+        """
+        Update the tokens and their expiry in the config entry if the wrapper obtained new ones,
+        so the next start can reuse them without authenticating again.
+        """
+        token_state = self.wrapper.token_state
+        tokens = {
+            CONF_ACCESS_TOKEN: token_state["access_token"],
+            CONF_ACCESS_EXPIRES_AT: token_state["access_expires_at"],
+            CONF_REFRESH_TOKEN: token_state["refresh_token"],
+            CONF_REFRESH_EXPIRES_AT: token_state["refresh_expires_at"],
+        }
+        if all(self.entry.data.get(key) == value for key, value in tokens.items()):
+            return
+
+        _LOGGER.debug("Updating stored Nordigen tokens.")
+        self.hass.config_entries.async_update_entry(self.entry, data={**self.entry.data, **tokens})
 
-        # Ensure the refresh token is updated in Home Assistant storage if changed
-        new_refresh_token = self.wrapper.refresh_token
-        if new_refresh_token and new_refresh_token != refresh_token:
-            _LOGGER.warning("Updating stored refresh token.")
-            hass.config_entries.async_update_entry(
-                self.entry, data={**self.entry.data, "refresh_token": new_refresh_token}
+    def requires_reload(self) -> bool:
+        """
+        Check whether the config entry changed in a way that needs the entry to be set up again.
+
+        New tokens stored by the coordinator itself never need a reload; a refresh token entered
+        in the options does.
+
+        Returns:
+            bool: True if the credentials, requisitions, options or refresh token changed.
+        """
+        return (
+            entry_settings(self.entry.data) != self._entry_settings
+            or (self.entry.data.get(CONF_REFRESH_TOKEN) or None) != (self.wrapper.refresh_token or None)
+        )
+
+    @callback
+    def _async_update_requisition_state(self) -> None:
+        """
+        Warn about agreements that are about to expire and suspend polling once all have expired.
+
+        The user is notified once for every requisition that expired, and polling stops when no
+        requisition is left that can be used. It resumes when the entry is set up again with a
+        new requisition.
+        """
+        self._async_schedule_expiry_warnings()
+
+        suspended = self.wrapper.suspended_requisitions
+        for requisition_id in suspended - self._notified_expired:
+            message = (
+                f"Your Nordigen requisition {self._requisition_label(requisition_id)} has expired. "
+                "Please update it in the integration settings."
             )
+            async_dismiss(self.hass, f"nordigen_requisition_expiring_{requisition_id}")
+            async_create(
+                self.hass,
+                message,
+                title="Nordigen Integration",
+                notification_id=f"nordigen_requisition_expired_{requisition_id}",
+            )
+
+            # Fire an event so Home Assistant automations can use the message
+            self.hass.bus.async_fire(
+                EVENT_REQUISITION_EXPIRED,
+                {
+                    "entry_id": self.entry.entry_id,
+                    "requisition_id": requisition_id,
+                    "message": message,
+                },
+            )
+        self._notified_expired = suspended
+
+        if self.wrapper.suspended and self.daemon is None and self.update_interval is not None:
+            _LOGGER.warning(
+                "All Nordigen requisitions have expired, polling is suspended until a new requisition is saved"
+            )
+            self.update_interval = None
+
+    @callback
+    def async_dismiss_requisition_notifications(self) -> None:
+        """
+        Dismiss the expiry notifications of every requisition of the entry.
+        """
+        for requisition_id in self.wrapper.requisitions:
+            async_dismiss(self.hass, f"nordigen_requisition_expiring_{requisition_id}")
+            async_dismiss(self.hass, f"nordigen_requisition_expired_{requisition_id}")
+
+    async def async_shutdown(self) -> None:
+        """
+        Stop refreshing and release the threads of the transaction database and the connection to
+        the sync daemon when the entry unloads.
 
-    async def _async_update_data(self) -> list[BankAccount] | None:
+        Calls still queued on the database threads are dropped; running ones finish on their own.
+        """
+        await super().async_shutdown()
+        if self.io_executor is not None:
+            self.io_executor.shutdown(wait=False, cancel_futures=True)
+        if self.daemon is not None:
+            await self.daemon.async_close()
+
+    @callback
+    def _async_schedule_expiry_warnings(self) -> None:
+        """
+        Schedule a warning ahead of the expiry of every agreement that is still valid.
+
+        Warnings are rescheduled only when the known expiries changed. A warning whose time has
+        already passed is raised right away.
+        """
+        expiries = {
+            requisition_id: requisition["agreement_expires_at"]
+            for requisition_id, requisition in self.wrapper.requisitions.items()
+            if requisition.get("agreement_expires_at") is not None
+            and requisition_id not in self.wrapper.suspended_requisitions
+        }
+        if expiries == self._scheduled_expiries:
+            return
+
+        self._async_cancel_expiry_warnings()
+        self._scheduled_expiries = expiries
+        now = time.time()
+
+        for requisition_id, expires_at in expiries.items():
+            if expires_at <= now:
+                continue
+
+            warn_at = [expires_at - days * 86400 for days in EXPIRY_WARNING_DAYS]
+            if any(when <= now for when in warn_at):
+                self._async_warn_expiry(requisition_id)
+            for when in warn_at:
+                if when > now:
+                    self._unsub_expiry_warnings.append(
+                        async_track_point_in_utc_time(
+                            self.hass,
+                            partial(self._async_warn_expiry, requisition_id),
+                            dt_util.utc_from_timestamp(when),
+                        )
+                    )
+
+        _LOGGER.debug("Nordigen agreements expire at %s", expiries)
+
+    @callback
+    def _async_cancel_expiry_warnings(self) -> None:
+        """
+        Cancel the scheduled expiry warnings.
+        """
+        for unsub in self._unsub_expiry_warnings:
+            unsub()
+        self._unsub_expiry_warnings = []
+        self._scheduled_expiries = {}
+
+    @callback
+    def _async_warn_expiry(self, requisition_id: str, _now: Optional[datetime] = None) -> None:
+        """
+        Notify the user that the agreement of a requisition is about to expire.
+
+        Args:
+            requisition_id (str): The requisition ID.
+            _now (Optional[datetime]): The time of the scheduled call.
+        """
+        requisition = self.wrapper.requisitions.get(requisition_id)
+        if requisition is None or requisition_id in self.wrapper.suspended_requisitions:
+            return
+
+        expires_at = dt_util.utc_from_timestamp(requisition["agreement_expires_at"])
+        days_left = max(0, math.ceil((requisition["agreement_expires_at"] - time.time()) / 86400))
+        message = (
+            f"Your Nordigen requisition {self._requisition_label(requisition_id)} expires in "
+            f"{days_left} days, on {dt_util.as_local(expires_at).date().isoformat()}. "
+            "Link your bank again and update the requisition in the integration settings."
+        )
+        async_create(
+            self.hass,
+            message,
+            title="Nordigen Integration",
+            notification_id=f"nordigen_requisition_expiring_{requisition_id}",
+        )
+        self.hass.bus.async_fire(
+            EVENT_REQUISITION_EXPIRING,
+            {
+                "entry_id": self.entry.entry_id,
+                "requisition_id": requisition_id,
+                "expires_at": expires_at.isoformat(),
+                "days_left": days_left,
+                "message": message,
+            },
+        )
+
+    def _requisition_label(self, requisition_id: str) -> str:
+        """
+        Get a readable name for a requisition.
+
+        Args:
+            requisition_id (str): The requisition ID.
+
+        Returns:
+            str: The reference and institution of the requisition, or its ID if they are unknown.
+        """
+        requisition = self.wrapper.requisitions.get(requisition_id, {})
+        if requisition.get("reference") and requisition.get("institution_id"):
+            return f"{requisition['reference']} ({requisition['institution_id']})"
+        return requisition_id
+
+    @callback
+    def _async_save_snapshot(self) -> None:
+        """
+        Schedule writing the last known accounts and balances to disk.
+        """
+        self._snapshot_store.async_delay_save(
+            lambda: {**self.wrapper.accounts_snapshot(), "saved_at": time.time()},
+            SNAPSHOT_SAVE_DELAY_SECONDS,
+        )
+
+    @callback
+    def async_invalidate_account_metadata(self, account_id: str) -> None:
+        """
+        Drop the cached details of an account so they are requested on the next refresh.
+
+        Args:
+            account_id (str): The account ID.
+        """
+        if self.wrapper is None:
+            return
+
+        _LOGGER.debug("Invalidating cached details for account %s", account_id)
+        self.wrapper.invalidate_metadata(account_id)
+        self._async_save_metadata()
+
+    @callback
+    def _async_save_metadata(self) -> None:
+        """
+        Schedule writing the cached account details to disk.
+        """
+        self._metadata_store.async_delay_save(
+            lambda: {"accounts": self.wrapper.metadata_cache}, METADATA_SAVE_DELAY_SECONDS
+        )
+
+    @callback
+    def _async_save_quota(self) -> None:
+        """
+        Schedule writing the quota ledger to disk.
+        """
+        self._quota_store.async_delay_save(self.quota.as_dict, QUOTA_SAVE_DELAY_SECONDS)
+
+    def next_fetch_time(self, account_id: str, now: float) -> float:
+        """
+        Get the time at which an account is due for its next balances call.
+
+        The time follows the learned posting schedule of the account and its remaining quota.
+        Accounts with an open circuit are due when their cool-off ends.
+
+        Args:
+            account_id (str): The account ID.
+            now (float): The current time.
+
+        Returns:
+            float: The timestamp of the next balances call.
+        """
+        return max(
+            next_fetch_time(self.posting, self.quota, account_id, now),
+            self.wrapper.breaker.open_until(account_id) or now,
+        )
+
+    def _due_accounts(self) -> Optional[List[str]]:
+        """
+        Get the accounts a scheduled refresh should fetch.
+
+        Before the first refresh every account is fetched. Afterwards only the accounts due are,
+        and none when a refresh comes early, e.g. when requested by hand or retried after a
+        failure, so the learned schedule is not undone.
+
+        Returns:
+            Optional[List[str]]: The IDs of the accounts due within the shortest refresh interval,
+                possibly none, or None for every account.
+        """
+        if self.data is None:
+            return None
+
+        now = time.time()
+        due = [
+            acc.account_id for acc in self.wrapper.accounts
+            if not self.wrapper.is_suspended(acc.account_id)
+            and self.next_fetch_time(acc.account_id, now) <= now + MIN_UPDATE_INTERVAL_MINUTES * 60
+        ]
+        return due
+
+    @callback
+    def _async_schedule_next_refresh(self, minimum: float = MIN_UPDATE_INTERVAL_MINUTES * 60) -> None:
+        """
+        Pick the next refresh interval from the schedule of every account.
+
+        The interval is the time until the first account is due for its next balances call, so
+        the daily budget is spread over the day, or spent right after the hours an account's
+        balances usually change. Accounts of expired requisitions are left out. The first
+        interval after startup gets a random delay to keep restarts from lining up with the
+        previous schedule.
+
+        Entries reading from a sync daemon poll it at a fixed interval instead.
+
+        Args:
+            minimum (float): The shortest interval in seconds.
+        """
+        if self.daemon is not None:
+            self.update_interval = timedelta(seconds=SYNC_DAEMON_POLL_SECONDS)
+            return
+
+        now = time.time()
+        next_calls = [
+            self.next_fetch_time(acc.account_id, now)
+            for acc in self.wrapper.accounts
+            if not self.wrapper.is_suspended(acc.account_id)
+        ]
+        if not next_calls:
+            return
+
+        delay = max(minimum, min(next_calls) - now)
+        if self._startup_jitter_pending:
+            delay += random.uniform(0, STARTUP_JITTER_MINUTES * 60)
+            self._startup_jitter_pending = False
+
+        self.update_interval = timedelta(seconds=delay)
+        _LOGGER.debug("Next Nordigen refresh in %s", self.update_interval)
+
+    async def _async_sync_transactions(self) -> None:
+        """
+        Sync new transactions into the local store when transaction sync is enabled.
+
+        Failures are logged and do not fail the balance refresh.
+        """
+        if self.transaction_store is None:
+            return
+
+        try:
+            await self._async_seed_rolling_totals()
+            changed = await self.wrapper.async_sync_transactions(self.transaction_store, rolling=self.rolling)
+        except NordigenAPIError as e:
+            _LOGGER.warning("Failed to sync Nordigen transactions: %s", e)
+            return
+        except asyncio.TimeoutError:
+            _LOGGER.warning("The local Nordigen transaction store did not answer in time, skipping the sync")
+            return
+        except (sqlite3.Error, OSError) as e:
+            _LOGGER.warning("The local Nordigen transaction store failed, skipping the sync: %s", e)
+            return
+        finally:
+            self._rolling_store.async_delay_save(self.rolling.as_dict, SNAPSHOT_SAVE_DELAY_SECONDS)
+
+        _LOGGER.debug("Synced Nordigen transactions, rows changed per account: %s", changed)
+
+    async def _async_seed_rolling_totals(self) -> None:
+        """
+        Fill the spend and income windows of accounts that are not tracked yet.
+
+        This happens once per account, when transactions were synced before the rolling totals
+        were kept; later refreshes only add the fetched transactions. The windows are moved to
+        the current day first. An account whose stored transactions cannot be read is left
+        untracked and seeded again on the next refresh, without holding up the others.
+        """
+        self.rolling.advance(dt_util.now().date())
+        missing = [acc.account_id for acc in self.wrapper.accounts if acc.account_id not in self.rolling.accounts]
+        if not missing:
+            return
+
+        date_from = (dt_util.now().date() - timedelta(days=max(ROLLING_WINDOWS.values()))).isoformat()
+        seeded = 0
+        for account_id in missing:
+            try:
+                transactions = await self.wrapper.async_run_in_executor(
+                    self.transaction_store.get_booked_transactions, account_id, date_from
+                )
+            except (sqlite3.Error, OSError, asyncio.TimeoutError) as e:
+                _LOGGER.warning("Failed to read the stored transactions of account %s: %r", account_id, e)
+                continue
+            self.rolling.add(account_id, transactions)
+            seeded += 1
+        _LOGGER.debug("Seeded spend and income totals of %d accounts from the local store", seeded)
+
+    async def _async_import_statistics(self, accounts: List[AccountSnapshot]) -> None:
+        """
+        Import the refreshed balances into the recorder's long-term statistics.
+
+        When transactions are synced, the balances reported with the transactions booked since
+        the last import are backfilled as well. Failures are logged and do not fail the refresh.
+
+        Args:
+            accounts (List[AccountSnapshot]): The refreshed accounts.
+        """
+        if self.statistics is None:
+            return
+
+        now = dt_util.utcnow()
+        try:
+            for acc in accounts:
+                points = balance_points(acc, now)
+                if self.transaction_store is not None:
+                    since = self.statistics.last_imported(
+                        acc.account_id, [point.balance_type for point in points]
+                    )
+                    transactions = await self.wrapper.async_run_in_executor(
+                        self.transaction_store.get_booked_transactions,
+                        acc.account_id,
+                        since.date().isoformat() if since else None,
+                    )
+                    points += history_points(transactions)
+
+                queued = self.statistics.async_import(acc, points)
+                _LOGGER.debug("Queued %d balance statistics for account %s", queued, acc.account_id)
+        except Exception:
+            _LOGGER.exception("Failed to import Nordigen balance statistics")
+
+    @property
+    def balance_index(self) -> Mapping[Tuple[str, str], BalanceSnapshot]:
+        """
+        Get the published balances keyed by account ID and balance type.
+        """
+        return self.data.balances if self.data is not None else {}
+
+    @callback
+    def _async_publish_snapshot(self, snapshot: AccountsSnapshot) -> AccountsSnapshot:
+        """
+        Replace the published snapshot and record which balances changed.
+
+        Sensors only ever read the published snapshot, so they see the balances of one refresh
+        or the next, never a mix of both.
+
+        Args:
+            snapshot (AccountsSnapshot): The new snapshot.
+
+        Returns:
+            AccountsSnapshot: The published snapshot.
+        """
+        aggregates = compute_aggregates(
+            snapshot,
+            institutions_by_account(self.wrapper.requisitions, (acc.account_id for acc in snapshot)),
+            self.base_currency,
+            self.exchange_rates.convert if self.exchange_rates is not None else None,
+        )
+        if self.rolling is not None:
+            self.rolling.advance(dt_util.now().date())
+            self.rolling.retain(acc.account_id for acc in snapshot)
+            self.changed_rolling_accounts = self.rolling.pop_changed()
+        self.changed_balance_keys = diff_balance_index(self.balance_index, snapshot.balances)
+        self.changed_aggregate_keys = diff_aggregates(self.aggregates, aggregates)
+        self.data = snapshot
+        self.aggregates = aggregates
+        return snapshot
+
+    async def _async_refresh_exchange_rates(self) -> None:
+        """
+        Download the exchange rates used for totals in the base currency once they have expired.
+
+        Rates are only needed when accounts hold other currencies than the base currency.
+        """
+        if self.exchange_rates is None:
+            return
+        if all(
+                bal.currency in (None, self.base_currency)
+                for acc in self.wrapper.accounts
+                for bal in acc.balances
+        ):
+            return
+        if await self.exchange_rates.async_refresh():
+            self._exchange_rates_store.async_delay_save(
+                self.exchange_rates.as_dict, SNAPSHOT_SAVE_DELAY_SECONDS
+            )
+
+    @callback
+    def _async_record_results(self, results: Dict[str, AccountResult]) -> List[AccountSnapshot]:
+        """
+        Count the errors of the refreshed accounts and remember which ones failed.
+
+        Accounts that failed or are paused by the circuit breaker keep their previous balances,
+        but their sensors are shown as unavailable.
+
+        Args:
+            results (Dict[str, AccountResult]): The outcome of every refreshed account.
+
+        Returns:
+            List[AccountSnapshot]: The accounts that were refreshed.
+        """
+        for account_id, result in results.items():
+            if result.ok:
+                self.failed_accounts.discard(account_id)
+                continue
+
+            self.failed_accounts.add(account_id)
+            if result.error is not None and result.error.status_code is not None:
+                status = result.error.status_code
+                self.error_counts[status] = self.error_counts.get(status, 0) + 1
+
+        refreshed = [result.account for result in results.values() if result.ok]
+        self._async_observe_postings(refreshed)
+        return refreshed
+
+    @callback
+    def _async_observe_postings(self, accounts: List[AccountSnapshot]) -> None:
+        """
+        Teach the posting schedule whether the balances of the refreshed accounts changed.
+
+        Only accounts whose balances were fetched since they were last observed count, since
+        accounts without quota keep their previous balances. Changes are compared with the
+        published snapshot, before the refreshed balances replace it.
+
+        Args:
+            accounts (List[AccountSnapshot]): The refreshed accounts.
+        """
+        previous = {acc.account_id: acc for acc in self.data} if self.data is not None else {}
+        observed = [
+            self.posting.observe_account(
+                previous.get(acc.account_id), acc, self.wrapper.last_success.get(acc.account_id)
+            )
+            for acc in accounts
+        ]
+        if any(observed):
+            self.posting.retain(acc.account_id for acc in self.wrapper.accounts)
+            self._posting_store.async_delay_save(self.posting.as_dict, QUOTA_SAVE_DELAY_SECONDS)
+
+    @callback
+    def _async_process_accounts(self) -> AccountsSnapshot:
+        """
+        Persist the state of a successful refresh, publish its snapshot and schedule the next one.
+
+        Returns:
+            AccountsSnapshot: The published snapshot.
+        """
+        if self.wrapper.metadata_updated:
+            self._async_save_metadata()
+        self._async_save_quota()
+        self._async_save_snapshot()
+        self._async_store_tokens()
+        self._async_schedule_next_refresh()
+
+        return self._async_publish_snapshot(AccountsSnapshot(self.wrapper.accounts))
+
+    async def async_refresh_accounts(self, account_ids: Iterable[str]) -> None:
+        """
+        Refresh the given accounts now and merge their balances into the coordinator data.
+
+        Overlapping calls share one in-flight fetch: accounts that are already being fetched
+        are not requested again, and accounts requested in the meantime are fetched right after
+        by the same flight. Accounts without remaining quota keep their data, and accounts that
+        fail are marked as failed without affecting the others.
+
+        Args:
+            account_ids (Iterable[str]): The accounts to refresh.
+
+        Raises:
+            NordigenAPIError: If authentication fails, or if none of the accounts could be refreshed.
+        """
+        if self.daemon is not None:
+            snapshot = await self.daemon.async_refresh(account_ids, REFRESH_DEADLINE_SECONDS)
+            refreshed = self._async_apply_daemon_snapshot(snapshot)
+            self._async_merge_accounts(refreshed)
+            await self._async_import_statistics(refreshed)
+            return
+
+        self._pending_accounts.update(set(account_ids) - self._inflight_accounts)
+        if self._targeted_refresh is None or self._targeted_refresh.done():
+            self._targeted_refresh = self.hass.async_create_task(self._async_run_targeted_refreshes())
+        await asyncio.shield(self._targeted_refresh)
+
+    async def _async_run_targeted_refreshes(self) -> None:
+        """
+        Fetch the pending accounts until no more are requested.
+
+        Raises:
+            NordigenAPIError: If authentication fails, or if none of the accounts could be refreshed.
+        """
+        try:
+            while self._pending_accounts:
+                self._inflight_accounts, self._pending_accounts = self._pending_accounts, set()
+                results = await self.wrapper.async_update_accounts(self._inflight_accounts)
+                refreshed = self._async_record_results(results)
+                self._async_merge_accounts(refreshed)
+                await self._async_import_statistics(refreshed)
+        finally:
+            self._inflight_accounts = set()
+            self._pending_accounts = set()
+
+    @callback
+    def _async_merge_accounts(self, accounts: List[AccountSnapshot]) -> None:
+        """
+        Persist the state of a targeted refresh and publish the balances of the refreshed accounts.
+
+        Args:
+            accounts (List[AccountSnapshot]): The refreshed accounts.
+        """
+        if self.wrapper.metadata_updated:
+            self._async_save_metadata()
+        self._async_save_quota()
+        self._async_save_snapshot()
+        self._async_store_tokens()
+
+        self._async_publish_snapshot(AccountsSnapshot(self.wrapper.accounts))
+        self._async_update_requisition_state()
+        _LOGGER.debug("Merged %d refreshed Nordigen accounts", len(accounts))
+        self.async_update_listeners()
+
+    async def _async_publish_results(self, results: Dict[str, AccountResult]) -> AccountsSnapshot:
+        """
+        Publish the outcome of a full refresh.
+
+        Args:
+            results (Dict[str, AccountResult]): The outcome of every account.
+
+        Returns:
+            AccountsSnapshot: The published snapshot.
+
+        Raises:
+            UpdateFailed: If every account is paused by the circuit breaker.
+        """
+        refreshed = self._async_record_results(results)
+        self._async_update_requisition_state()
+        if not refreshed:
+            self._async_schedule_next_refresh()
+            raise UpdateFailed("All Nordigen accounts are paused after repeated failures")
+
+        await self._async_sync_transactions()
+        await self._async_refresh_exchange_rates()
+        snapshot = self._async_process_accounts()
+        await self._async_import_statistics(refreshed)
+        _LOGGER.debug(
+            "Nordigen updated coordinator data for %d accounts, %d failed",
+            len(refreshed),
+            len(results) - len(refreshed),
+        )
+        return snapshot
+
+    async def _async_update_from_daemon(self) -> Optional[AccountsSnapshot]:
+        """
+        Publish the snapshot served by the sync daemon if it changed since the last poll.
+
+        No API calls are made: the daemon refreshes the accounts for every instance reading
+        from it, and an unchanged snapshot costs a single 304 response.
+
+        Returns:
+            Optional[AccountsSnapshot]: The published snapshot.
+
+        Raises:
+            UpdateFailed: If the daemon cannot be reached or serves none of the entry's requisitions.
+        """
+        try:
+            snapshot = await self.daemon.async_get_snapshot()
+            if snapshot is None:
+                return self.data
+            refreshed = self._async_apply_daemon_snapshot(snapshot)
+        except NordigenAPIError as e:
+            _LOGGER.warning("Nordigen sync daemon issue encountered: %s", e)
+            raise UpdateFailed(f"Nordigen sync daemon update failed: {e}")
+
+        self._async_update_requisition_state()
+        await self._async_refresh_exchange_rates()
+        snapshot = self._async_process_accounts()
+        await self._async_import_statistics(refreshed)
+        _LOGGER.debug("Published snapshot version %s of the Nordigen sync daemon", self.daemon.version)
+        return snapshot
+
+    @callback
+    def _async_apply_daemon_snapshot(self, snapshot: Dict[str, Any]) -> List[AccountSnapshot]:
+        """
+        Take over the requisitions and accounts of the entry from a snapshot of the sync daemon.
+
+        The daemon may serve the requisitions of several entries; only the ones of this entry
+        are used. Accounts the daemon failed to refresh are marked as failed here as well.
+
+        Args:
+            snapshot (Dict[str, Any]): The snapshot served by the daemon.
+
+        Returns:
+            List[AccountSnapshot]: The accounts whose balances the daemon fetched since the last snapshot.
+
+        Raises:
+            NordigenAPIError: If the daemon serves none of the entry's requisitions.
+        """
+        requisitions = {
+            requisition_id: requisition
+            for requisition_id, requisition in snapshot.get("requisitions", {}).items()
+            if requisition_id in self.wrapper.requisition_ids
+        }
+        if not requisitions:
+            raise NordigenAPIError(message="The sync daemon serves none of the requisitions of this entry")
+
+        account_ids = {
+            account_id for requisition in requisitions.values() for account_id in requisition.get("accounts", [])
+        }
+        previous = dict(self.wrapper.last_success)
+        self.wrapper.restore_accounts(
+            {
+                "requisitions": requisitions,
+                "accounts": [acc for acc in snapshot.get("accounts", []) if acc["account_id"] in account_ids],
+            }
+        )
+        self.failed_accounts = set(snapshot.get("failed_accounts", [])) & account_ids
+        return [
+            acc for acc in self.wrapper.accounts
+            if self.wrapper.last_success.get(acc.account_id) != previous.get(acc.account_id)
+        ]
+
+    async def _async_update_data(self) -> Optional[AccountsSnapshot]:
         """
         Fetch updated account data from Nordigen.
 
         This method retrieves account balances and handles rate limits, expired requisitions,
-        and missing accounts. It schedules retries in case of temporary API failures.
+        and missing accounts. It schedules retries in case of temporary API failures. Accounts
+        without remaining daily quota, counted locally or reported in the API's rate-limit
+        headers, are skipped. Only the accounts that are due are fetched, a refresh with no
+        account due keeps the current data without calling the API, and the next refresh is
+        scheduled from the remaining quota and learned posting hours of every account. An
+        account that fails keeps its previous balances and only its own sensors become
+        unavailable; the refresh fails when no account could be refreshed. Once every
+        requisition has expired, polling is suspended and no API calls are made; when that is
+        found out by the first refresh after startup, an empty snapshot is published so the
+        setup completes without accounts. Entries set up
+        to read from a sync daemon take its snapshot instead and never call the API.
 
         Returns:
-            Optional[Dict[str, Any]]: A dictionary containing updated account data, or None if an error occurs.
+            Optional[AccountsSnapshot]: The snapshot of the refreshed accounts, or None if an error occurs.
 
         Raises:
             UpdateFailed: If there is an issue retrieving data from the Nordigen API.
         """
+        self.changed_balance_keys = set()
+        self.changed_aggregate_keys = set()
+        self.changed_rolling_accounts = set()
+        if self.daemon is not None:
+            return await self._async_update_from_daemon()
+        if self.wrapper.suspended:
+            raise UpdateFailed("All Nordigen requisitions have expired. Update them in the integration settings.")
+
         _LOGGER.warning("Nordigen is retrieving accounts!")
 
         # Debug log for self.entry type
         _LOGGER.warning("Type of self.entry inside _async_update_data: %s", type(self.entry))
 
+        due = self._due_accounts()
+        if due is not None and not due:
+            _LOGGER.debug("No Nordigen account is due yet, keeping the current data")
+            self._async_schedule_next_refresh()
+            return self.data
+
         try:
-            await self.hass.async_add_executor_job(self.wrapper.update_all_accounts)
-            _LOGGER.warning("Nordigen retrieved accounts: %s", self.wrapper.accounts)
+            results = await self.wrapper.async_update_accounts(due)
+            _LOGGER.debug("Nordigen retrieved %d accounts", len(results))
 
-            if not self.wrapper.accounts:
+            if not results:
                 _LOGGER.warning("No accounts found in Nordigen API response.")
                 raise UpdateFailed("No accounts found. Ensure bank authorization is complete.")
 
-            self.data = self.wrapper.accounts
-            _LOGGER.warning("Nordigen updated coordinator data: %s", self.data)
-            return self.data
+            return await self._async_publish_results(results)
 
         except NordigenAPIError as e:
             _LOGGER.warning("Nordigen API issue encountered: %s", e)
+            self._async_save_quota()
+            if e.status_code is not None:
+                self.error_counts[e.status_code] = self.error_counts.get(e.status_code, 0) + 1
 
             # ✅ Handle Token Expiry (401 Unauthorized)
             if e.status_code == 401:
                 _LOGGER.warning("Nordigen access token expired. Attempting refresh...")
 
                 try:
-                    await self.hass.async_add_executor_job(self.wrapper.refresh_access_token)
-                    new_refresh_token = self.wrapper.refresh_token
-                    _LOGGER.warning("New refresh token obtained: %s", new_refresh_token)
-
-                    # Update stored token
-                    self.hass.config_entries.async_update_entry(
-                        self.entry, data={**self.entry.data, "refresh_token": new_refresh_token}
-                    )
+                    await self.wrapper.async_refresh_access_token()
+                    self._async_store_tokens()
 
                     # Retry the request with the new token
-                    await self.hass.async_add_executor_job(self.wrapper.update_all_accounts)
-                    self.data = self.wrapper.accounts
-                    return self.data
+                    results = await self.wrapper.async_update_accounts(due)
+                    return await self._async_publish_results(results)
 
                 except NordigenAPIError as refresh_error:
                     _LOGGER.error("Failed to refresh Nordigen token: %s", refresh_error)
                     raise UpdateFailed("Nordigen API authentication failed")
 
-            # Handle Rate Limit (429 Too Many Requests)
+            # Handle Rate Limit (429 Too Many Requests). Account endpoints that run out of budget
+            # are skipped by the wrapper, so this is a limit on the token or requisition endpoints.
             if e.status_code == 429:
-                wait_time = int(e.response_body.get("detail", "").split()[-2])  # Extract wait time from API response
+                wait_time = max(retry_after(e.response_body), MIN_UPDATE_INTERVAL_MINUTES * 60)
                 _LOGGER.warning("Rate limit exceeded. Next update in %d seconds.", wait_time)
 
-                # Prevent scheduled updates from triggering before wait_time elapses
+                # Only the next refresh is delayed; the next successful refresh schedules the
+                # following ones from the quota again
                 self.update_interval = timedelta(seconds=wait_time)
 
-                async_call_later(
-                    self.hass,
-                    wait_time,
-                    lambda _: self.async_request_refresh()
-                )
-
-                return None  # Ensures HA does not retry immediately
-
-            # Handle Expired Requisition
+            # Handle Expired Requisition: the wrapper suspended the expired requisitions
             elif e.status_code == 428:
-                message = "Your Nordigen requisition ID has expired. Please update it in the integration settings."
-
-                async_create(
-                    self.hass,
-                    message,
-                    title="Nordigen Integration",
-                    notification_id="nordigen_requisition_expired"
-                )
-
-                # Debug log before firing the event
-                _LOGGER.warning("Checking self.entry before async_fire: %s", self.entry.data)
-                _LOGGER.warning("Type of self.entry before async_fire: %s", type(self.entry))
-
-                # Fire an event so Home Assistant automations can use the message
-                self.hass.bus.async_fire(
-                    "nordigen_requisition_expired",
-                    {
-                        "entry_id": self.entry.entry_id,
-                        "message": message
-                    }
-                )
+                self._async_update_requisition_state()
+                if self.data is None and self.wrapper.suspended:
+                    # Nothing was restored at startup: finish the setup without accounts rather
+                    # than have Home Assistant retry it against the expired requisitions
+                    self._async_store_tokens()
+                    return self._async_publish_snapshot(AccountsSnapshot([]))
 
             # Handle No Accounts Found
             elif e.status_code == 410:
@@ -174,6 +1110,10 @@ class NordigenDataUpdateCoordinator(DataUpdateCoordinator):
 
             raise UpdateFailed(f"Nordigen API update failed: {e}")
 
+        except UpdateFailed:
+            raise
+
         except Exception:
             _LOGGER.exception("Unexpected error updating Nordigen data")
             raise UpdateFailed("Error updating from Nordigen")
+
@@ -0,0 +1,121 @@
+import time
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    CONF_SECRET_ID,
+    CONF_SECRET_KEY,
+    CONF_REFRESH_TOKEN,
+    CONF_ACCESS_TOKEN,
+    CONF_SYNC_DAEMON_TOKEN,
+    CONF_REQUISITION_ID,
+)
+from .coordinator import NordigenDataUpdateCoordinator
+
+TO_REDACT = {
+    CONF_SECRET_ID, CONF_SECRET_KEY, CONF_REFRESH_TOKEN, CONF_ACCESS_TOKEN, CONF_SYNC_DAEMON_TOKEN, "access", "refresh",
+    CONF_REQUISITION_ID, "account_id", "agreement", "id", "link", "iban",
+}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    """
+    Return diagnostics for a config entry.
+
+    Includes the API call measurements collected since setup, so polling and concurrency can be
+    tuned from data. Credentials, tokens and links are redacted, and account and requisition IDs
+    are replaced by labels that stay the same throughout the report.
+
+    Args:
+        hass (HomeAssistant): The Home Assistant instance.
+        entry (ConfigEntry): The configuration entry.
+
+    Returns:
+        Dict[str, Any]: The diagnostics data.
+    """
+    coordinator: NordigenDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    wrapper = coordinator.wrapper
+    now = time.time()
+    labels = _id_labels(coordinator)
+
+    return _pseudonymize({
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": str(coordinator.update_interval),
+            "error_counts": {str(status): count for status, count in coordinator.error_counts.items()},
+            "base_currency": coordinator.base_currency,
+            "exchange_rates_date": (
+                coordinator.exchange_rates.rates_date if coordinator.exchange_rates is not None else None
+            ),
+            "totals": len(coordinator.aggregates),
+            "sync_daemon_version": coordinator.daemon.version if coordinator.daemon is not None else None,
+        },
+        "token_refresh_count": wrapper.token_refresh_count,
+        "metrics": wrapper.metrics.as_dict(),
+        "requisitions": async_redact_data(wrapper.requisitions, TO_REDACT),
+        "accounts": {
+            acc.account_id: {
+                "status": acc.status,
+                "currency": acc.currency,
+                "balance_types": [balance.balance_type for balance in acc.balances],
+                "failed": acc.account_id in coordinator.failed_accounts,
+                "last_success": (
+                    dt_util.utc_from_timestamp(wrapper.last_success[acc.account_id]).isoformat()
+                    if acc.account_id in wrapper.last_success
+                    else None
+                ),
+                "posting_schedule_trained": coordinator.posting.trained(acc.account_id),
+                "next_fetch": dt_util.utc_from_timestamp(
+                    coordinator.next_fetch_time(acc.account_id, now)
+                ).isoformat(),
+            }
+            for acc in wrapper.accounts
+        },
+        "quota": coordinator.quota.as_dict(),
+        "circuit_breaker": wrapper.breaker.as_dict(),
+    }, labels)
+
+
+def _id_labels(coordinator: NordigenDataUpdateCoordinator) -> Dict[str, str]:
+    """
+    Number the requisitions and accounts of a config entry.
+
+    Args:
+        coordinator (NordigenDataUpdateCoordinator): The coordinator of the config entry.
+
+    Returns:
+        Dict[str, str]: The label of every requisition and account ID.
+    """
+    wrapper = coordinator.wrapper
+    requisition_ids = dict.fromkeys([*wrapper.requisition_ids, *wrapper.requisitions])
+    account_ids = dict.fromkeys([*(acc.account_id for acc in wrapper.accounts), *wrapper.account_requisitions])
+    return {
+        **{requisition_id: f"requisition_{index}" for index, requisition_id in enumerate(requisition_ids, 1)},
+        **{account_id: f"account_{index}" for index, account_id in enumerate(account_ids, 1)},
+    }
+
+
+def _pseudonymize(data: Any, labels: Dict[str, str]) -> Any:
+    """
+    Replace the IDs found in diagnostics data, as keys or values, by their labels.
+
+    Args:
+        data (Any): The diagnostics data.
+        labels (Dict[str, str]): The label of every ID.
+
+    Returns:
+        Any: A copy of the data with the IDs replaced.
+    """
+    if isinstance(data, dict):
+        return {labels.get(key, key): _pseudonymize(value, labels) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_pseudonymize(value, labels) for value in data]
+    if isinstance(data, str):
+        return labels.get(data, data)
+    return data
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import time
+import xml.etree.ElementTree as ElementTree
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Optional, Tuple
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+
+from .const import (
+    EXCHANGE_RATES_URL,
+    EXCHANGE_RATE_TTL_HOURS,
+    EXCHANGE_RATE_RETRY_MINUTES,
+    REQUEST_TIMEOUT_SECONDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Currency the reference rates are quoted against
+REFERENCE_CURRENCY = "EUR"
+
+
+class ExchangeRateTable:
+    """
+    Reference exchange rates, cached on disk and fetched again once they are older than the TTL.
+
+    The rates are the daily euro reference rates of the European Central Bank; other pairs are
+    converted through the euro. Conversions only read the cached table, so totals can be
+    computed on every refresh without waiting for the network. A failed download keeps the
+    previous table and is not retried for a while.
+    """
+
+    def __init__(
+            self,
+            session: ClientSession,
+            ttl: float = EXCHANGE_RATE_TTL_HOURS * 3600,
+            url: str = EXCHANGE_RATES_URL,
+            timeout: float = REQUEST_TIMEOUT_SECONDS,
+    ) -> None:
+        """
+        Initialize an empty table.
+
+        Args:
+            session (ClientSession): The shared aiohttp session used to download the rates.
+            ttl (float): Seconds after which the rates are downloaded again.
+            url (str): URL of the reference rates in the ECB XML format.
+            timeout (float): Timeout in seconds of the download.
+        """
+        self._session: ClientSession = session
+        self._ttl: float = ttl
+        self._url: str = url
+        self._timeout: ClientTimeout = ClientTimeout(total=timeout)
+        self._rates: Dict[str, Decimal] = {}
+        self.rates_date: Optional[str] = None
+        self.fetched_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+
+    def load(self, data: Dict[str, Any]) -> None:
+        """
+        Restore the rates downloaded by a previous run.
+
+        Args:
+            data (Dict[str, Any]): The persisted table, as returned by as_dict.
+        """
+        self._rates = {currency: Decimal(rate) for currency, rate in data.get("rates", {}).items()}
+        self.rates_date = data.get("date")
+        self.fetched_at = data.get("fetched_at")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the rates, suitable for persisting.
+
+        Returns:
+            Dict[str, Any]: The rates against the euro, their date and the download time.
+        """
+        return {
+            "rates": {currency: str(rate) for currency, rate in self._rates.items()},
+            "date": self.rates_date,
+            "fetched_at": self.fetched_at,
+        }
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        """
+        Check whether the rates should be downloaded again.
+
+        Args:
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            bool: True if the table is empty or older than the TTL, and no download failed recently.
+        """
+        now = time.time() if now is None else now
+        if self._attempted_at is not None and now - self._attempted_at < EXCHANGE_RATE_RETRY_MINUTES * 60:
+            return False
+        return self.fetched_at is None or now - self.fetched_at >= self._ttl
+
+    def rate(self, currency: str, base_currency: str) -> Optional[Decimal]:
+        """
+        Get the number of units of the base currency one unit of a currency is worth.
+
+        Args:
+            currency (str): The currency to convert from.
+            base_currency (str): The currency to convert to.
+
+        Returns:
+            Optional[Decimal]: The rate, or None if either currency is not in the table.
+        """
+        if currency == base_currency:
+            return Decimal(1)
+        rates = {REFERENCE_CURRENCY: Decimal(1), **self._rates}
+        if currency not in rates or base_currency not in rates:
+            return None
+        return rates[base_currency] / rates[currency]
+
+    def convert(self, amount: Decimal, currency: str, base_currency: str) -> Optional[Decimal]:
+        """
+        Convert an amount to the base currency.
+
+        Args:
+            amount (Decimal): The amount.
+            currency (str): The currency of the amount.
+            base_currency (str): The currency to convert to.
+
+        Returns:
+            Optional[Decimal]: The converted amount, or None if there is no rate for the pair.
+        """
+        rate = self.rate(currency, base_currency)
+        return amount * rate if rate is not None else None
+
+    async def async_refresh(self) -> bool:
+        """
+        Download the rates if the cached ones have expired.
+
+        Returns:
+            bool: True if new rates were downloaded.
+        """
+        if not self.expired():
+            return False
+
+        self._attempted_at = time.time()
+        try:
+            async with self._session.get(self._url, timeout=self._timeout) as response:
+                response.raise_for_status()
+                body = await response.text()
+            rates_date, rates = _parse_reference_rates(body)
+        except (ClientError, asyncio.TimeoutError, ElementTree.ParseError, InvalidOperation, ValueError) as e:
+            _LOGGER.warning("Failed to download exchange rates, keeping the cached ones: %s", e)
+            return False
+
+        self._rates = rates
+        self.rates_date = rates_date
+        self.fetched_at = self._attempted_at
+        self._attempted_at = None
+        _LOGGER.debug("Downloaded %d exchange rates dated %s", len(rates), rates_date)
+        return True
+
+
+def _parse_reference_rates(body: str) -> Tuple[Optional[str], Dict[str, Decimal]]:
+    """
+    Parse the euro reference rates from the ECB XML format.
+
+    Args:
+        body (str): The XML document.
+
+    Returns:
+        Tuple[Optional[str], Dict[str, Decimal]]: The date of the rates and the rates keyed by currency.
+
+    Raises:
+        ValueError: If the document holds no rates.
+    """
+    rates_date: Optional[str] = None
+    rates: Dict[str, Decimal] = {}
+    for element in ElementTree.fromstring(body).iter():
+        if "time" in element.attrib:
+            rates_date = element.attrib["time"]
+        if "currency" in element.attrib and "rate" in element.attrib:
+            rates[element.attrib["currency"]] = Decimal(element.attrib["rate"])
+    if not rates:
+        raise ValueError("No exchange rates in the response")
+    return rates_date, rates
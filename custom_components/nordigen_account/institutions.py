@@ -0,0 +1,226 @@
+import bisect
+import logging
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_INSTITUTIONS,
+    INSTITUTIONS_TTL_HOURS,
+    STORAGE_VERSION,
+    STORAGE_KEY_INSTITUTIONS,
+)
+from .nordigen_client import NordigenAsyncClient
+from .nordigen_wrapper import NordigenAPIError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Delay before a downloaded catalogue is written to disk
+INSTITUTIONS_SAVE_DELAY_SECONDS = 10
+
+# Defaults used when an institution does not report its limits
+DEFAULT_TRANSACTION_TOTAL_DAYS = 90
+DEFAULT_ACCESS_VALID_FOR_DAYS = 90
+
+
+class Institution(NamedTuple):
+    """A bank that accounts can be linked from."""
+
+    institution_id: str
+    name: str
+    bic: Optional[str] = None
+    transaction_total_days: int = DEFAULT_TRANSACTION_TOTAL_DAYS
+    max_access_valid_for_days: int = DEFAULT_ACCESS_VALID_FOR_DAYS
+
+
+class _CountryIndex:
+    """The institutions of one country, sorted by name, and their prefix-search index."""
+
+    __slots__ = ("institutions", "by_id", "terms")
+
+    def __init__(self, institutions: List[Institution]) -> None:
+        self.institutions: List[Institution] = sorted(institutions, key=lambda inst: inst.name.casefold())
+        self.by_id: Dict[str, Institution] = {inst.institution_id: inst for inst in self.institutions}
+        # Every word of the name, the full name, the BIC and the ID, with the position of the institution
+        terms: List[Tuple[str, int]] = []
+        for position, inst in enumerate(self.institutions):
+            words = {*inst.name.casefold().split(), inst.name.casefold(), inst.institution_id.casefold()}
+            if inst.bic:
+                words.add(inst.bic.casefold())
+            terms.extend((word, position) for word in words)
+        terms.sort()
+        self.terms: List[Tuple[str, int]] = terms
+
+
+class InstitutionCatalogue:
+    """
+    The institutions of every country a flow asked for, cached on disk and downloaded again
+    once they are older than the TTL.
+
+    The catalogue is shared by all config flows of the integration, so opening the bank picker
+    only downloads the institutions of a country when they are missing or stale. Searches use a
+    sorted index of the words of every name, so a prefix lookup costs a binary search instead of
+    a scan over thousands of institutions.
+    """
+
+    def __init__(self, hass: HomeAssistant, ttl: float = INSTITUTIONS_TTL_HOURS * 3600) -> None:
+        """
+        Initialize an empty catalogue.
+
+        Args:
+            hass (HomeAssistant): The Home Assistant instance.
+            ttl (float): Seconds after which the institutions of a country are downloaded again.
+        """
+        self.hass: HomeAssistant = hass
+        self._ttl: float = ttl
+        self._store: Store = Store(hass, STORAGE_VERSION, STORAGE_KEY_INSTITUTIONS)
+        self._countries: Dict[str, Dict[str, Any]] = {}
+        self._indexes: Dict[str, _CountryIndex] = {}
+
+    async def async_load(self) -> None:
+        """
+        Load the institutions downloaded by a previous run.
+        """
+        stored = await self._store.async_load()
+        if stored:
+            self._countries = dict(stored.get("countries", {}))
+            self._indexes = {}
+
+    def expired(self, country: str, now: Optional[float] = None) -> bool:
+        """
+        Check whether the institutions of a country should be downloaded again.
+
+        Args:
+            country (str): The ISO 3166 country code.
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            bool: True if the country was never downloaded or is older than the TTL.
+        """
+        now = time.time() if now is None else now
+        cached = self._countries.get(country)
+        return cached is None or now - cached["fetched_at"] >= self._ttl
+
+    async def async_refresh(self, client: NordigenAsyncClient, country: str) -> bool:
+        """
+        Download the institutions of a country if the cached ones have expired.
+
+        Args:
+            client (NordigenAsyncClient): An authenticated client.
+            country (str): The ISO 3166 country code.
+
+        Returns:
+            bool: True if the institutions were downloaded.
+
+        Raises:
+            NordigenAPIError: If the download fails and nothing is cached for the country.
+        """
+        if not self.expired(country):
+            return False
+
+        try:
+            response = await client.get_institutions(country)
+        except NordigenAPIError:
+            if country not in self._countries:
+                raise
+            _LOGGER.warning("Failed to download the institutions of %s, keeping the cached ones", country)
+            return False
+
+        self._countries[country] = {
+            "fetched_at": time.time(),
+            "institutions": [_institution_from_api(item) for item in response if item.get("id")],
+        }
+        self._indexes.pop(country, None)
+        self._store.async_delay_save(lambda: {"countries": self._countries}, INSTITUTIONS_SAVE_DELAY_SECONDS)
+        _LOGGER.debug("Downloaded %d institutions of %s", len(self._countries[country]["institutions"]), country)
+        return True
+
+    def get(self, country: str, institution_id: str) -> Optional[Institution]:
+        """
+        Get an institution of a country by its ID.
+
+        Args:
+            country (str): The ISO 3166 country code.
+            institution_id (str): The institution ID.
+
+        Returns:
+            Optional[Institution]: The institution, or None if it is not in the catalogue.
+        """
+        return self._index(country).by_id.get(institution_id)
+
+    def search(self, country: str, prefix: str = "", limit: Optional[int] = None) -> List[Institution]:
+        """
+        Find the institutions of a country with a word of their name, their BIC or their ID
+        starting with a prefix.
+
+        Args:
+            country (str): The ISO 3166 country code.
+            prefix (str): The prefix, matched case-insensitively; every institution matches an
+                empty prefix.
+            limit (Optional[int]): The maximum number of institutions to return.
+
+        Returns:
+            List[Institution]: The matching institutions, sorted by name.
+        """
+        index = self._index(country)
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            return index.institutions[:limit]
+
+        positions = set()
+        cursor = bisect.bisect_left(index.terms, (prefix,))
+        while cursor < len(index.terms) and index.terms[cursor][0].startswith(prefix):
+            positions.add(index.terms[cursor][1])
+            cursor += 1
+        return [index.institutions[position] for position in sorted(positions)][:limit]
+
+    def _index(self, country: str) -> _CountryIndex:
+        """
+        Get the search index of a country, building it on first use.
+        """
+        index = self._indexes.get(country)
+        if index is None:
+            cached = self._countries.get(country, {}).get("institutions", [])
+            index = self._indexes[country] = _CountryIndex([Institution(*item) for item in cached])
+        return index
+
+
+async def async_get_catalogue(hass: HomeAssistant) -> InstitutionCatalogue:
+    """
+    Get the institution catalogue shared by all flows, loading it from disk on first use.
+
+    Args:
+        hass (HomeAssistant): The Home Assistant instance.
+
+    Returns:
+        InstitutionCatalogue: The catalogue.
+    """
+    catalogue = hass.data.get(DATA_INSTITUTIONS)
+    if catalogue is None:
+        catalogue = InstitutionCatalogue(hass)
+        await catalogue.async_load()
+        hass.data[DATA_INSTITUTIONS] = catalogue
+    return catalogue
+
+
+def _institution_from_api(item: Dict[str, Any]) -> List[Any]:
+    """
+    Get the persisted form of an institution from the API response.
+
+    Args:
+        item (Dict[str, Any]): An institution as returned by the institutions endpoint.
+
+    Returns:
+        List[Any]: The fields of an Institution, in order.
+    """
+    return list(
+        Institution(
+            institution_id=item["id"],
+            name=item.get("name") or item["id"],
+            bic=item.get("bic") or None,
+            transaction_total_days=int(item.get("transaction_total_days") or DEFAULT_TRANSACTION_TOTAL_DAYS),
+            max_access_valid_for_days=int(item.get("max_access_valid_for_days") or DEFAULT_ACCESS_VALID_FOR_DAYS),
+        )
+    )
@@ -0,0 +1,177 @@
+from typing import Any, Dict, List, Optional
+
+from .const import LATENCY_BUCKETS_SECONDS
+
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram with fixed bucket bounds.
+    """
+
+    def __init__(self, bounds: List[float] = LATENCY_BUCKETS_SECONDS) -> None:
+        """
+        Initialize an empty histogram.
+
+        Args:
+            bounds (List[float]): Upper bounds of the buckets in seconds, in ascending order.
+                Slower samples are counted in an extra overflow bucket.
+        """
+        self._bounds: List[float] = list(bounds)
+        self._counts: List[int] = [0] * (len(self._bounds) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Record a sample.
+
+        Args:
+            seconds (float): The measured latency.
+        """
+        index = next(
+            (index for index, bound in enumerate(self._bounds) if seconds <= bound), len(self._bounds)
+        )
+        self._counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> Optional[float]:
+        """
+        Get the mean latency in seconds, or None if nothing was recorded.
+        """
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the histogram, suitable for diagnostics.
+
+        Returns:
+            Dict[str, Any]: The bucket counts keyed by upper bound, and the sample statistics.
+        """
+        labels = [f"<={bound}s" for bound in self._bounds] + [f">{self._bounds[-1]}s"]
+        return {
+            "buckets": dict(zip(labels, self._counts)),
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+        }
+
+
+class ClientMetrics:
+    """
+    Measurements of the calls made to the Nordigen API.
+
+    Counts calls, latencies and error statuses per endpoint, and hits and misses of the account
+    details cache. The counters live in memory and start from zero with every setup.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize empty metrics.
+        """
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.status_counts: Dict[str, int] = {}
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.deadlines_exceeded: Dict[str, int] = {}
+
+    def record_call(self, endpoint: str, seconds: float, status: Optional[int]) -> None:
+        """
+        Record a finished API call.
+
+        Args:
+            endpoint (str): The endpoint name without IDs, e.g. "accounts/balances".
+            seconds (float): The latency of the call.
+            status (Optional[int]): The HTTP status, or None if no response was received.
+        """
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+        self.latency.setdefault(endpoint, LatencyHistogram()).observe(seconds)
+
+        if status is None or status >= 400:
+            key = str(status) if status is not None else "network"
+            errors = self.errors.setdefault(endpoint, {})
+            errors[key] = errors.get(key, 0) + 1
+            self.status_counts[key] = self.status_counts.get(key, 0) + 1
+
+    def record_cache(self, hit: bool) -> None:
+        """
+        Record a lookup of the account details cache.
+
+        Args:
+            hit (bool): Whether the cached details were used instead of calling the API.
+        """
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+    def record_deadline(self, operation: str) -> None:
+        """
+        Record an account operation that was cancelled because it exceeded its deadline.
+
+        Args:
+            operation (str): The operation, e.g. "refresh" or "transactions".
+        """
+        self.deadlines_exceeded[operation] = self.deadlines_exceeded.get(operation, 0) + 1
+
+    @property
+    def total_calls(self) -> int:
+        """
+        Get the number of API calls made.
+        """
+        return sum(self.calls.values())
+
+    @property
+    def total_errors(self) -> int:
+        """
+        Get the number of API calls that failed.
+        """
+        return sum(self.status_counts.values())
+
+    @property
+    def cache_hit_ratio(self) -> Optional[float]:
+        """
+        Get the share of account details lookups served from the cache, or None if there were none.
+        """
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+
+    @property
+    def mean_latency(self) -> Optional[float]:
+        """
+        Get the mean latency of all API calls in seconds, or None if there were none.
+        """
+        count = sum(histogram.count for histogram in self.latency.values())
+        if not count:
+            return None
+        return sum(histogram.total for histogram in self.latency.values()) / count
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get all measurements, suitable for diagnostics.
+
+        Returns:
+            Dict[str, Any]: The measurements per endpoint, the cache statistics and the exceeded deadlines.
+        """
+        return {
+            "endpoints": {
+                endpoint: {
+                    "calls": self.calls[endpoint],
+                    "errors": dict(self.errors.get(endpoint, {})),
+                    "latency": self.latency[endpoint].as_dict(),
+                }
+                for endpoint in sorted(self.calls)
+            },
+            "status_counts": dict(self.status_counts),
+            "cache": {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_ratio": self.cache_hit_ratio,
+            },
+            "deadlines_exceeded": dict(self.deadlines_exceeded),
+        }
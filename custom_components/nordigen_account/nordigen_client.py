@@ -0,0 +1,425 @@
+import asyncio
+import re
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+from nordigen_account import NordigenAPIError
+
+from .const import (
+    API_BASE_URL,
+    REQUEST_TIMEOUT_SECONDS,
+    RATE_LIMIT_REMAINING_HEADERS,
+    RATE_LIMIT_RESET_HEADERS,
+)
+from .metrics import ClientMetrics
+from .quota import QuotaLedger
+
+# Wait time in the detail of a 429 response, e.g. "Expected available in 3600 seconds."
+_RETRY_AFTER_PATTERN = re.compile(r"(\d+)\s+seconds?")
+
+
+class NordigenAsyncClient:
+    """
+    Asyncio client for the GoCardless Bank Account Data (Nordigen) API.
+
+    All requests go through the given aiohttp session, so connections and TLS sessions are
+    pooled and reused between refreshes instead of being opened by a worker thread per call.
+    """
+
+    def __init__(
+            self,
+            session: ClientSession,
+            secret_id: str,
+            secret_key: str,
+            base_url: str = API_BASE_URL,
+            timeout: float = REQUEST_TIMEOUT_SECONDS,
+            metrics: Optional[ClientMetrics] = None,
+            quota: Optional[QuotaLedger] = None,
+    ) -> None:
+        """
+        Initialize the client.
+
+        Args:
+            session (ClientSession): The shared aiohttp session used for every request.
+            secret_id (str): API secret ID for authentication.
+            secret_key (str): API secret key for authentication.
+            base_url (str): Base URL of the Nordigen API.
+            timeout (float): Timeout in seconds applied to every request.
+            metrics (Optional[ClientMetrics]): Receives the latency and status of every request.
+            quota (Optional[QuotaLedger]): Receives the budget reported in the rate-limit headers
+                of every account request, successful or not.
+        """
+        self._session: ClientSession = session
+        self._secret_id: str = secret_id
+        self._secret_key: str = secret_key
+        self._base_url: str = base_url.rstrip("/")
+        self._timeout: ClientTimeout = ClientTimeout(total=timeout)
+        self._token: Optional[str] = None
+        self._metrics: Optional[ClientMetrics] = metrics
+        self._quota: Optional[QuotaLedger] = quota
+
+    @property
+    def token(self) -> Optional[str]:
+        """
+        Get the current access token.
+        """
+        return self._token
+
+    @token.setter
+    def token(self, value: Optional[str]) -> None:
+        """
+        Set the access token sent with every request.
+
+        Args:
+            value (Optional[str]): The new access token.
+        """
+        self._token = value
+
+    async def generate_token(self) -> Dict[str, Any]:
+        """
+        Generate a new access and refresh token pair from the secret ID and key.
+
+        Returns:
+            Dict[str, Any]: The token response containing "access" and "refresh" tokens.
+
+        Raises:
+            NordigenAPIError: If the API request fails.
+        """
+        response = await self.request(
+            "POST",
+            "token/new/",
+            payload={"secret_id": self._secret_id, "secret_key": self._secret_key},
+            authenticated=False,
+        )
+        self.token = response["access"]
+        return response
+
+    async def exchange_token(self, refresh_token: str) -> Dict[str, Any]:
+        """
+        Exchange a refresh token for a new access token.
+
+        Args:
+            refresh_token (str): The refresh token to exchange.
+
+        Returns:
+            Dict[str, Any]: The token response containing the new "access" token.
+
+        Raises:
+            NordigenAPIError: If the API request fails.
+        """
+        response = await self.request(
+            "POST", "token/refresh/", payload={"refresh": refresh_token}, authenticated=False
+        )
+        self.token = response["access"]
+        return response
+
+    async def get_requisition(self, requisition_id: str) -> Dict[str, Any]:
+        """
+        Retrieve a requisition and the IDs of its linked accounts.
+
+        Args:
+            requisition_id (str): The requisition ID.
+
+        Returns:
+            Dict[str, Any]: The requisition response.
+
+        Raises:
+            NordigenAPIError: If the API request fails.
+        """
+        return await self.request("GET", f"requisitions/{requisition_id}/")
+
+    async def get_agreement(self, agreement_id: str) -> Dict[str, Any]:
+        """
+        Retrieve an end user agreement.
+
+        Args:
+            agreement_id (str): The agreement ID, as referenced by a requisition.
+
+        Returns:
+            Dict[str, Any]: The agreement response, including its acceptance time and validity.
+
+        Raises:
+            NordigenAPIError: If the API request fails.
+        """
+        return await self.request("GET", f"agreements/enduser/{agreement_id}/")
+
+    async def get_institutions(self, country: str) -> List[Dict[str, Any]]:
+        """
+        Retrieve the institutions accounts can be linked from in a country.
+
+        Args:
+            country (str): The ISO 3166 country code.
+
+        Returns:
+            List[Dict[str, Any]]: The institutions, with their ID, name, BIC and access limits.
+
+        Raises:
+            NordigenAPIError: If the API request fails.
+        """
+        return await self.request("GET", "institutions/", params={"country": country})
+
+    async def create_agreement(
+            self,
+            institution_id: str,
+            max_historical_days: int,
+            access_valid_for_days: int,
+            access_scope: Sequence[str] = ("balances", "details", "transactions"),
+    ) -> Dict[str, Any]:
+        """
+        Create an end user agreement with an institution.
+
+        Args:
+            institution_id (str): The institution ID.
+            max_historical_days (int): Number of days of transaction history to request.
+            access_valid_for_days (int): Number of days the access to the accounts is valid for.
+            access_scope (Sequence[str]): The data the agreement grants access to.
+
+        Returns:
+            Dict[str, Any]: The agreement response, including its "id".
+
+        Raises:
+            NordigenAPIError: If the API request fails.
+        """
+        return await self.request(
+            "POST",
+            "agreements/enduser/",
+            payload={
+                "institution_id": institution_id,
+                "max_historical_days": max_historical_days,
+                "access_valid_for_days": access_valid_for_days,
+                "access_scope": list(access_scope),
+            },
+        )
+
+    async def create_requisition(
+            self, institution_id: str, redirect: str, agreement_id: str, reference: str
+    ) -> Dict[str, Any]:
+        """
+        Create a requisition the user completes by authenticating with the institution.
+
+        Args:
+            institution_id (str): The institution ID.
+            redirect (str): URL the institution sends the user back to after authenticating.
+            agreement_id (str): The end user agreement the requisition is based on.
+            reference (str): A unique reference of the requisition.
+
+        Returns:
+            Dict[str, Any]: The requisition response, including its "id" and the "link" to open.
+
+        Raises:
+            NordigenAPIError: If the API request fails.
+        """
+        return await self.request(
+            "POST",
+            "requisitions/",
+            payload={
+                "institution_id": institution_id,
+                "redirect": redirect,
+                "agreement": agreement_id,
+                "reference": reference,
+            },
+        )
+
+    async def get_account_details(self, account_id: str) -> Dict[str, Any]:
+        """
+        Retrieve the details of an account.
+
+        Args:
+            account_id (str): The account ID.
+
+        Returns:
+            Dict[str, Any]: The account details response in Berlin Group PSD2 format.
+
+        Raises:
+            NordigenAPIError: If the API request fails.
+        """
+        return await self.request("GET", f"accounts/{account_id}/details/")
+
+    async def get_account_balances(self, account_id: str) -> Dict[str, Any]:
+        """
+        Retrieve the balances of an account.
+
+        Args:
+            account_id (str): The account ID.
+
+        Returns:
+            Dict[str, Any]: The account balances response in Berlin Group PSD2 format.
+
+        Raises:
+            NordigenAPIError: If the API request fails.
+        """
+        return await self.request("GET", f"accounts/{account_id}/balances/")
+
+    async def get_account_transactions(
+            self, account_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Retrieve the transactions of an account.
+
+        Args:
+            account_id (str): The account ID.
+            date_from (Optional[str]): ISO date of the oldest transaction to return; the bank's
+                full history window is returned when omitted.
+            date_to (Optional[str]): ISO date of the newest transaction to return.
+
+        Returns:
+            Dict[str, Any]: The account transactions response in Berlin Group PSD2 format.
+
+        Raises:
+            NordigenAPIError: If the API request fails.
+        """
+        return await self.request(
+            "GET",
+            f"accounts/{account_id}/transactions/",
+            params={"date_from": date_from, "date_to": date_to},
+        )
+
+    async def request(
+            self,
+            method: str,
+            endpoint: str,
+            payload: Optional[Dict[str, Any]] = None,
+            params: Optional[Dict[str, Any]] = None,
+            authenticated: bool = True,
+    ) -> Any:
+        """
+        Send a request to the Nordigen API and decode the JSON response.
+
+        Args:
+            method (str): The HTTP method.
+            endpoint (str): The endpoint path relative to the base URL.
+            payload (Optional[Dict[str, Any]]): JSON body sent with the request.
+            params (Optional[Dict[str, Any]]): Query parameters; None values are dropped.
+            authenticated (bool): Whether to send the access token.
+
+        Returns:
+            Any: The decoded JSON response.
+
+        Raises:
+            NordigenAPIError: If the request fails or the API returns an error status.
+        """
+        headers = {"accept": "application/json"}
+        if authenticated and self._token:
+            headers["Authorization"] = f"Bearer {self._token}"
+        if params:
+            params = {key: value for key, value in params.items() if value is not None}
+
+        started = time.monotonic()
+        status: Optional[int] = None
+        try:
+            async with self._session.request(
+                    method,
+                    f"{self._base_url}/{endpoint}",
+                    json=payload,
+                    params=params,
+                    headers=headers,
+                    timeout=self._timeout,
+            ) as response:
+                status = response.status
+                try:
+                    body = await response.json(content_type=None)
+                except ValueError:
+                    body = {"detail": await response.text()}
+
+                self._observe_rate_limit(endpoint, response.status, response.headers, body)
+
+                if response.status >= 400:
+                    if not isinstance(body, dict):
+                        body = {"detail": body}
+                    status_code = body.get("status_code") or response.status
+                    raise NordigenAPIError(
+                        message=f"Error calling {endpoint}: {body}",
+                        status_code=status_code,
+                        response_body=body,
+                    )
+
+                return body
+
+        except (ClientError, asyncio.TimeoutError) as err:
+            raise NordigenAPIError(
+                message=f"Unexpected error calling {endpoint}: {err!r}"
+            ) from err
+
+        finally:
+            if self._metrics is not None:
+                self._metrics.record_call(_endpoint_name(endpoint), time.monotonic() - started, status)
+
+    def _observe_rate_limit(
+            self, endpoint: str, status: int, headers: Mapping[str, str], body: Any
+    ) -> None:
+        """
+        Pass the budget reported in the rate-limit headers of an account response to the quota ledger.
+
+        A 429 response without headers is recorded as an exhausted budget, using the wait time
+        from its detail message.
+
+        Args:
+            endpoint (str): The endpoint path relative to the base URL.
+            status (int): The HTTP status of the response.
+            headers (Mapping[str, str]): The response headers.
+            body (Any): The decoded response body.
+        """
+        parts = [part for part in endpoint.split("/") if part]
+        if self._quota is None or len(parts) != 3 or parts[0] != "accounts":
+            return
+
+        limit = parse_rate_limit(headers)
+        if limit is None and status == 429:
+            limit = (0, retry_after(body))
+        if limit is not None:
+            self._quota.observe(parts[1], parts[2], *limit)
+
+
+def parse_rate_limit(headers: Mapping[str, str]) -> Optional[Tuple[int, float]]:
+    """
+    Read the remaining budget and its reset time from the rate-limit headers of a response.
+
+    Args:
+        headers (Mapping[str, str]): The response headers.
+
+    Returns:
+        Optional[Tuple[int, float]]: The remaining calls and the seconds until the budget resets, or None if
+            the headers are missing or invalid.
+    """
+    for remaining_header, reset_header in zip(RATE_LIMIT_REMAINING_HEADERS, RATE_LIMIT_RESET_HEADERS):
+        if remaining_header in headers and reset_header in headers:
+            try:
+                return int(headers[remaining_header]), float(headers[reset_header])
+            except ValueError:
+                return None
+    return None
+
+
+def retry_after(body: Any, default: float = 0.0) -> float:
+    """
+    Read the wait time from the detail message of a 429 response.
+
+    Args:
+        body (Any): The decoded response body.
+        default (float): The wait time returned when the message holds none.
+
+    Returns:
+        float: The seconds to wait before calling again.
+    """
+    detail = body.get("detail", "") if isinstance(body, dict) else ""
+    match = _RETRY_AFTER_PATTERN.search(str(detail))
+    return float(match.group(1)) if match else default
+
+
+def _endpoint_name(endpoint: str) -> str:
+    """
+    Get the name of an endpoint without the IDs in its path.
+
+    Args:
+        endpoint (str): The endpoint path, e.g. "accounts/<id>/balances/".
+
+    Returns:
+        str: The endpoint name, e.g. "accounts/balances".
+    """
+    parts = [part for part in endpoint.split("/") if part]
+    if parts and parts[0] in ("accounts", "requisitions"):
+        del parts[1:2]
+    elif parts and parts[0] == "agreements":
+        del parts[2:3]
+    return "/".join(parts)
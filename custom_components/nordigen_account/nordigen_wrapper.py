@@ -1,77 +1,886 @@
-from typing import List, Optional
-from nordigen_account import create_nordigen_client, BankAccountManager, NordigenAPIError, BankAccount
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, TypeVar
+
+from aiohttp import ClientSession
+from nordigen_account import NordigenAPIError
+
+from .const import (
+    API_BASE_URL,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_METADATA_TTL_HOURS,
+    ENDPOINT_DETAILS,
+    ENDPOINT_BALANCES,
+    ENDPOINT_TRANSACTIONS,
+    REFRESH_DEADLINE_SECONDS,
+    REQUEST_TIMEOUT_SECONDS,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_MAX_DELAY_SECONDS,
+    STORE_CALL_TIMEOUT_SECONDS,
+    TOKEN_REFRESH_MARGIN_SECONDS,
+    TRANSACTION_OVERLAP_DAYS,
+)
+from .circuit_breaker import CircuitBreaker, backoff_delay
+from .metrics import ClientMetrics
+from .nordigen_client import NordigenAsyncClient
+from .quota import QuotaLedger
+from .rolling import RollingTotals
+from .snapshot import AccountSnapshot, BalanceSnapshot, balance_from_dict, balance_to_dict, parse_amount
+from .transactions import TransactionStore
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Requisition statuses: access to the accounts has expired, was granted, or was refused by the user
+STATUS_EXPIRED = "EX"
+STATUS_LINKED = "LN"
+STATUS_REJECTED = "RJ"
+
+
+class AccountResult(NamedTuple):
+    """
+    The outcome of refreshing a single account.
+
+    An account is skipped when its circuit is open or its requisition expired, and then not
+    requested at all. An account whose daily quota is used up is not skipped: it is refreshed
+    without the calls it has no budget for and keeps the data those calls would have returned.
+    """
+
+    account: AccountSnapshot
+    error: Optional[NordigenAPIError] = None
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        """
+        Check whether the account was refreshed without an error and was not skipped.
+
+        Accounts that kept part of their data because their quota was used up count as refreshed.
+        """
+        return self.error is None and not self.skipped
+
 
 class NordigenWrapper:
-    """A wrapper around BankAccountManager to manage and update bank accounts."""
+    """A wrapper around the asyncio Nordigen client to manage and update bank accounts."""
 
     def __init__(
-            self, secret_id: str, secret_key: str, requisition_id: str, refresh_token: Optional[str] = None
+            self,
+            session: ClientSession,
+            secret_id: str,
+            secret_key: str,
+            requisition_ids: List[str],
+            refresh_token: Optional[str] = None,
+            max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+            metadata_ttl: float = DEFAULT_METADATA_TTL_HOURS * 3600,
+            quota: Optional[QuotaLedger] = None,
+            access_token: Optional[str] = None,
+            access_expires_at: Optional[float] = None,
+            refresh_expires_at: Optional[float] = None,
+            base_url: str = API_BASE_URL,
+            retry_attempts: int = RETRY_ATTEMPTS,
+            breaker: Optional[CircuitBreaker] = None,
+            request_timeout: float = REQUEST_TIMEOUT_SECONDS,
+            refresh_deadline: float = REFRESH_DEADLINE_SECONDS,
+            executor: Optional[Executor] = None,
     ) -> None:
         """
         Initialize the NordigenWrapper.
 
+        No API calls are made here; call async_initialize before updating accounts. All
+        requisitions share one client, so linking several banks costs a single authentication.
+
         Args:
+            session (ClientSession): The shared aiohttp session used for every API call.
             secret_id (str): API secret ID for authentication.
             secret_key (str): API secret key for authentication.
-            requisition_id (str): The requisition ID for accessing linked bank accounts.
+            requisition_ids (List[str]): The requisition IDs for accessing linked bank accounts.
             refresh_token (Optional[str]): A token used to refresh authentication credentials.
+            max_concurrency (int): Maximum number of API calls made at the same time during a refresh.
+                A value of 1 refreshes the accounts sequentially.
+            metadata_ttl (float): Seconds for which cached account details (name, status, currency)
+                are reused before they are requested again.
+            quota (Optional[QuotaLedger]): Ledger that records every account call. Account endpoints
+                without remaining budget are skipped and keep their previous data.
+            access_token (Optional[str]): A cached access token, reused until shortly before it expires.
+            access_expires_at (Optional[float]): Timestamp at which the cached access token expires.
+            refresh_expires_at (Optional[float]): Timestamp at which the refresh token expires.
+            base_url (str): Base URL of the Nordigen API.
+            retry_attempts (int): Number of times a call that failed with a network error, a
+                timeout or a server error is retried within a refresh.
+            breaker (Optional[CircuitBreaker]): Tracks failing accounts; accounts with an open
+                circuit are skipped. A new breaker is created when omitted.
+            request_timeout (float): Timeout in seconds of every API call.
+            refresh_deadline (float): Seconds after which the accounts still being refreshed or
+                synced are cancelled and reported as failed.
+            executor (Optional[Executor]): Runs the blocking calls to the local transaction store;
+                the event loop's default executor when omitted.
         """
-        self._secret_id: str = secret_id
-        self._secret_key: str = secret_key
-        self._requisition_id: str = requisition_id
+        self._requisition_ids: List[str] = list(requisition_ids)
         self._refresh_token: Optional[str] = refresh_token
+        self._max_concurrency: int = max(1, max_concurrency)
+        self._metadata_ttl: float = metadata_ttl
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self.metadata_updated: bool = False
+        self.quota: Optional[QuotaLedger] = quota
+        self._retry_attempts: int = max(0, retry_attempts)
+        self.breaker: CircuitBreaker = breaker or CircuitBreaker()
+        self._refresh_deadline: float = refresh_deadline
+        self._executor: Optional[Executor] = executor
 
-        self.client: Optional[object] = None
-        self.manager: Optional[BankAccountManager] = None
-        self.accounts: List[BankAccount] = []
+        self.metrics: ClientMetrics = ClientMetrics()
+        self.client: NordigenAsyncClient = NordigenAsyncClient(
+            session, secret_id, secret_key, base_url, request_timeout, metrics=self.metrics, quota=quota
+        )
+        self.client.token = access_token
+        self._access_expires_at: Optional[float] = access_expires_at if access_token else None
+        self._refresh_expires_at: Optional[float] = refresh_expires_at
+        self._token_lock: asyncio.Lock = asyncio.Lock()
+        self.token_refresh_count: int = 0
+        self.last_success: Dict[str, float] = {}
+        self.accounts: List[AccountSnapshot] = []
+        self.requisitions: Dict[str, Dict[str, Any]] = {}
+        self.account_requisitions: Dict[str, str] = {}
+        self._initialized: bool = False
 
-        self._initialize_manager()
-
-    def _initialize_manager(self) -> None:
+    async def async_initialize(self) -> None:
         """
-        Initialize the Nordigen API client and bank account manager.
+        Authenticate with the Nordigen API and load the accounts linked to every requisition.
+
+        The expiry of the end user agreement behind every requisition is looked up as well, unless
+        it is already known for the same agreement. Expired requisitions are kept but suspended,
+        so their accounts are not requested until they are replaced.
 
         Raises:
-            NordigenAPIError: If the API request fails due to invalid credentials or server errors.
-            RuntimeError: If there is an issue initializing the bank account manager.
+            NordigenAPIError: If the API request fails due to invalid credentials or server errors,
+                if every requisition has expired (428) or if one has no linked accounts (410).
         """
-        try:
-            client, new_refresh_token = create_nordigen_client(
-                secret_id=self._secret_id,
-                secret_key=self._secret_key,
-                refresh_token=self._refresh_token
-            )
-            self.client = client
-            if new_refresh_token:
-                self._refresh_token = new_refresh_token
+        await self.async_ensure_access_token()
 
-            self.manager = BankAccountManager(
-                client=self.client, requisition_id=self._requisition_id, fetch_data=False
+        requisitions = await asyncio.gather(
+            *(self.client.get_requisition(requisition_id) for requisition_id in self._requisition_ids),
+            return_exceptions=True,
+        )
+        requisitions = [
+            _expired_requisition(requisition_id, self.requisitions.get(requisition_id, {}), requisition)
+            if isinstance(requisition, NordigenAPIError) and requisition.status_code == 428
+            else requisition
+            for requisition_id, requisition in zip(self._requisition_ids, requisitions)
+        ]
+        for requisition in requisitions:
+            if isinstance(requisition, BaseException):
+                raise requisition
+
+        expiries = await asyncio.gather(
+            *(
+                self._async_agreement_expiry(requisition_id, requisition)
+                for requisition_id, requisition in zip(self._requisition_ids, requisitions)
             )
-            self.accounts = self.manager.accounts
+        )
+
+        self.requisitions = {}
+        self.account_requisitions = {}
+        for requisition_id, requisition, expires_at in zip(self._requisition_ids, requisitions, expiries):
+            account_ids: List[str] = requisition.get("accounts", [])
+            if not account_ids and requisition.get("status") != STATUS_EXPIRED:
+                raise NordigenAPIError(
+                    message="No accounts found for the given requisition ID. Ensure that bank authorization has been completed.",
+                    status_code=410,
+                    response_body=requisition,
+                )
+
+            self.requisitions[requisition_id] = {
+                "institution_id": requisition.get("institution_id"),
+                "reference": requisition.get("reference"),
+                "status": requisition.get("status"),
+                "agreement": requisition.get("agreement"),
+                "agreement_expires_at": expires_at,
+                "accounts": list(account_ids),
+            }
+            for account_id in account_ids:
+                self.account_requisitions.setdefault(account_id, requisition_id)
+
+        if self.suspended:
+            raise _expired_error(requisitions[0])
 
+        # Keep the last known details and balances of accounts that are still linked
+        existing = {acc.account_id: acc for acc in self.accounts}
+        self.accounts = [
+            existing.get(account_id) or _account_from_metadata(account_id, self._metadata.get(account_id))
+            for account_id in self.account_requisitions
+        ]
+        self._initialized = True
+
+    async def _async_agreement_expiry(self, requisition_id: str, requisition: Dict[str, Any]) -> Optional[float]:
+        """
+        Get the time at which the end user agreement of a requisition expires.
+
+        The expiry already known for the same agreement is reused without an API call, and expired
+        requisitions are not looked up. A failed lookup is logged and leaves the expiry unknown.
+
+        Args:
+            requisition_id (str): The requisition ID.
+            requisition (Dict[str, Any]): The requisition response.
+
+        Returns:
+            Optional[float]: The expiry timestamp, or None if it is unknown.
+        """
+        agreement_id: Optional[str] = requisition.get("agreement")
+        known = self.requisitions.get(requisition_id, {})
+        if known.get("agreement") == agreement_id and known.get("agreement_expires_at") is not None:
+            return known["agreement_expires_at"]
+        if not agreement_id or requisition.get("status") == STATUS_EXPIRED:
+            return None
+
+        try:
+            agreement = await self.client.get_agreement(agreement_id)
         except NordigenAPIError as e:
-            raise
+            if e.status_code == 401:
+                raise
+            _LOGGER.debug("Failed to look up the agreement of requisition %s: %s", requisition_id, e)
+            return None
+
+        return _agreement_expiry(agreement)
+
+    async def async_ensure_access_token(self) -> None:
+        """
+        Make sure a valid access token is available, refreshing it shortly before it expires.
+
+        Concurrent callers share a single refresh.
+
+        Raises:
+            NordigenAPIError: If the token exchange or generation fails.
+        """
+        if self._access_token_valid():
+            return
+
+        async with self._token_lock:
+            if not self._access_token_valid():
+                await self._async_obtain_access_token()
+
+    async def async_refresh_access_token(self) -> None:
+        """
+        Obtain a new access token, generating a new refresh token if the current one has expired.
+
+        Used after the API rejected the current access token. If another caller already replaced
+        the token while this one waited, no further request is made.
+
+        Raises:
+            NordigenAPIError: If the token exchange or generation fails.
+        """
+        rejected_token = self.client.token
+
+        async with self._token_lock:
+            if self.client.token != rejected_token and self._access_token_valid():
+                return
+            await self._async_obtain_access_token()
+
+    def _access_token_valid(self) -> bool:
+        """
+        Check whether the access token is set and not about to expire.
 
-        except RuntimeError as e:
-            raise
+        Returns:
+            bool: True if the access token can be used for the next requests.
+        """
+        return (
+            self.client.token is not None
+            and self._access_expires_at is not None
+            and self._access_expires_at - TOKEN_REFRESH_MARGIN_SECONDS > time.time()
+        )
+
+    async def _async_obtain_access_token(self) -> None:
+        """
+        Exchange the refresh token for a new access token, or generate a new token pair if the
+        refresh token is missing, about to expire or rejected.
 
-    def update_all_accounts(self) -> None:
+        Raises:
+            NordigenAPIError: If the token exchange or generation fails.
+        """
+        self.token_refresh_count += 1
+        now = time.time()
+        refresh_usable = bool(self._refresh_token) and (
+            self._refresh_expires_at is None
+            or self._refresh_expires_at - TOKEN_REFRESH_MARGIN_SECONDS > now
+        )
+
+        if refresh_usable:
+            try:
+                token_data = await self.client.exchange_token(self._refresh_token)
+                self._access_expires_at = now + token_data.get("access_expires", 0)
+                return
+            except NordigenAPIError as e:
+                if e.status_code != 401:
+                    raise
+                _LOGGER.debug("Nordigen refresh token expired, generating a new one")
+
+        token_data = await self.client.generate_token()
+        self._refresh_token = token_data.get("refresh")
+        self._access_expires_at = now + token_data.get("access_expires", 0)
+        self._refresh_expires_at = now + token_data.get("refresh_expires", 0)
+
+    async def async_update_all_accounts(self, allow_partial: bool = True) -> Dict[str, AccountResult]:
         """
         Update account and balance data for all linked accounts.
 
+        The details and balances requests of every account are issued in parallel, bounded by
+        the concurrency limit, so the refresh takes as long as the slowest account. Account
+        details are only requested when their cached copy is missing or older than the TTL.
+
+        Args:
+            allow_partial (bool): Whether to return the results when only some accounts failed.
+
+        Returns:
+            Dict[str, AccountResult]: The outcome of every account keyed by account ID.
+
+        Raises:
+            NordigenAPIError: If authentication fails, or if the accounts could not be refreshed.
+        """
+        return await self.async_update_accounts(allow_partial=allow_partial)
+
+    async def async_update_accounts(
+            self, account_ids: Optional[Iterable[str]] = None, allow_partial: bool = True
+    ) -> Dict[str, AccountResult]:
+        """
+        Update account and balance data for some or all linked accounts.
+
+        Only the given accounts are requested, so a targeted refresh spends the quota of those
+        accounts alone. Unknown account IDs are ignored.
+
+        Every account is refreshed on its own: a failing account keeps its previous data and
+        does not stop the others. Accounts still running at the refresh deadline are cancelled
+        and count as failed, so one hanging bank cannot hold up the refresh. Accounts whose circuit is open after repeated failures are
+        skipped, as are the accounts of expired requisitions. An account answering 428 suspends
+        its requisition. An authentication failure (401) is always raised, since it affects every
+        account; other errors are raised when no account could be refreshed, or for any failed
+        account when partial results are not allowed.
+
+        Args:
+            account_ids (Optional[Iterable[str]]): The accounts to refresh; all linked accounts
+                when omitted.
+            allow_partial (bool): Whether to return the results when only some accounts failed.
+
+        Returns:
+            Dict[str, AccountResult]: The outcome of every account keyed by account ID.
+
+        Raises:
+            NordigenAPIError: If authentication fails, if every requisition has expired (428), or
+                if the accounts could not be refreshed.
+        """
+        if self.suspended:
+            raise _expired_error()
+        if not self._initialized:
+            await self.async_initialize()
+        else:
+            await self.async_ensure_access_token()
+
+        accounts = self.accounts
+        if account_ids is not None:
+            wanted = set(account_ids)
+            accounts = [acc for acc in self.accounts if acc.account_id in wanted]
+
+        started = time.monotonic()
+        self.metadata_updated = False
+        account_results = {acc.account_id: AccountResult(acc, skipped=True) for acc in accounts}
+        allowed = [
+            acc for acc in accounts
+            if not self.is_suspended(acc.account_id) and self.breaker.allow(acc.account_id)
+        ]
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        results = await self._async_run_with_deadline(
+            "refresh", {acc.account_id: self._async_update_account(acc, semaphore) for acc in allowed}
+        )
+
+        errors: List[NordigenAPIError] = []
+        refreshed: Dict[str, AccountSnapshot] = {}
+        for acc in allowed:
+            result = results[acc.account_id]
+            if isinstance(result, NordigenAPIError):
+                account_results[acc.account_id] = AccountResult(acc, error=result)
+                errors.append(result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                account_results[acc.account_id] = AccountResult(result)
+                refreshed[acc.account_id] = result
+
+        # Publish the refreshed accounts at once, so readers never see a partial refresh
+        self.accounts = [refreshed.get(acc.account_id, acc) for acc in self.accounts]
+
+        for error in errors:
+            if error.status_code == 401:
+                # The token was rejected, which says nothing about the health of the accounts
+                raise error
+
+        for account_id, result in account_results.items():
+            if result.error is not None and result.error.status_code == 428:
+                # The agreement covers every account of the requisition
+                self.requisitions[self.account_requisitions[account_id]]["status"] = STATUS_EXPIRED
+        if self.suspended:
+            raise _expired_error()
+
+        for account_id, result in account_results.items():
+            if result.ok:
+                self.breaker.record_success(account_id)
+            elif result.error is not None:
+                _LOGGER.debug("Failed to refresh account %s: %s", account_id, result.error)
+                if self.breaker.record_failure(account_id):
+                    _LOGGER.warning(
+                        "Nordigen account %s keeps failing, pausing its refreshes until %s",
+                        account_id,
+                        time.ctime(self.breaker.open_until(account_id)),
+                    )
+
+        if errors and (not allow_partial or not any(result.ok for result in account_results.values())):
+            raise errors[0]
+
+        _LOGGER.debug(
+            "Refreshed %d Nordigen accounts in %.3fs, %d failed, %d paused",
+            len(allowed) - len(errors),
+            time.monotonic() - started,
+            len(errors),
+            len(accounts) - len(allowed),
+        )
+        return account_results
+
+    async def _async_update_account(self, acc: AccountSnapshot, semaphore: asyncio.Semaphore) -> AccountSnapshot:
+        """
+        Fetch account and balance data for a single account.
+
+        Every request is allowed to finish before an error is raised, so a failure does not
+        leave other requests running in the background. The account itself is not changed.
+
+        Args:
+            acc (AccountSnapshot): The last known state of the account.
+            semaphore (asyncio.Semaphore): Limits the number of API calls in flight.
+
+        Returns:
+            AccountSnapshot: The new state of the account. Data that was not fetched is kept.
+
         Raises:
             NordigenAPIError: If the API call to update account data fails.
         """
-        if not self.manager:
-            self._initialize_manager()
+        started = time.monotonic()
+        account_id: str = acc.account_id
+        cached = self._metadata.get(account_id)
+        fetch_details = (
+            cached is None or time.time() - cached["fetched_at"] >= self._metadata_ttl
+        ) and self._has_budget(account_id, ENDPOINT_DETAILS)
+        fetch_balances = self._has_budget(account_id, ENDPOINT_BALANCES)
+        if cached is not None or fetch_details:
+            self.metrics.record_cache(hit=not fetch_details)
+
+        async def _limited(endpoint: str, call: Callable[[str], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+            return await self._async_call_with_retry(account_id, endpoint, call, semaphore)
+
+        calls: Dict[str, Any] = {}
+        if fetch_balances:
+            calls[ENDPOINT_BALANCES] = _limited(ENDPOINT_BALANCES, self.client.get_account_balances)
+        else:
+            _LOGGER.debug("Skipping balances for account %s, daily quota used up", account_id)
+        if fetch_details:
+            calls[ENDPOINT_DETAILS] = _limited(ENDPOINT_DETAILS, self.client.get_account_details)
+
+        results = dict(zip(calls, await asyncio.gather(*calls.values(), return_exceptions=True)))
+        for endpoint, result in results.items():
+            if isinstance(result, NordigenAPIError) and result.status_code == 429:
+                # The client recorded the exhausted budget; keep the previous data until it resets
+                _LOGGER.debug("Rate limit reached for %s of account %s", endpoint, account_id)
+                fetch_balances = fetch_balances and endpoint != ENDPOINT_BALANCES
+                fetch_details = fetch_details and endpoint != ENDPOINT_DETAILS
+            elif isinstance(result, BaseException):
+                raise result
+
+        if fetch_balances:
+            acc = acc._replace(balances=_parse_balances(results[ENDPOINT_BALANCES]))
+            self.last_success[account_id] = time.time()
+        if fetch_details:
+            cached = {**_parse_account_details(results[ENDPOINT_DETAILS]), "fetched_at": time.time()}
+            self._metadata[account_id] = cached
+            self.metadata_updated = True
+        if cached is not None:
+            acc = acc._replace(
+                name=cached.get("name", "Unknown"),
+                status=cached.get("status", "Unknown"),
+                currency=cached.get("currency", "Unknown"),
+            )
+
+        _LOGGER.debug(
+            "Refreshed account %s in %.3fs (details %s)",
+            account_id,
+            time.monotonic() - started,
+            "fetched" if fetch_details else "cached",
+        )
+        return acc
+
+    async def _async_call_with_retry(
+            self,
+            account_id: str,
+            endpoint: str,
+            call: Callable[[str], Awaitable[Dict[str, Any]]],
+            semaphore: asyncio.Semaphore,
+    ) -> Dict[str, Any]:
+        """
+        Call an account endpoint, retrying network errors, timeouts and server errors.
+
+        Retries wait for an exponential backoff with jitter outside of the concurrency limit, so
+        other accounts keep using the slots meanwhile. Every attempt is recorded in the quota
+        ledger, and no retry is made once the endpoint has no budget left.
+
+        Args:
+            account_id (str): The account ID.
+            endpoint (str): The endpoint name, e.g. "balances".
+            call (Callable[[str], Awaitable[Dict[str, Any]]]): The client method taking the account ID.
+            semaphore (asyncio.Semaphore): Limits the number of API calls in flight.
+
+        Returns:
+            Dict[str, Any]: The API response.
+
+        Raises:
+            NordigenAPIError: If the last attempt fails or the error is not worth retrying.
+        """
+        attempt = 0
+        while True:
+            async with semaphore:
+                if self.quota is not None:
+                    self.quota.record(account_id, endpoint)
+                try:
+                    return await call(account_id)
+                except NordigenAPIError as e:
+                    if (
+                        attempt >= self._retry_attempts
+                        or not _is_transient(e)
+                        or not self._has_budget(account_id, endpoint)
+                    ):
+                        raise
+                    error = e
+
+            delay = backoff_delay(attempt, RETRY_BASE_DELAY_SECONDS, RETRY_MAX_DELAY_SECONDS)
+            _LOGGER.debug(
+                "Retrying %s of account %s in %.1fs after: %s", endpoint, account_id, delay, error
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def async_sync_transactions(
+            self,
+            store: TransactionStore,
+            overlap_days: int = TRANSACTION_OVERLAP_DAYS,
+            rolling: Optional[RollingTotals] = None,
+    ) -> Dict[str, int]:
+        """
+        Fetch new transactions for all linked accounts and store them locally.
+
+        The first sync of an account pulls the bank's full history window. Later syncs start at
+        the latest stored booking date minus an overlap, so only new rows are transferred.
+        Accounts without remaining transactions quota, with an open circuit or of an expired
+        requisition are skipped, and an account that fails, whether calling the API or writing to
+        the store, or is still running at the deadline is left out without stopping the others.
+
+        Args:
+            store (TransactionStore): The local store receiving the transactions.
+            overlap_days (int): Days before the latest stored booking date that are fetched again.
+            rolling (Optional[RollingTotals]): Receives the fetched booked transactions.
+
+        Returns:
+            Dict[str, int]: The number of inserted or changed rows keyed by account ID.
+
+        Raises:
+            NordigenAPIError: If authentication fails.
+        """
+        if not self._initialized:
+            await self.async_initialize()
+        else:
+            await self.async_ensure_access_token()
+
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        accounts = [
+            acc for acc in self.accounts
+            if self._has_budget(acc.account_id, ENDPOINT_TRANSACTIONS)
+            and self.breaker.allow(acc.account_id)
+            and not self.is_suspended(acc.account_id)
+        ]
+        results = await self._async_run_with_deadline(
+            "transactions",
+            {
+                acc.account_id: self._async_sync_account_transactions(
+                    acc.account_id, store, overlap_days, semaphore, rolling
+                )
+                for acc in accounts
+            },
+        )
+
+        synced: Dict[str, int] = {}
+        for acc in accounts:
+            result = results[acc.account_id]
+            if isinstance(result, NordigenAPIError) and result.status_code == 401:
+                raise result
+            if isinstance(result, asyncio.TimeoutError):
+                _LOGGER.warning("The transaction store did not answer in time for account %s", acc.account_id)
+            elif isinstance(result, Exception):
+                # API errors, but also a locked or full database or a malformed transaction
+                _LOGGER.warning("Failed to sync transactions for account %s: %r", acc.account_id, result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                synced[acc.account_id] = result
+
+        return synced
+
+    async def _async_sync_account_transactions(
+            self,
+            account_id: str,
+            store: TransactionStore,
+            overlap_days: int,
+            semaphore: asyncio.Semaphore,
+            rolling: Optional[RollingTotals] = None,
+    ) -> int:
+        """
+        Fetch and store the new transactions of a single account.
+
+        Args:
+            account_id (str): The account ID.
+            store (TransactionStore): The local store receiving the transactions.
+            overlap_days (int): Days before the latest stored booking date that are fetched again.
+            semaphore (asyncio.Semaphore): Limits the number of API calls in flight.
+            rolling (Optional[RollingTotals]): Receives the fetched booked transactions.
+
+        Returns:
+            int: The number of inserted or changed rows.
+
+        Raises:
+            NordigenAPIError: If the API call to fetch transactions fails.
+            asyncio.TimeoutError: If the transaction store does not answer in time.
+        """
+        started = time.monotonic()
+        high_water_mark = await self.async_run_in_executor(store.get_high_water_mark, account_id)
+        date_from: Optional[str] = None
+        if high_water_mark is not None:
+            date_from = (date.fromisoformat(high_water_mark) - timedelta(days=overlap_days)).isoformat()
+
+        response = await self._async_call_with_retry(
+            account_id,
+            ENDPOINT_TRANSACTIONS,
+            lambda acc_id: self.client.get_account_transactions(acc_id, date_from=date_from),
+            semaphore,
+        )
+
+        changed = await self.async_run_in_executor(
+            store.upsert, account_id, response.get("transactions", {}), date_from
+        )
+        if rolling is not None:
+            rolling.add(account_id, response.get("transactions", {}).get("booked", []))
+        _LOGGER.debug(
+            "Synced transactions for account %s from %s in %.3fs, %d rows changed",
+            account_id,
+            date_from or "the start of the history window",
+            time.monotonic() - started,
+            changed,
+        )
+        return changed
+
+    async def async_run_in_executor(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking call to the local transaction store in the wrapper's executor.
+
+        The call is given a timeout, so a stuck disk cannot hold up a sync; the worker thread is
+        left to finish on its own.
+
+        Args:
+            func (Callable[..., T]): The blocking function.
+            *args (Any): Its arguments.
+
+        Returns:
+            T: The result of the function.
+
+        Raises:
+            asyncio.TimeoutError: If the call did not finish in time.
+        """
+        loop = asyncio.get_running_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(self._executor, func, *args), STORE_CALL_TIMEOUT_SECONDS
+        )
+
+    async def _async_run_with_deadline(self, operation: str, calls: Dict[str, Awaitable[T]]) -> Dict[str, Any]:
+        """
+        Run one call per account in parallel, cancelling the calls still running at the deadline.
+
+        Args:
+            operation (str): The name of the operation, for logs and metrics, e.g. "refresh".
+            calls (Dict[str, Awaitable[T]]): The calls keyed by account ID.
+
+        Returns:
+            Dict[str, Any]: The result or raised exception of every call keyed by account ID. A
+                call cancelled at the deadline results in a NordigenAPIError without status.
+        """
+        tasks = {account_id: asyncio.ensure_future(call) for account_id, call in calls.items()}
+        if not tasks:
+            return {}
 
         try:
-            for acc in self.manager.accounts:
-                acc.update_account_data()
-                acc.update_balance_data()
-        except NordigenAPIError as e:
-            raise
+            _, pending = await asyncio.wait(tasks.values(), timeout=self._refresh_deadline)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+        results: Dict[str, Any] = {}
+        cancelled: List[str] = []
+        for account_id, task in tasks.items():
+            if task.cancelled():
+                cancelled.append(account_id)
+                self.metrics.record_deadline(operation)
+                results[account_id] = NordigenAPIError(
+                    message=f"The {operation} of account {account_id} exceeded the "
+                            f"{self._refresh_deadline:g}s deadline"
+                )
+            else:
+                results[account_id] = task.exception() or task.result()
+
+        if cancelled:
+            _LOGGER.warning(
+                "Cancelled the %s of Nordigen accounts %s after the %gs deadline",
+                operation,
+                ", ".join(cancelled),
+                self._refresh_deadline,
+            )
+        return results
+
+    @property
+    def suspended_requisitions(self) -> Set[str]:
+        """
+        Get the IDs of the requisitions whose end user agreement has expired.
+        """
+        return {
+            requisition_id
+            for requisition_id, requisition in self.requisitions.items()
+            if requisition.get("status") == STATUS_EXPIRED
+        }
+
+    @property
+    def suspended(self) -> bool:
+        """
+        Check whether every requisition has expired, so no account can be requested.
+        """
+        return bool(self._requisition_ids) and set(self._requisition_ids) <= self.suspended_requisitions
+
+    def is_suspended(self, account_id: str) -> bool:
+        """
+        Check whether an account belongs to an expired requisition.
+
+        Args:
+            account_id (str): The account ID.
+
+        Returns:
+            bool: True if the account must not be requested.
+        """
+        requisition_id = self.account_requisitions.get(account_id)
+        return requisition_id is not None and requisition_id in self.suspended_requisitions
+
+    def _has_budget(self, account_id: str, endpoint: str) -> bool:
+        """
+        Check whether the quota ledger allows another call to an account endpoint.
+
+        Args:
+            account_id (str): The account ID.
+            endpoint (str): The endpoint name.
+
+        Returns:
+            bool: True if the call is allowed or no ledger is configured.
+        """
+        return self.quota is None or self.quota.has_budget(account_id, endpoint)
+
+    def load_metadata_cache(self, metadata: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Restore previously persisted account details.
+
+        Args:
+            metadata (Dict[str, Dict[str, Any]]): Cached details keyed by account ID, as returned
+                by metadata_cache.
+        """
+        self._metadata = {
+            account_id: dict(entry)
+            for account_id, entry in metadata.items()
+            if isinstance(entry, dict) and "fetched_at" in entry
+        }
+
+    def invalidate_metadata(self, account_id: str) -> None:
+        """
+        Drop the cached details of an account so they are requested on the next update.
+
+        Args:
+            account_id (str): The account ID.
+        """
+        if self._metadata.pop(account_id, None) is not None:
+            self.metadata_updated = True
+
+    def restore_accounts(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Recreate the accounts from a snapshot without calling the API.
+
+        The wrapper still authenticates and looks up the requisitions on the next update.
+
+        Args:
+            snapshot (Dict[str, Any]): The snapshot, as returned by accounts_snapshot.
+        """
+        self.requisitions = {
+            requisition_id: dict(requisition)
+            for requisition_id, requisition in snapshot.get("requisitions", {}).items()
+        }
+        self.account_requisitions = {
+            account_id: requisition_id
+            for requisition_id, requisition in self.requisitions.items()
+            for account_id in requisition.get("accounts", [])
+        }
+        self.accounts = [
+            AccountSnapshot(
+                account_id=stored["account_id"],
+                name=stored.get("name", "Unknown"),
+                status=stored.get("status", "Unknown"),
+                currency=stored.get("currency", "Unknown"),
+                balances=tuple(balance_from_dict(balance) for balance in stored.get("balances", [])),
+            )
+            for stored in snapshot.get("accounts", [])
+        ]
+        for stored in snapshot.get("accounts", []):
+            if stored.get("last_success") is not None:
+                self.last_success[stored["account_id"]] = stored["last_success"]
+
+    def accounts_snapshot(self) -> Dict[str, Any]:
+        """
+        Get a compact copy of the accounts and their balances, suitable for persisting.
+
+        Returns:
+            Dict[str, Any]: The requisitions and their accounts with their last known balances.
+        """
+        return {
+            "requisition_ids": list(self._requisition_ids),
+            "requisitions": {
+                requisition_id: dict(requisition) for requisition_id, requisition in self.requisitions.items()
+            },
+            "accounts": [
+                {
+                    "account_id": acc.account_id,
+                    "name": acc.name,
+                    "status": acc.status,
+                    "currency": acc.currency,
+                    "balances": [balance_to_dict(balance) for balance in acc.balances],
+                    "last_success": self.last_success.get(acc.account_id),
+                }
+                for acc in self.accounts
+            ],
+        }
+
+    @property
+    def metadata_cache(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the cached account details keyed by account ID, suitable for persisting.
+        """
+        return {account_id: dict(entry) for account_id, entry in self._metadata.items()}
 
     @property
     def refresh_token(self) -> Optional[str]:
@@ -81,19 +890,204 @@ class NordigenWrapper:
         return self._refresh_token
 
     @property
-    def requisition_id(self) -> str:
+    def token_state(self) -> Dict[str, Any]:
+        """
+        Get the current tokens and their expiry timestamps, suitable for persisting.
+        """
+        return {
+            "access_token": self.client.token,
+            "access_expires_at": self._access_expires_at,
+            "refresh_token": self._refresh_token,
+            "refresh_expires_at": self._refresh_expires_at,
+        }
+
+    @property
+    def requisition_ids(self) -> List[str]:
         """
-        Get the requisition ID.
+        Get the requisition IDs.
         """
-        return self._requisition_id
+        return list(self._requisition_ids)
 
-    @requisition_id.setter
-    def requisition_id(self, new_id: str) -> None:
+    @requisition_ids.setter
+    def requisition_ids(self, new_ids: List[str]) -> None:
         """
-        Set a new requisition ID and reinitialize the manager.
+        Set new requisition IDs; the accounts are reloaded on the next update.
+
+        Requisitions that are no longer used are dropped, so replacing an expired requisition
+        lifts the suspension right away.
 
         Args:
-            new_id (str): The new requisition ID to assign.
+            new_ids (List[str]): The new requisition IDs to assign.
+        """
+        self._requisition_ids = list(new_ids)
+        self.requisitions = {
+            requisition_id: requisition
+            for requisition_id, requisition in self.requisitions.items()
+            if requisition_id in self._requisition_ids
+        }
+        self._initialized = False
+
+    @property
+    def requisition_id(self) -> str:
+        """
+        Get the first requisition ID.
         """
-        self._requisition_id = new_id
-        self._initialize_manager()
+        return self._requisition_ids[0]
+
+    @property
+    def institution_id(self) -> Optional[str]:
+        """
+        Get the institution ID of the first requisition.
+        """
+        return self.requisitions.get(self.requisition_id, {}).get("institution_id")
+
+    @property
+    def reference(self) -> Optional[str]:
+        """
+        Get the reference of the first requisition.
+        """
+        return self.requisitions.get(self.requisition_id, {}).get("reference")
+
+
+def _expired_error(response_body: Optional[Dict[str, Any]] = None) -> NordigenAPIError:
+    """
+    Build the error raised when every requisition has expired.
+
+    Args:
+        response_body (Optional[Dict[str, Any]]): The response that revealed the expiry, if any.
+
+    Returns:
+        NordigenAPIError: The error with status code 428.
+    """
+    return NordigenAPIError(
+        message="Access to accounts has expired as set in End User Agreement. Connect the accounts again with a new requisition.",
+        status_code=428,
+        response_body=response_body,
+    )
+
+
+def _expired_requisition(
+        requisition_id: str, known: Dict[str, Any], error: NordigenAPIError
+) -> Dict[str, Any]:
+    """
+    Stand in for a requisition whose lookup was refused because its agreement expired.
+
+    Args:
+        requisition_id (str): The requisition ID.
+        known (Dict[str, Any]): What is known about the requisition from earlier lookups.
+        error (NordigenAPIError): The 428 error of the lookup.
+
+    Returns:
+        Dict[str, Any]: A requisition response with the expired status and the known accounts.
+    """
+    _LOGGER.debug("Requisition %s has expired: %s", requisition_id, error)
+    return {
+        "id": requisition_id,
+        "status": STATUS_EXPIRED,
+        "institution_id": known.get("institution_id"),
+        "reference": known.get("reference"),
+        "agreement": known.get("agreement"),
+        "accounts": list(known.get("accounts", [])),
+    }
+
+
+def _agreement_expiry(agreement: Dict[str, Any]) -> Optional[float]:
+    """
+    Compute the expiry of an end user agreement from its acceptance time and validity.
+
+    Agreements that were not accepted yet count from their creation.
+
+    Args:
+        agreement (Dict[str, Any]): The agreement API response.
+
+    Returns:
+        Optional[float]: The expiry timestamp, or None if the response lacks the fields.
+    """
+    started = agreement.get("accepted") or agreement.get("created")
+    valid_days = agreement.get("access_valid_for_days")
+    if not started or valid_days is None:
+        return None
+
+    try:
+        started_at = datetime.fromisoformat(str(started).replace("Z", "+00:00"))
+        if started_at.tzinfo is None:
+            started_at = started_at.replace(tzinfo=timezone.utc)
+        return (started_at + timedelta(days=int(valid_days))).timestamp()
+    except ValueError:
+        return None
+
+
+def _is_transient(error: NordigenAPIError) -> bool:
+    """
+    Check whether a failed call is likely to succeed when retried shortly after.
+
+    Args:
+        error (NordigenAPIError): The error raised by the client.
+
+    Returns:
+        bool: True for network errors, timeouts and server errors.
+    """
+    return error.status_code is None or error.status_code >= 500
+
+
+def _parse_account_details(details_response: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Extract the account details used by the integration from an API response.
+
+    Args:
+        details_response (Dict[str, Any]): The account details API response.
+
+    Returns:
+        Dict[str, str]: The account name, status and currency.
+    """
+    account_details = details_response.get("account", {})
+    return {
+        "name": account_details.get("name", "Unknown"),
+        "status": account_details.get("status", "Unknown"),
+        "currency": account_details.get("currency", "Unknown"),
+    }
+
+
+def _account_from_metadata(account_id: str, metadata: Optional[Dict[str, Any]]) -> AccountSnapshot:
+    """
+    Build a newly linked account from its cached details, if any.
+
+    Args:
+        account_id (str): The account ID.
+        metadata (Optional[Dict[str, Any]]): The cached account name, status and currency.
+
+    Returns:
+        AccountSnapshot: The account without balances.
+    """
+    metadata = metadata or {}
+    return AccountSnapshot(
+        account_id=account_id,
+        name=metadata.get("name"),
+        status=metadata.get("status"),
+        currency=metadata.get("currency"),
+    )
+
+
+def _parse_balances(balances_response: Dict[str, Any]) -> Tuple[BalanceSnapshot, ...]:
+    """
+    Extract the balances used by the integration from an API response.
+
+    Only the fields read by the sensors and statistics are kept, so the raw response can be
+    released right away.
+
+    Args:
+        balances_response (Dict[str, Any]): The account balances API response.
+
+    Returns:
+        Tuple[BalanceSnapshot, ...]: The parsed balances.
+    """
+    return tuple(
+        BalanceSnapshot(
+            balance_type=balance.get("balanceType", "Unknown"),
+            amount=parse_amount(balance.get("balanceAmount", {}).get("amount")),
+            currency=balance.get("balanceAmount", {}).get("currency", "Unknown") or None,
+            reference_date=balance.get("referenceDate"),
+            last_change=balance.get("lastChangeDateTime"),
+        )
+        for balance in balances_response.get("balances", [])
+    )
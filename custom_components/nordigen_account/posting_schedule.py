@@ -0,0 +1,359 @@
+from datetime import datetime, timezone, tzinfo
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .const import (
+    DAILY_CALL_LIMIT,
+    ENDPOINT_BALANCES,
+    POSTING_HALF_LIFE_DAYS,
+    POSTING_MAX_INTERVAL_DAYS,
+    POSTING_MIN_CHANGES,
+)
+from .quota import QuotaLedger
+from .snapshot import AccountSnapshot
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# One slot per hour of the week, Monday 00:00 first
+SLOTS = 7 * 24
+
+# Weight in hours of the average change rate mixed into the rate of every slot, so slots that
+# were rarely observed do not get extreme rates
+PRIOR_HOURS = 1.0
+
+
+class _AccountProfile:
+    """The observed balance changes and observation time of one account per hour of the week."""
+
+    __slots__ = ("changes", "exposure", "last_fetch", "decayed_at")
+
+    def __init__(self) -> None:
+        self.changes: List[float] = [0.0] * SLOTS
+        self.exposure: List[float] = [0.0] * SLOTS
+        self.last_fetch: Optional[float] = None
+        self.decayed_at: Optional[float] = None
+
+
+class PostingSchedule:
+    """
+    Learn when the balances of every account change, and pick fetch times right after likely changes.
+
+    Every fetch tells whether the balances changed since the previous one. The change is
+    attributed to the hours of the week between the two fetches, in proportion to how likely a
+    change already was in each of them, or to the exact hour when the bank reports when the
+    balance last changed. Dividing by the time every hour was observed gives a change rate per
+    hour of the week. Older observations lose half their weight every few weeks, so the profile
+    follows changes in the bank's posting times.
+
+    The next fetch of an account is due once the expected number of changes since its last
+    fetch reaches its share of the daily calls, at the end of the hour it is reached in. Banks
+    that post in overnight batches are thus fetched right after the batch, and quiet hours are
+    skipped. Accounts with too few observed changes have no learned schedule.
+    """
+
+    def __init__(
+            self,
+            daily_calls: int = DAILY_CALL_LIMIT,
+            tz: tzinfo = timezone.utc,
+            half_life: float = POSTING_HALF_LIFE_DAYS * DAY,
+            min_changes: float = POSTING_MIN_CHANGES,
+            max_interval: float = POSTING_MAX_INTERVAL_DAYS * DAY,
+    ) -> None:
+        """
+        Initialize the schedule without any account.
+
+        Args:
+            daily_calls (int): Number of balances calls allowed per account per day.
+            tz (tzinfo): The time zone whose hours and weekdays the profiles are kept in.
+            half_life (float): Seconds after which an observation counts half.
+            min_changes (float): Number of observed changes before the schedule of an account is used.
+            max_interval (float): Longest gap in seconds between two fetches that is learned from.
+        """
+        self._daily_calls: int = max(1, daily_calls)
+        self._tz: tzinfo = tz
+        self._half_life: float = half_life
+        self._min_changes: float = min_changes
+        self._max_interval: float = max_interval
+        self._profiles: Dict[str, _AccountProfile] = {}
+
+    def load(self, data: Dict[str, Any]) -> None:
+        """
+        Restore the profiles learned by a previous run.
+
+        Args:
+            data (Dict[str, Any]): The persisted profiles, as returned by as_dict.
+        """
+        self._profiles = {}
+        for account_id, stored in data.get("accounts", {}).items():
+            profile = self._profiles[account_id] = _AccountProfile()
+            if len(stored.get("changes", [])) == SLOTS and len(stored.get("exposure", [])) == SLOTS:
+                profile.changes = [float(value) for value in stored["changes"]]
+                profile.exposure = [float(value) for value in stored["exposure"]]
+            profile.last_fetch = stored.get("last_fetch")
+            profile.decayed_at = stored.get("decayed_at")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the profiles, suitable for persisting.
+
+        Returns:
+            Dict[str, Any]: The changes and observed hours per hour of the week keyed by account ID.
+        """
+        return {
+            "accounts": {
+                account_id: {
+                    "changes": [round(value, 4) for value in profile.changes],
+                    "exposure": [round(value, 4) for value in profile.exposure],
+                    "last_fetch": profile.last_fetch,
+                    "decayed_at": profile.decayed_at,
+                }
+                for account_id, profile in self._profiles.items()
+            }
+        }
+
+    def last_fetch(self, account_id: str) -> Optional[float]:
+        """
+        Get the time of the last observed fetch of an account.
+
+        Args:
+            account_id (str): The account ID.
+
+        Returns:
+            Optional[float]: The timestamp, or None if the account was never observed.
+        """
+        profile = self._profiles.get(account_id)
+        return profile.last_fetch if profile is not None else None
+
+    def trained(self, account_id: str) -> bool:
+        """
+        Check whether enough changes of an account were observed to schedule its fetches.
+
+        Args:
+            account_id (str): The account ID.
+
+        Returns:
+            bool: True if the learned schedule is used for the account.
+        """
+        profile = self._profiles.get(account_id)
+        return profile is not None and sum(profile.changes) >= self._min_changes
+
+    def observe(
+            self, account_id: str, fetched_at: float, changed: bool, changed_at: Optional[float] = None
+    ) -> None:
+        """
+        Learn from a fetch of the balances of an account.
+
+        Fetches older than the last observed one are ignored, and so are gaps longer than the
+        longest interval, since they say little about when the change happened.
+
+        Args:
+            account_id (str): The account ID.
+            fetched_at (float): The time of the fetch.
+            changed (bool): Whether any balance differed from the previous fetch.
+            changed_at (Optional[float]): When the bank reports the balance last changed, if it does.
+        """
+        profile = self._profiles.setdefault(account_id, _AccountProfile())
+        previous = profile.last_fetch
+        if previous is not None and fetched_at <= previous:
+            return
+        profile.last_fetch = fetched_at
+        if previous is None or fetched_at - previous > self._max_interval:
+            return
+
+        self._decay(profile, fetched_at)
+        segments = list(self._segments(previous, fetched_at))
+        rates = self._rates(profile) if changed else []
+        for slot, seconds, _ in segments:
+            profile.exposure[slot] += seconds / HOUR
+        if not changed:
+            return
+
+        if changed_at is not None and previous < changed_at <= fetched_at:
+            profile.changes[self._slot(changed_at)] += 1.0
+            return
+
+        weights = [rates[slot] * seconds for slot, seconds, _ in segments]
+        total = sum(weights)
+        for (slot, seconds, _), weight in zip(segments, weights):
+            profile.changes[slot] += weight / total if total else seconds / (fetched_at - previous)
+
+    def observe_account(
+            self, before: Optional[AccountSnapshot], after: AccountSnapshot, fetched_at: Optional[float]
+    ) -> bool:
+        """
+        Learn from a refresh of an account by comparing its balances before and after.
+
+        Only fetches made since the account was last observed count, since accounts without
+        quota keep their previous balances. An account without previous balances only records
+        the time of the fetch.
+
+        Args:
+            before (Optional[AccountSnapshot]): The account before the refresh, if it was known.
+            after (AccountSnapshot): The refreshed account.
+            fetched_at (Optional[float]): When its balances were last fetched, if ever.
+
+        Returns:
+            bool: True if the fetch was observed.
+        """
+        last_fetch = self.last_fetch(after.account_id)
+        if fetched_at is None or (last_fetch is not None and fetched_at <= last_fetch):
+            return False
+
+        changed = before is not None and (
+            {(bal.balance_type, bal.amount, bal.currency) for bal in before.balances}
+            != {(bal.balance_type, bal.amount, bal.currency) for bal in after.balances}
+        )
+        self.observe(after.account_id, fetched_at, changed, last_change_time(after))
+        return True
+
+    def rates(self, account_id: str) -> Optional[List[float]]:
+        """
+        Get the expected number of balance changes of an account in every hour of the week.
+
+        Args:
+            account_id (str): The account ID.
+
+        Returns:
+            Optional[List[float]]: The rates, Monday 00:00 first, or None if the account is unknown.
+        """
+        profile = self._profiles.get(account_id)
+        return self._rates(profile) if profile is not None else None
+
+    def next_fetch_time(self, account_id: str, now: float) -> Optional[float]:
+        """
+        Get the time at which fetching an account is most likely to find new balances.
+
+        The fetch is due once the changes expected since the last fetch reach the expected
+        changes per day divided by the daily calls, and at the latest a day after the last fetch.
+
+        Args:
+            account_id (str): The account ID.
+            now (float): The current time.
+
+        Returns:
+            Optional[float]: The timestamp of the next fetch, never before now, or None if the
+                account has no learned schedule.
+        """
+        profile = self._profiles.get(account_id)
+        if profile is None or profile.last_fetch is None or not self.trained(account_id):
+            return None
+
+        rates = self._rates(profile)
+        target = sum(rates) / 7 / self._daily_calls
+        start = max(profile.last_fetch, now - DAY)
+        expected = sum(rates[slot] * seconds / HOUR for slot, seconds, _ in self._segments(start, now))
+        if expected >= target:
+            return now
+
+        for slot, seconds, end in self._segments(now, max(now, profile.last_fetch + DAY)):
+            expected += rates[slot] * seconds / HOUR
+            if expected >= target:
+                return end
+        return max(now, profile.last_fetch + DAY)
+
+    def retain(self, account_ids: Iterable[str]) -> None:
+        """
+        Forget the accounts that are no longer linked.
+
+        Args:
+            account_ids (Iterable[str]): The IDs of the accounts to keep.
+        """
+        keep = set(account_ids)
+        for account_id in set(self._profiles) - keep:
+            del self._profiles[account_id]
+
+    def _rates(self, profile: _AccountProfile) -> List[float]:
+        """
+        Get the change rate of every slot, mixed with the average rate of the account.
+        """
+        # One change a day is assumed before anything was observed
+        average = (sum(profile.changes) + 1.0) / (sum(profile.exposure) + 24.0)
+        return [
+            (changes + PRIOR_HOURS * average) / (exposure + PRIOR_HOURS)
+            for changes, exposure in zip(profile.changes, profile.exposure)
+        ]
+
+    def _decay(self, profile: _AccountProfile, now: float) -> None:
+        """
+        Reduce the weight of the observations of a profile by the time passed since the last decay.
+        """
+        if profile.decayed_at is not None and now > profile.decayed_at:
+            factor = 0.5 ** ((now - profile.decayed_at) / self._half_life)
+            profile.changes = [value * factor for value in profile.changes]
+            profile.exposure = [value * factor for value in profile.exposure]
+        profile.decayed_at = now
+
+    def _slot(self, timestamp: float) -> int:
+        """
+        Get the hour of the week of a timestamp in the schedule's time zone.
+        """
+        local = datetime.fromtimestamp(timestamp, self._tz)
+        return local.weekday() * 24 + local.hour
+
+    def _segments(self, start: float, end: float) -> Iterator[Tuple[int, float, float]]:
+        """
+        Split a time range at the local hour boundaries.
+
+        Args:
+            start (float): The start timestamp.
+            end (float): The end timestamp.
+
+        Yields:
+            Tuple[int, float, float]: The slot, the seconds of the range inside it, and the end of
+                that part of the range.
+        """
+        current = start
+        while current < end:
+            offset = datetime.fromtimestamp(current, self._tz).utcoffset()
+            shift = offset.total_seconds() if offset is not None else 0.0
+            boundary = current - (current + shift) % HOUR + HOUR
+            segment_end = min(boundary, end)
+            yield self._slot(current), segment_end - current, segment_end
+            current = segment_end
+
+
+def next_fetch_time(schedule: PostingSchedule, quota: QuotaLedger, account_id: str, now: float) -> float:
+    """
+    Get the time at which an account is due for its next balances call.
+
+    Accounts with a learned posting schedule are due right after their balances are likely to
+    have changed, or once quota is left again at that time; other accounts spread their quota
+    evenly over the day.
+
+    Args:
+        schedule (PostingSchedule): The learned posting schedule.
+        quota (QuotaLedger): The quota ledger of the accounts.
+        account_id (str): The account ID.
+        now (float): The current time.
+
+    Returns:
+        float: The timestamp of the next balances call.
+    """
+    next_call = schedule.next_fetch_time(account_id, now)
+    if next_call is None:
+        return quota.next_call_time(account_id, ENDPOINT_BALANCES, now)
+    if not quota.has_budget(account_id, ENDPOINT_BALANCES, next_call):
+        # The learned time is kept unless the daily quota is used up by then
+        return quota.next_call_time(account_id, ENDPOINT_BALANCES, next_call)
+    return next_call
+
+
+def last_change_time(acc: AccountSnapshot) -> Optional[float]:
+    """
+    Get the latest time the bank reports a balance of an account changed.
+
+    Args:
+        acc (AccountSnapshot): The account.
+
+    Returns:
+        Optional[float]: The timestamp, or None if the bank reports no change times.
+    """
+    changes = []
+    for bal in acc.balances:
+        try:
+            change = datetime.fromisoformat(bal.last_change) if bal.last_change else None
+        except ValueError:
+            continue
+        if change is not None and change.tzinfo is not None:
+            changes.append(change.timestamp())
+    return max(changes) if changes else None
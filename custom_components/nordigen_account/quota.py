@@ -0,0 +1,251 @@
+import time
+from typing import Any, Dict, List, Optional
+
+from .const import DAILY_CALL_LIMIT, QUOTA_WINDOW_HOURS
+
+
+class QuotaLedger:
+    """
+    Count Nordigen API calls per account and endpoint over a rolling window.
+
+    GoCardless limits every account to a few calls per endpoint per 24 hours. The ledger keeps
+    the timestamps of the calls made inside the window so the coordinator can skip accounts that
+    ran out of budget and spread the remaining calls over the day. The remaining budget and reset
+    time reported by the API in its rate-limit headers take precedence over the local count
+    until they reset.
+    """
+
+    def __init__(
+            self, daily_limit: int = DAILY_CALL_LIMIT, window: float = QUOTA_WINDOW_HOURS * 3600
+    ) -> None:
+        """
+        Initialize an empty ledger.
+
+        Args:
+            daily_limit (int): Number of calls allowed per account and endpoint inside the window.
+            window (float): Length of the rolling window in seconds.
+        """
+        self._daily_limit: int = max(1, daily_limit)
+        self._window: float = window
+        self._calls: Dict[str, Dict[str, List[float]]] = {}
+        self._limits: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def load(self, data: Dict[str, Any]) -> None:
+        """
+        Restore the calls recorded by a previous run.
+
+        Args:
+            data (Dict[str, Any]): The persisted ledger, as returned by as_dict.
+        """
+        now = time.time()
+        self._calls = {
+            account_id: {
+                endpoint: self._prune(sorted(float(ts) for ts in timestamps), now)
+                for endpoint, timestamps in endpoints.items()
+            }
+            for account_id, endpoints in data.get("calls", {}).items()
+        }
+        self._limits = {
+            account_id: {
+                endpoint: {"remaining": int(limit["remaining"]), "reset_at": float(limit["reset_at"])}
+                for endpoint, limit in endpoints.items()
+                if float(limit["reset_at"]) > now
+            }
+            for account_id, endpoints in data.get("limits", {}).items()
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the recorded calls inside the window, suitable for persisting.
+
+        Returns:
+            Dict[str, Any]: The ledger keyed by account ID and endpoint.
+        """
+        now = time.time()
+        return {
+            "calls": {
+                account_id: {
+                    endpoint: self._prune(timestamps, now)
+                    for endpoint, timestamps in endpoints.items()
+                }
+                for account_id, endpoints in self._calls.items()
+            },
+            "limits": {
+                account_id: {
+                    endpoint: dict(limit)
+                    for endpoint, limit in endpoints.items()
+                    if limit["reset_at"] > now
+                }
+                for account_id, endpoints in self._limits.items()
+            },
+        }
+
+    def record(self, account_id: str, endpoint: str, now: Optional[float] = None) -> None:
+        """
+        Record a call made to an account endpoint.
+
+        The calls that fell out of the window before this one are dropped here rather than by
+        the queries, which may look ahead in time without forgetting calls still inside the window.
+
+        Args:
+            account_id (str): The account ID.
+            endpoint (str): The endpoint name, e.g. "balances".
+            now (Optional[float]): Timestamp of the call; defaults to the current time.
+        """
+        now = time.time() if now is None else now
+        endpoints = self._calls.setdefault(account_id, {})
+        endpoints[endpoint] = self._prune(endpoints.get(endpoint, []), now) + [now]
+
+    def observe(
+            self, account_id: str, endpoint: str, remaining: int, reset_after: float, now: Optional[float] = None
+    ) -> None:
+        """
+        Record the budget reported by the API in the rate-limit headers of a response.
+
+        Args:
+            account_id (str): The account ID.
+            endpoint (str): The endpoint name, e.g. "balances".
+            remaining (int): Number of calls the API still allows.
+            reset_after (float): Seconds until the API resets the budget.
+            now (Optional[float]): Timestamp of the response; defaults to the current time.
+        """
+        now = time.time() if now is None else now
+        limits = self._limits.setdefault(account_id, {})
+        for name in [name for name, limit in limits.items() if limit["reset_at"] <= now]:
+            del limits[name]
+        limits[endpoint] = {
+            "remaining": max(0, remaining),
+            "reset_at": now + max(0.0, reset_after),
+        }
+
+    def used(self, account_id: str, endpoint: str, now: Optional[float] = None) -> int:
+        """
+        Get the number of calls made to an account endpoint inside the window.
+
+        Args:
+            account_id (str): The account ID.
+            endpoint (str): The endpoint name.
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            int: The number of calls inside the window.
+        """
+        return len(self._timestamps(account_id, endpoint, now))
+
+    def remaining(self, account_id: str, endpoint: str, now: Optional[float] = None) -> int:
+        """
+        Get the number of calls still allowed for an account endpoint inside the window.
+
+        Args:
+            account_id (str): The account ID.
+            endpoint (str): The endpoint name.
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            int: The remaining call budget.
+        """
+        remaining = max(0, self._daily_limit - self.used(account_id, endpoint, now))
+        limit = self._reported_limit(account_id, endpoint, now)
+        if limit is not None:
+            remaining = min(remaining, int(limit["remaining"]))
+        return remaining
+
+    def has_budget(self, account_id: str, endpoint: str, now: Optional[float] = None) -> bool:
+        """
+        Check whether another call to an account endpoint is allowed right now.
+
+        Args:
+            account_id (str): The account ID.
+            endpoint (str): The endpoint name.
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            bool: True if at least one call is left in the budget.
+        """
+        return self.remaining(account_id, endpoint, now) > 0
+
+    def next_call_time(self, account_id: str, endpoint: str, now: Optional[float] = None) -> float:
+        """
+        Get the time at which the next call to an account endpoint should be made.
+
+        Calls are spaced evenly over the window. When the budget is exhausted the next call is
+        due once the oldest call inside the window ages out, or once the API resets the budget
+        it reported as used up.
+
+        Args:
+            account_id (str): The account ID.
+            endpoint (str): The endpoint name.
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            float: The timestamp of the next call.
+        """
+        now = time.time() if now is None else now
+        timestamps = self._timestamps(account_id, endpoint, now)
+
+        if not timestamps:
+            next_call = now
+        elif len(timestamps) >= self._daily_limit:
+            next_call = timestamps[len(timestamps) - self._daily_limit] + self._window
+        else:
+            next_call = max(now, timestamps[-1] + self._window / self._daily_limit)
+
+        limit = self._reported_limit(account_id, endpoint, now)
+        if limit is not None and limit["remaining"] <= 0:
+            next_call = max(next_call, limit["reset_at"])
+        return next_call
+
+    def _reported_limit(self, account_id: str, endpoint: str, now: Optional[float]) -> Optional[Dict[str, float]]:
+        """
+        Get the budget last reported by the API for an account endpoint, if it has not reset yet.
+
+        A limit that reset before the reference time is ignored but kept, so asking about a
+        future time does not forget a limit that still applies now.
+
+        Args:
+            account_id (str): The account ID.
+            endpoint (str): The endpoint name.
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            Optional[Dict[str, float]]: The "remaining" calls and the "reset_at" timestamp, or None.
+        """
+        limit = self._limits.get(account_id, {}).get(endpoint)
+        if limit is None or limit["reset_at"] <= (time.time() if now is None else now):
+            return None
+        return limit
+
+    def _timestamps(self, account_id: str, endpoint: str, now: Optional[float]) -> List[float]:
+        """
+        Get the timestamps of the calls made to an account endpoint inside the window.
+
+        The stored calls are left untouched, so a query about a future time does not drop calls
+        that are still inside the window now.
+
+        Args:
+            account_id (str): The account ID.
+            endpoint (str): The endpoint name.
+            now (Optional[float]): The reference time; defaults to the current time.
+
+        Returns:
+            List[float]: The call timestamps inside the window, oldest first.
+        """
+        endpoints = self._calls.get(account_id)
+        if not endpoints or endpoint not in endpoints:
+            return []
+
+        return self._prune(endpoints[endpoint], time.time() if now is None else now)
+
+    def _prune(self, timestamps: List[float], now: float) -> List[float]:
+        """
+        Drop the timestamps that fell out of the window.
+
+        Args:
+            timestamps (List[float]): Call timestamps, oldest first.
+            now (float): The reference time.
+
+        Returns:
+            List[float]: The timestamps inside the window.
+        """
+        cutoff = now - self._window
+        return [ts for ts in timestamps if ts > cutoff]
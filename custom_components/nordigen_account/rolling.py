@@ -0,0 +1,258 @@
+import bisect
+import logging
+from collections import deque
+from datetime import date
+from decimal import Decimal
+from typing import Any, Deque, Dict, Iterable, KeysView, List, Mapping, Optional, Set, Tuple
+
+from .const import ROLLING_WINDOWS
+from .snapshot import parse_amount
+from .transactions import STATUS_BOOKED, transaction_key
+
+_LOGGER = logging.getLogger(__name__)
+
+# Kinds of rolling totals
+KIND_SPEND = "spend"
+KIND_INCOME = "income"
+KINDS = (KIND_SPEND, KIND_INCOME)
+
+# Booking date as a day number, transaction ID and signed amount
+_Entry = Tuple[int, str, Decimal]
+
+
+class _AccountWindows:
+    """The transactions and running totals of one account for every window."""
+
+    __slots__ = ("seen", "entries", "spend", "income", "currency")
+
+    def __init__(self, windows: Iterable[str]) -> None:
+        self.seen: Dict[str, int] = {}
+        self.entries: Dict[str, Deque[_Entry]] = {window: deque() for window in windows}
+        self.spend: Dict[str, Decimal] = {window: Decimal(0) for window in self.entries}
+        self.income: Dict[str, Decimal] = {window: Decimal(0) for window in self.entries}
+        self.currency: Optional[str] = None
+
+
+class RollingTotals:
+    """
+    Spend and income of every account over sliding windows of booking dates.
+
+    Every window keeps the booked transactions it covers, oldest first, next to running totals.
+    New transactions are added to the windows they fall into and transactions that slide out of
+    a window are subtracted again, so a refresh costs time in proportion to the rows it fetched
+    and the rows that expired, never to the history. Transactions are identified by their ID so
+    the overlap fetched again by every sync is not counted twice. Only the transactions inside
+    the longest window are kept and persisted.
+    """
+
+    def __init__(self, windows: Mapping[str, int] = ROLLING_WINDOWS) -> None:
+        """
+        Initialize the totals without any account.
+
+        Args:
+            windows (Mapping[str, int]): The length in days of every window keyed by its name.
+        """
+        self._windows: Dict[str, int] = dict(windows)
+        self._longest: str = max(self._windows, key=self._windows.get)
+        self._accounts: Dict[str, _AccountWindows] = {}
+        self._today: Optional[int] = None
+        self._changed: Set[str] = set()
+
+    @property
+    def windows(self) -> List[str]:
+        """
+        Get the names of the windows.
+        """
+        return list(self._windows)
+
+    @property
+    def accounts(self) -> KeysView[str]:
+        """
+        Get the IDs of the accounts whose transactions are tracked.
+        """
+        return self._accounts.keys()
+
+    def total(self, account_id: str, kind: str, window: str) -> Optional[Decimal]:
+        """
+        Get the spend or income of an account inside a window.
+
+        Args:
+            account_id (str): The account ID.
+            kind (str): "spend" or "income".
+            window (str): The window name, e.g. "week".
+
+        Returns:
+            Optional[Decimal]: The total as a positive amount, or None if the account is not tracked.
+        """
+        account = self._accounts.get(account_id)
+        if account is None:
+            return None
+        return (account.spend if kind == KIND_SPEND else account.income)[window]
+
+    def currency(self, account_id: str) -> Optional[str]:
+        """
+        Get the currency of the transactions of an account.
+
+        Args:
+            account_id (str): The account ID.
+
+        Returns:
+            Optional[str]: The currency of the latest transaction, or None if unknown.
+        """
+        account = self._accounts.get(account_id)
+        return account.currency if account is not None else None
+
+    def advance(self, today: date) -> None:
+        """
+        Move every window to end on the given day and subtract the transactions that slid out.
+
+        Args:
+            today (date): The current local date.
+        """
+        self._today = today.toordinal()
+        for account_id, account in self._accounts.items():
+            for window, days in self._windows.items():
+                entries = account.entries[window]
+                cutoff = self._today - days
+                while entries and entries[0][0] <= cutoff:
+                    _, transaction_id, amount = entries.popleft()
+                    self._subtract(account, window, amount)
+                    if window == self._longest:
+                        account.seen.pop(transaction_id, None)
+                    self._changed.add(account_id)
+
+    def add(self, account_id: str, transactions: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add newly fetched booked transactions of an account.
+
+        Transactions already counted and transactions booked before the longest window are
+        skipped. The account is tracked from now on, even without any transaction.
+
+        Args:
+            account_id (str): The account ID.
+            transactions (Iterable[Dict[str, Any]]): Booked transactions in Berlin Group PSD2 format.
+        """
+        account = self._accounts.get(account_id)
+        if account is None:
+            account = self._accounts[account_id] = _AccountWindows(self._windows)
+            self._changed.add(account_id)
+
+        for transaction in transactions:
+            booked = transaction.get("bookingDate") or transaction.get("valueDate")
+            amount = parse_amount(transaction.get("transactionAmount", {}).get("amount"))
+            if not booked or amount is None:
+                continue
+            try:
+                day = date.fromisoformat(booked[:10]).toordinal()
+            except ValueError:
+                _LOGGER.debug("Invalid booking date for account %s: %s", account_id, booked)
+                continue
+
+            transaction_id = transaction_key(STATUS_BOOKED, transaction)
+            if transaction_id in account.seen:
+                continue
+            if self._today is not None and day <= self._today - self._windows[self._longest]:
+                continue
+
+            account.seen[transaction_id] = day
+            account.currency = transaction.get("transactionAmount", {}).get("currency") or account.currency
+            for window, days in self._windows.items():
+                if self._today is None or day > self._today - days:
+                    self._insert(account.entries[window], (day, transaction_id, amount))
+                    self._add(account, window, amount)
+            self._changed.add(account_id)
+
+    def retain(self, account_ids: Iterable[str]) -> None:
+        """
+        Stop tracking accounts that are no longer linked.
+
+        Args:
+            account_ids (Iterable[str]): The IDs of the accounts to keep.
+        """
+        keep = set(account_ids)
+        for account_id in set(self._accounts) - keep:
+            del self._accounts[account_id]
+            self._changed.add(account_id)
+
+    def pop_changed(self) -> Set[str]:
+        """
+        Get the accounts whose totals changed since the last call, and reset the list.
+
+        Returns:
+            Set[str]: The account IDs.
+        """
+        changed, self._changed = self._changed, set()
+        return changed
+
+    def load(self, data: Dict[str, Any]) -> None:
+        """
+        Restore the transactions saved by a previous run and recompute the totals.
+
+        Args:
+            data (Dict[str, Any]): The persisted state, as returned by as_dict.
+        """
+        self._accounts = {}
+        for account_id, stored in data.get("accounts", {}).items():
+            account = self._accounts[account_id] = _AccountWindows(self._windows)
+            account.currency = stored.get("currency")
+            for day, transaction_id, amount in stored.get("transactions", []):
+                account.seen[transaction_id] = day
+                for window in self._windows:
+                    account.entries[window].append((day, transaction_id, Decimal(amount)))
+                    self._add(account, window, Decimal(amount))
+        self._today = None
+        self._changed = set(self._accounts)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Get the transactions inside the longest window, suitable for persisting.
+
+        Returns:
+            Dict[str, Any]: The currency and transactions keyed by account ID.
+        """
+        return {
+            "accounts": {
+                account_id: {
+                    "currency": account.currency,
+                    "transactions": [
+                        [day, transaction_id, str(amount)]
+                        for day, transaction_id, amount in account.entries[self._longest]
+                    ],
+                }
+                for account_id, account in self._accounts.items()
+            }
+        }
+
+    @staticmethod
+    def _insert(entries: Deque[_Entry], entry: _Entry) -> None:
+        """
+        Insert a transaction into a window, keeping the window sorted by booking date.
+
+        New transactions are usually the most recent ones and are appended; transactions booked
+        late are inserted at their place.
+        """
+        if not entries or entries[-1][0] <= entry[0]:
+            entries.append(entry)
+            return
+        position = bisect.bisect_right([day for day, _, _ in entries], entry[0])
+        entries.insert(position, entry)
+
+    @staticmethod
+    def _add(account: _AccountWindows, window: str, amount: Decimal) -> None:
+        """
+        Add a signed amount to the spend or income of a window.
+        """
+        if amount < 0:
+            account.spend[window] -= amount
+        else:
+            account.income[window] += amount
+
+    @staticmethod
+    def _subtract(account: _AccountWindows, window: str, amount: Decimal) -> None:
+        """
+        Remove a signed amount from the spend or income of a window.
+        """
+        if amount < 0:
+            account.spend[window] += amount
+        else:
+            account.income[window] -= amount
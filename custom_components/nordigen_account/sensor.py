@@ -1,14 +1,23 @@
 import logging
-from typing import List, Optional
-from homeassistant.components.sensor import SensorEntity
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import PERCENTAGE, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
+from .aggregates import AggregateKey, AggregateTotal, GROUP_CURRENCY, GROUP_TOTAL
 from .coordinator import NordigenDataUpdateCoordinator
-from .nordigen_wrapper import BankAccount, NordigenAPIError
+from .rolling import KINDS
+from .nordigen_wrapper import NordigenAPIError
+from .snapshot import AccountSnapshot, AccountsSnapshot, BalanceSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,66 +28,517 @@ async def async_setup_entry(
     """
     Set up Nordigen sensors from a config entry.
 
+    Balance sensors are kept in line with the coordinator data by a single listener, which
+    adds and removes only the sensors of balances that appeared or disappeared.
+
     Args:
         hass (HomeAssistant): The Home Assistant instance.
         entry (ConfigEntry): The configuration entry for the integration.
         async_add_entities (AddEntitiesCallback): Callback function to add entities to Home Assistant.
     """
-    _LOGGER.warning("Nordigen sensor setup is starting!") # REMOVE THIS LINE
     coordinator: NordigenDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    reconciler = BalanceSensorReconciler(hass, entry, coordinator, async_add_entities)
 
-    new_sensors: List[NordigenBalanceSensor] = []
+    entry.async_on_unload(coordinator.async_add_listener(reconciler.async_reconcile))
 
-    @coordinator.async_add_listener
-    def _schedule_add_entities() -> None:
-        """
-        Process and register sensors based on retrieved Nordigen account data.
+    async_add_entities(
+        NordigenDiagnosticSensor(coordinator, entry.entry_id, description)
+        for description in DIAGNOSTIC_SENSORS
+    )
+
+    # Data was fetched or restored from disk before the platform was set up
+    reconciler.async_reconcile()
+
+
+class BalanceSensorReconciler:
+    """
+    Keeps the balance and total sensors of a config entry in line with the published snapshot.
+
+    The sensors that were created are indexed by account ID and balance type, and totals by
+    their group, key and currency, so a refresh only compares keys: sensors are added for new
+    balances and totals and removed, together with their registry entries, for those that are
+    gone. Snapshots that were already
+    reconciled, e.g. after a failed refresh, are skipped. Registry entries left behind by
+    accounts that are no longer linked are removed on the first pass. The entries of a linked
+    account are migrated from older versions and pruned once its balances were fetched, so an
+    account whose first refresh failed keeps its entities.
+    """
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            entry: ConfigEntry,
+            coordinator: NordigenDataUpdateCoordinator,
+            async_add_entities: AddEntitiesCallback,
+    ) -> None:
         """
-        _LOGGER.warning("Nordigen coordinator data: %s", coordinator.data) # REMOVE THIS LINE
+        Initialize the reconciler without any sensors.
 
-        if coordinator.data is None:
-            _LOGGER.warning("No account data available. Using cached values if available.") # CHANGE TO DEBUG
+        Args:
+            hass (HomeAssistant): The Home Assistant instance.
+            entry (ConfigEntry): The configuration entry for the integration.
+            coordinator (NordigenDataUpdateCoordinator): Data update coordinator instance.
+            async_add_entities (AddEntitiesCallback): Callback function to add entities to Home Assistant.
+        """
+        self._hass = hass
+        self._entry = entry
+        self._coordinator = coordinator
+        self._async_add_entities = async_add_entities
+        self._entities: Dict[Tuple[str, str], NordigenBalanceSensor] = {}
+        self._aggregates: Dict[AggregateKey, NordigenAggregateSensor] = {}
+        self._rolling: Dict[Tuple[str, str, str], NordigenRollingSensor] = {}
+        self._snapshot: Optional[AccountsSnapshot] = None
+        self._requisition_ids: Optional[Tuple[str, ...]] = None
+        self._settled: Set[str] = set()
+
+    @callback
+    def async_reconcile(self) -> None:
+        """
+        Add and remove balance and total sensors to match the coordinator data.
+        """
+        snapshot = self._coordinator.data
+        if snapshot is self._snapshot:
+            return
+        if not isinstance(snapshot, AccountsSnapshot):
+            _LOGGER.error("Unexpected data format: %s", type(snapshot))
             return
+        if not snapshot:
+            _LOGGER.debug("No account data available. Skipping sensor setup.")
+            return
+
+        first_pass = self._snapshot is None
+        self._snapshot = snapshot
+
+        requisition_ids = tuple(self._coordinator.wrapper.requisitions)
+        if requisition_ids != self._requisition_ids:
+            self._requisition_ids = requisition_ids
+            _async_register_requisition_devices(self._hass, self._entry, self._coordinator)
+
+        wanted = snapshot.balances
+        settled = self._settled_accounts(snapshot)
+        newly_settled = settled - self._settled
+        if newly_settled:
+            self._async_migrate_unique_ids(snapshot)
+            self._async_migrate_account_devices(snapshot)
+
+        aggregates = self._coordinator.aggregates
+        rolling = self._rolling_keys(snapshot)
+        removed = [key for key in self._entities if key not in wanted]
+        added = [key for key in wanted if key not in self._entities]
+        if removed:
+            self._async_remove(removed, snapshot)
+        self._async_remove_sensors(self._aggregates, [key for key in self._aggregates if key not in aggregates])
+        self._async_remove_sensors(self._rolling, [key for key in self._rolling if key not in rolling])
+        if first_pass or newly_settled:
+            self._settled |= settled
+            self._async_remove_stale_entries(
+                {balance_unique_id(self._entry.entry_id, *key) for key in wanted}
+                | {aggregate_unique_id(self._entry.entry_id, key) for key in aggregates}
+                | {rolling_unique_id(self._entry.entry_id, *key) for key in rolling}
+            )
+
+        accounts = {acc.account_id: acc for acc in snapshot}
+        entities: List[SensorEntity] = []
+        for account_id, balance_type in added:
+            sensor = NordigenBalanceSensor(
+                self._coordinator, self._entry.entry_id, accounts[account_id], balance_type
+            )
+            self._entities[(account_id, balance_type)] = sensor
+            entities.append(sensor)
+        for key in aggregates:
+            if key not in self._aggregates:
+                aggregate = NordigenAggregateSensor(self._coordinator, self._entry.entry_id, key)
+                self._aggregates[key] = aggregate
+                entities.append(aggregate)
+        for account_id, kind, window in rolling:
+            if (account_id, kind, window) not in self._rolling:
+                sensor = NordigenRollingSensor(
+                    self._coordinator, self._entry.entry_id, accounts[account_id], kind, window
+                )
+                self._rolling[(account_id, kind, window)] = sensor
+                entities.append(sensor)
+
+        if entities:
+            _LOGGER.debug("Adding %d Nordigen sensors", len(entities))
+            self._async_add_entities(entities)
+
+    def _settled_accounts(self, snapshot: AccountsSnapshot) -> Set[str]:
+        """
+        Get the accounts whose balances were fetched, so their registry entries can be reconciled.
+
+        Accounts that failed, were paused or have not been fetched yet report no balances,
+        which says nothing about the sensors they will have.
+
+        Args:
+            snapshot (AccountsSnapshot): The snapshot being reconciled.
+
+        Returns:
+            Set[str]: The account IDs.
+        """
+        return {account_id for account_id, _ in snapshot.balances} - self._coordinator.failed_accounts
+
+    def _rolling_keys(self, snapshot: AccountsSnapshot) -> List[Tuple[str, str, str]]:
+        """
+        Get the spend and income sensors wanted for the accounts whose transactions are tracked.
+
+        Args:
+            snapshot (AccountsSnapshot): The snapshot being reconciled.
+
+        Returns:
+            List[Tuple[str, str, str]]: The account ID, kind and window of every sensor.
+        """
+        rolling = self._coordinator.rolling
+        if rolling is None:
+            return []
+        tracked = rolling.accounts
+        return [
+            (acc.account_id, kind, window)
+            for acc in snapshot
+            if acc.account_id in tracked
+            for kind in KINDS
+            for window in rolling.windows
+        ]
+
+    @callback
+    def _async_remove(self, keys: List[Tuple[str, str]], snapshot: AccountsSnapshot) -> None:
+        """
+        Remove the sensors of balances that are no longer reported.
+
+        A balance type disappearing from an account that is still linked usually means the
+        account status changed, so its cached details are dropped and fetched again on the next
+        refresh.
+
+        Args:
+            keys (List[Tuple[str, str]]): The account IDs and balance types to remove.
+            snapshot (AccountsSnapshot): The snapshot being reconciled.
+        """
+        entity_registry = er.async_get(self._hass)
+        linked = {acc.account_id for acc in snapshot}
+
+        for account_id in {account_id for account_id, _ in keys} & linked:
+            self._coordinator.async_invalidate_account_metadata(account_id)
 
-        if not coordinator.data:  # <-- Prevents execution if no data is available
-            _LOGGER.warning("No account data available. Skipping sensor setup.") # CHANGE TO DEBUG
+        for key in keys:
+            sensor = self._entities.pop(key)
+            if sensor.registry_entry is not None:
+                # Removing the registry entry also removes the entity and its state
+                entity_registry.async_remove(sensor.entity_id)
+            elif sensor.hass is not None:
+                self._hass.async_create_task(sensor.async_remove())
+
+        _LOGGER.debug("Removed %d Nordigen balance sensors", len(keys))
+        self._async_remove_empty_account_devices()
+
+    @callback
+    def _async_remove_sensors(self, sensors: Dict[Any, SensorEntity], keys: List[Any]) -> None:
+        """
+        Remove total, spend or income sensors that are no longer computed.
+
+        Args:
+            sensors (Dict[Any, SensorEntity]): The index holding the sensors.
+            keys (List[Any]): The keys of the sensors to remove.
+        """
+        if not keys:
             return
 
-        if not isinstance(coordinator.data, list):
-            _LOGGER.error("Unexpected data format: %s", type(coordinator.data))
+        entity_registry = er.async_get(self._hass)
+        for key in keys:
+            sensor = sensors.pop(key)
+            if sensor.registry_entry is not None:
+                entity_registry.async_remove(sensor.entity_id)
+            elif sensor.hass is not None:
+                self._hass.async_create_task(sensor.async_remove())
+
+        _LOGGER.debug("Removed %d Nordigen sensors", len(keys))
+
+    @callback
+    def _async_remove_stale_entries(self, wanted: Set[str]) -> None:
+        """
+        Remove the registry entries of balance and total sensors left behind by earlier setups.
+
+        Only entities of account devices and the totals device are considered, so the
+        diagnostic sensors are kept. Entries of accounts that are no longer linked are removed
+        right away, and entries of a linked account once its balances were fetched. Totals and
+        entries with unique IDs of older versions are only removed once every linked account was
+        fetched, since an account that failed may still own them.
+
+        Args:
+            wanted (Set[str]): The unique IDs of the balance and total sensors that are still reported.
+        """
+        device_registry = dr.async_get(self._hass)
+        entity_registry = er.async_get(self._hass)
+        entry_id = self._entry.entry_id
+        linked = {acc.account_id for acc in self._coordinator.wrapper.accounts}
+        all_settled = linked <= self._settled
+
+        def is_stale(unique_id: str) -> bool:
+            if unique_id in wanted:
+                return False
+            for account_id in linked:
+                if unique_id.startswith(f"{entry_id}_{account_id}_"):
+                    return account_id in self._settled
+            if unique_id.startswith(f"{entry_id}_") and not unique_id.startswith(f"{entry_id}_total_"):
+                # The sensor of an account that is no longer linked
+                return True
+            return all_settled
+
+        stale = [
+            entity.entity_id
+            for entity in er.async_entries_for_config_entry(entity_registry, entry_id)
+            if entity.platform == DOMAIN
+            and is_stale(entity.unique_id)
+            and entity.device_id is not None
+            and self._is_managed_device(device_registry.async_get(entity.device_id))
+        ]
+        if not stale:
             return
 
-        entities: List[NordigenBalanceSensor] = []
-        existing_entity_ids = {entity.unique_id for entity in new_sensors}
+        for entity_id in stale:
+            entity_registry.async_remove(entity_id)
+        _LOGGER.debug("Removed %d stale Nordigen sensors", len(stale))
+        self._async_remove_empty_account_devices()
 
-        for account in coordinator.data:
-            _LOGGER.warning("Adding sensor for account: %s", account._account_id)
-            acct_id = account._account_id
+    @callback
+    def _async_remove_empty_account_devices(self) -> None:
+        """
+        Remove the account devices of the config entry that no longer have any entities.
+        """
+        device_registry = dr.async_get(self._hass)
+        entity_registry = er.async_get(self._hass)
+        for device in dr.async_entries_for_config_entry(device_registry, self._entry.entry_id):
+            if _is_account_device(device) and not er.async_entries_for_device(
+                    entity_registry, device.id, include_disabled_entities=True
+            ):
+                device_registry.async_update_device(device.id, remove_config_entry_id=self._entry.entry_id)
+
+    @callback
+    def _async_migrate_unique_ids(self, snapshot: AccountsSnapshot) -> None:
+        """
+        Move balance sensors created by older versions to unique IDs based on the account ID.
 
-            for bal in account.balances:
-                balance_type: str = bal["balanceType"]
-                unique_id: str = f"{acct_id}_{balance_type}"
+        Older versions built the unique ID from the account name, which changes with the
+        account details and is shared by accounts with the same name.
 
-                if unique_id not in existing_entity_ids:
-                    sensor = NordigenBalanceSensor(
-                        coordinator,
-                        entry.entry_id,
-                        account,
-                        balance_type
-                    )
-                    entities.append(sensor)
-                    new_sensors.append(sensor)
-                    existing_entity_ids.add(unique_id)
+        Args:
+            snapshot (AccountsSnapshot): The snapshot being reconciled.
+        """
+        entity_registry = er.async_get(self._hass)
+        entry_id = self._entry.entry_id
+        names = {acc.account_id: acc.name for acc in snapshot}
+
+        for account_id, balance_type in snapshot.balances:
+            name = names[account_id]
+            entity_id = entity_registry.async_get_entity_id(
+                "sensor", DOMAIN, f"{name}_{balance_type}_{entry_id}"
+            )
+            new_unique_id = balance_unique_id(entry_id, account_id, balance_type)
+            if entity_id is None or entity_registry.async_get_entity_id("sensor", DOMAIN, new_unique_id):
+                continue
+
+            _LOGGER.debug("Migrating unique ID of %s to %s", entity_id, new_unique_id)
+            entity_registry.async_update_entity(entity_id, new_unique_id=new_unique_id)
+
+    @callback
+    def _async_migrate_account_devices(self, snapshot: AccountsSnapshot) -> None:
+        """
+        Move account devices created by older versions to identifiers based on the account ID.
+
+        Older versions keyed the device by the account name, so accounts with the same name
+        shared one device. The device is kept by the first of its accounts, and the sensors of
+        the other accounts are moved to a device of their own.
+
+        Args:
+            snapshot (AccountsSnapshot): The snapshot being reconciled.
+        """
+        device_registry = dr.async_get(self._hass)
+        entity_registry = er.async_get(self._hass)
+        entry_id = self._entry.entry_id
+        accounts = {acc.account_id: acc for acc in snapshot}
+
+        for device in dr.async_entries_for_config_entry(device_registry, entry_id):
+            if not any(
+                    len(identifier) == 3 and identifier[:2] == (DOMAIN, entry_id) and identifier[2] not in accounts
+                    for identifier in device.identifiers
+            ):
+                continue
+
+            # The unique IDs were already moved to the account ID, so they tell the accounts apart
+            owners: Dict[str, List[str]] = {}
+            for entity in er.async_entries_for_device(entity_registry, device.id, include_disabled_entities=True):
+                for account_id in accounts:
+                    if entity.unique_id.startswith(f"{entry_id}_{account_id}_"):
+                        owners.setdefault(account_id, []).append(entity.entity_id)
+                        break
+
+            kept = False
+            for account_id, entity_ids in owners.items():
+                identifier = account_device_identifier(entry_id, account_id)
+                if not kept and device_registry.async_get_device(identifiers={identifier}) is None:
+                    _LOGGER.debug("Migrating device %s to account %s", device.id, account_id)
+                    device_registry.async_update_device(device.id, new_identifiers={identifier})
+                    kept = True
+                    continue
+
+                target = device_registry.async_get_or_create(
+                    config_entry_id=entry_id, identifiers={identifier}, name=accounts[account_id].name
+                )
+                for entity_id in entity_ids:
+                    entity_registry.async_update_entity(entity_id, device_id=target.id)
+
+        self._async_remove_empty_account_devices()
+
+    def _is_managed_device(self, device: Optional[dr.DeviceEntry]) -> bool:
+        """
+        Check whether the sensors of a device are created by the reconciler.
+
+        Args:
+            device (Optional[dr.DeviceEntry]): The device.
+
+        Returns:
+            bool: True for account devices and the totals device.
+        """
+        return _is_account_device(device) or (
+            device is not None and (DOMAIN, totals_device_id(self._entry.entry_id)) in device.identifiers
+        )
+
+
+def _is_account_device(device: Optional[dr.DeviceEntry]) -> bool:
+    """
+    Check whether a device represents a single bank account.
+
+    Args:
+        device (Optional[dr.DeviceEntry]): The device.
+
+    Returns:
+        bool: True for account devices, False for requisition and API devices.
+    """
+    return device is not None and any(
+        len(identifier) == 3 and identifier[0] == DOMAIN for identifier in device.identifiers
+    )
+
+
+@callback
+def _async_register_requisition_devices(
+        hass: HomeAssistant, entry: ConfigEntry, coordinator: NordigenDataUpdateCoordinator
+) -> None:
+    """
+    Create a device for every requisition so account devices are grouped by bank, and remove
+    the devices of requisitions that are no longer configured.
+
+    Args:
+        hass (HomeAssistant): The Home Assistant instance.
+        entry (ConfigEntry): The configuration entry for the integration.
+        coordinator (NordigenDataUpdateCoordinator): Data update coordinator instance.
+    """
+    device_registry = dr.async_get(hass)
+    wanted = {
+        (DOMAIN, requisition_device_id(entry.entry_id, requisition_id))
+        for requisition_id in coordinator.wrapper.requisitions
+    }
+    for device in dr.async_entries_for_config_entry(device_registry, entry.entry_id):
+        if any(
+                len(identifier) == 2 and identifier[1].startswith(f"{entry.entry_id}_") and identifier not in wanted
+                for identifier in device.identifiers
+        ):
+            device_registry.async_update_device(device.id, remove_config_entry_id=entry.entry_id)
+
+    for requisition_id, requisition in coordinator.wrapper.requisitions.items():
+        device_registry.async_get_or_create(
+            config_entry_id=entry.entry_id,
+            identifiers={(DOMAIN, requisition_device_id(entry.entry_id, requisition_id))},
+            name=f"{requisition.get('institution_id')} - {requisition.get('reference')}",
+            manufacturer="Nordigen",
+            model="Requisition",
+            entry_type=dr.DeviceEntryType.SERVICE,
+            configuration_url="https://ob.nordigen.com/",
+        )
+
+
+def account_device_identifier(config_entry_id: str, account_id: str) -> Tuple[str, str, str]:
+    """
+    Build the device identifier of an account.
+
+    Args:
+        config_entry_id (str): The configuration entry ID.
+        account_id (str): The account ID.
+
+    Returns:
+        Tuple[str, str, str]: The device identifier.
+    """
+    return DOMAIN, config_entry_id, account_id
 
-        if entities:
-            _LOGGER.warning("Adding %d new sensors", len(entities))
-            async_add_entities(entities)
 
-    coordinator.async_add_listener(_schedule_add_entities)
+def totals_device_id(config_entry_id: str) -> str:
+    """
+    Build the device identifier of the totals of a config entry.
+
+    Args:
+        config_entry_id (str): The configuration entry ID.
+
+    Returns:
+        str: The device identifier.
+    """
+    return f"totals_{config_entry_id}"
+
+
+def aggregate_unique_id(config_entry_id: str, key: AggregateKey) -> str:
+    """
+    Build the unique ID of a total sensor.
+
+    Args:
+        config_entry_id (str): The configuration entry ID.
+        key (AggregateKey): The group, key and currency of the total.
+
+    Returns:
+        str: The unique ID.
+    """
+    group, name, currency = key
+    return f"{config_entry_id}_total_{group}_{name}_{currency}"
 
-    # Ensure data is fetched before attempting entity creation
-    await coordinator.async_config_entry_first_refresh()
-    _schedule_add_entities()
+
+def rolling_unique_id(config_entry_id: str, account_id: str, kind: str, window: str) -> str:
+    """
+    Build the unique ID of a spend or income sensor.
+
+    Args:
+        config_entry_id (str): The configuration entry ID.
+        account_id (str): The account ID.
+        kind (str): "spend" or "income".
+        window (str): The window name, e.g. "week".
+
+    Returns:
+        str: The unique ID.
+    """
+    return f"{config_entry_id}_{account_id}_{kind}_{window}"
+
+
+def balance_unique_id(config_entry_id: str, account_id: str, balance_type: str) -> str:
+    """
+    Build the unique ID of a balance sensor.
+
+    Args:
+        config_entry_id (str): The configuration entry ID.
+        account_id (str): The account ID.
+        balance_type (str): The balance type, e.g. "interimAvailable".
+
+    Returns:
+        str: The unique ID.
+    """
+    return f"{config_entry_id}_{account_id}_{balance_type}"
+
+
+def requisition_device_id(config_entry_id: str, requisition_id: str) -> str:
+    """
+    Build the device identifier of a requisition.
+
+    Args:
+        config_entry_id (str): The configuration entry ID.
+        requisition_id (str): The requisition ID.
+
+    Returns:
+        str: The device identifier.
+    """
+    return f"{config_entry_id}_{requisition_id}"
 
 
 class NordigenBalanceSensor(SensorEntity):
@@ -88,7 +548,7 @@ class NordigenBalanceSensor(SensorEntity):
     Attributes:
         coordinator (NordigenDataUpdateCoordinator): Data update coordinator instance.
         _config_entry_id (str): The configuration entry ID associated with this sensor.
-        _account: The bank account object associated with this sensor.
+        _account_id (str): The ID of the bank account associated with this sensor.
         _balance_type (str): The type of balance being tracked (e.g., 'closingBooked').
     """
 
@@ -96,78 +556,54 @@ class NordigenBalanceSensor(SensorEntity):
     _attr_state_class = "total"
 
     def __init__(
-            self, coordinator: NordigenDataUpdateCoordinator, config_entry_id: str, account: BankAccount, balance_type: str
+            self, coordinator: NordigenDataUpdateCoordinator, config_entry_id: str, account: AccountSnapshot, balance_type: str
     ) -> None:
         self.coordinator = coordinator
         self._config_entry_id = config_entry_id
-        self._account = account
+        self._account_id = account.account_id
         self._balance_type = balance_type
-        self._attr_unique_id: str = f"{account.name}_{balance_type}_{config_entry_id}"
+        self._attr_unique_id: str = balance_unique_id(config_entry_id, account.account_id, balance_type)
         self._attr_name: str = f"{account.name}_{balance_type}"
-        self._attr_available: bool = True
+        self._index_key: Tuple[str, str] = (account.account_id, balance_type)
+        self._last_written_available: Optional[bool] = None
         self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, config_entry_id, account.name)},
+            identifiers={account_device_identifier(config_entry_id, account.account_id)},
             name=account.name,
             manufacturer="Nordigen",
             model=f"Status: {account.status}",
             configuration_url="https://ob.nordigen.com/",
         )
+        requisition_id = coordinator.wrapper.account_requisitions.get(account.account_id)
+        if requisition_id is not None:
+            self._attr_device_info["via_device"] = (DOMAIN, requisition_device_id(config_entry_id, requisition_id))
+
+    @property
+    def _balance(self) -> Optional[BalanceSnapshot]:
+        """
+        Look up the balance tracked by this sensor in the published snapshot.
+        """
+        return self.coordinator.balance_index.get(self._index_key)
 
     @property
     def native_unit_of_measurement(self) -> Optional[str]:
         """
         Return the currency as the unit of measurement.
         """
-        for bal in self._account.balances:
-            if bal["balanceType"] == self._balance_type:
-                currency = bal["currency"]
-                if currency:
-                    return currency
-
-        self._attr_available = False
-        return None
+        balance = self._balance
+        return balance.currency if balance is not None else None
 
     @property
-    def native_value(self) -> Optional[float]:
+    def native_value(self) -> Optional[Decimal]:
         """
         Retrieve the current balance for the associated bank account.
 
         Returns:
-            float: The current balance amount.
-        """
-        for bal in self._account.balances:
-            if bal["balanceType"] == self._balance_type:
-                amount = bal.get("amount")
-
-                # Ensure amount is valid
-                if amount is None or amount == "":
-                    _LOGGER.warning(
-                        "Balance amount for %s is None or empty, setting to 0.0",
-                        self._attr_unique_id
-                    )
-                    self._attr_available = False  # Mark entity as unavailable
-                    return 0.0  # Prevent TypeError
-
-                try:
-                    balance_value = float(amount) # REMOVE THIS LINE
-                    _LOGGER.warning(
-                        "Sensor updated: entity_id=%s, account_id=%s, balance_type=%s, balance_value=%.2f",
-                        self.entity_id,
-                        self._account._account_id,
-                        self._balance_type,
-                        balance_value
-                    ) # REMOVE THIS LINE
-                    return float(amount)
-                except ValueError:
-                    _LOGGER.error(
-                        "Invalid amount format for %s: %s",
-                        self._attr_unique_id,
-                        amount
-                    )
-                    return 0.0
-
-        self._attr_available = False  # Mark entity as unavailable if no valid balance found
-        return 0.0
+            Decimal: The current balance amount, or None if it is missing or invalid.
+        """
+        balance = self._balance
+        if balance is None or not balance.valid:
+            return None
+        return balance.amount
 
     @property
     def should_poll(self) -> bool:
@@ -184,17 +620,387 @@ class NordigenBalanceSensor(SensorEntity):
         Handle actions when the sensor entity is added to Home Assistant.
         """
         self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
         )
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """
+        Write the new state after a coordinator refresh, but only if this sensor's amount,
+        currency or availability changed.
+        """
+        available = self.available
+        if self._index_key not in self.coordinator.changed_balance_keys and available == self._last_written_available:
+            return
+
+        self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """
+        Write the state to the state machine and remember the availability that was written.
+        """
+        self._last_written_available = self.available
+        super().async_write_ha_state()
+
     @property
     def available(self) -> bool:
         """
         Determine if the entity should be marked as available.
 
+        The sensor is unavailable while the last refresh of its account failed, even if other
+        accounts were refreshed.
+
         Returns:
             bool: True if the sensor should be considered available, False otherwise.
         """
         if not self.coordinator.last_update_success:
             return False
-        return any(bal["balanceType"] for bal in self._account.balances)
+        if self._account_id in self.coordinator.failed_accounts:
+            return False
+        balance = self._balance
+        return balance is not None and balance.valid
+
+
+class NordigenRollingSensor(SensorEntity):
+    """
+    Represents the spend or income of a bank account over a sliding window of booking dates.
+
+    Attributes:
+        coordinator (NordigenDataUpdateCoordinator): Data update coordinator instance.
+        _account_id (str): The ID of the bank account associated with this sensor.
+        _kind (str): "spend" or "income".
+        _window (str): The window name, e.g. "week".
+    """
+
+    _attr_device_class = "monetary"
+    _attr_state_class = "total"
+    _attr_should_poll = False
+
+    def __init__(
+            self,
+            coordinator: NordigenDataUpdateCoordinator,
+            config_entry_id: str,
+            account: AccountSnapshot,
+            kind: str,
+            window: str,
+    ) -> None:
+        self.coordinator = coordinator
+        self._account_id = account.account_id
+        self._kind = kind
+        self._window = window
+        self._attr_unique_id = rolling_unique_id(config_entry_id, account.account_id, kind, window)
+        self._attr_name = f"{account.name}_{kind}_{window}"
+        self._last_written_available: Optional[bool] = None
+        self._attr_device_info = DeviceInfo(
+            identifiers={account_device_identifier(config_entry_id, account.account_id)}
+        )
+
+    @property
+    def native_value(self) -> Optional[Decimal]:
+        """
+        Return the total of the window as a positive amount.
+        """
+        return self.coordinator.rolling.total(self._account_id, self._kind, self._window)
+
+    @property
+    def native_unit_of_measurement(self) -> Optional[str]:
+        """
+        Return the currency of the account's transactions as the unit of measurement.
+        """
+        return self.coordinator.rolling.currency(self._account_id)
+
+    @property
+    def available(self) -> bool:
+        """
+        Determine if the entity should be marked as available.
+
+        Totals are kept from the transactions already synced, so they stay available when a
+        refresh fails.
+        """
+        return self._account_id in self.coordinator.rolling.accounts
+
+    async def async_added_to_hass(self) -> None:
+        """
+        Handle actions when the sensor entity is added to Home Assistant.
+        """
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """
+        Write the new state after a coordinator refresh, but only if the account's totals changed.
+        """
+        if (
+                self._account_id not in self.coordinator.changed_rolling_accounts
+                and self.available == self._last_written_available
+        ):
+            return
+
+        self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """
+        Write the state to the state machine and remember the availability that was written.
+        """
+        self._last_written_available = self.available
+        super().async_write_ha_state()
+
+
+class NordigenAggregateSensor(SensorEntity):
+    """
+    Represents a total of balances over several accounts, computed by the coordinator once
+    per refresh.
+
+    Attributes:
+        coordinator (NordigenDataUpdateCoordinator): Data update coordinator instance.
+        _key (AggregateKey): The group, key and currency of the total.
+    """
+
+    _attr_device_class = "monetary"
+    _attr_state_class = "total"
+    _attr_should_poll = False
+
+    def __init__(
+            self, coordinator: NordigenDataUpdateCoordinator, config_entry_id: str, key: AggregateKey
+    ) -> None:
+        self.coordinator = coordinator
+        self._key = key
+        group, name, currency = key
+        self._attr_unique_id = aggregate_unique_id(config_entry_id, key)
+        if group == GROUP_TOTAL:
+            self._attr_name = f"Nordigen total {currency}"
+        elif group == GROUP_CURRENCY:
+            self._attr_name = f"Nordigen {currency} accounts total"
+        else:
+            self._attr_name = f"Nordigen {name} total {currency}"
+        self._attr_native_unit_of_measurement = currency
+        self._last_written_available: Optional[bool] = None
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, totals_device_id(config_entry_id))},
+            name="Nordigen totals",
+            manufacturer="Nordigen",
+            model="Totals",
+            entry_type=dr.DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def _total(self) -> Optional[AggregateTotal]:
+        """
+        Look up the total tracked by this sensor in the coordinator.
+        """
+        return self.coordinator.aggregates.get(self._key)
+
+    @property
+    def native_value(self) -> Optional[Decimal]:
+        """
+        Return the total amount.
+        """
+        total = self._total
+        return total.amount if total is not None and total.accounts else None
+
+    @property
+    def available(self) -> bool:
+        """
+        Determine if the entity should be marked as available.
+
+        Totals are computed from the last known balances, so they stay available when a refresh
+        fails, but not when none of the balances could be converted to the base currency.
+        """
+        total = self._total
+        return total is not None and bool(total.accounts)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """
+        Return the accounts in the total and the currencies left out for lack of an exchange rate.
+        """
+        total = self._total
+        if total is None:
+            return {}
+        attributes: Dict[str, Any] = {"accounts": len(total.accounts)}
+        exchange_rates = self.coordinator.exchange_rates
+        if total.currency == self.coordinator.base_currency and exchange_rates is not None:
+            attributes["exchange_rates_date"] = exchange_rates.rates_date
+        if total.unconverted:
+            attributes["unconverted_currencies"] = list(total.unconverted)
+        return attributes
+
+    async def async_added_to_hass(self) -> None:
+        """
+        Handle actions when the sensor entity is added to Home Assistant.
+        """
+        self.async_on_remove(
+            self.coordinator.async_add_listener(self._handle_coordinator_update)
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """
+        Write the new state after a coordinator refresh, but only if this total changed.
+        """
+        if self._key not in self.coordinator.changed_aggregate_keys and self.available == self._last_written_available:
+            return
+
+        self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """
+        Write the state to the state machine and remember the availability that was written.
+        """
+        self._last_written_available = self.available
+        super().async_write_ha_state()
+
+
+class DiagnosticDescription(NamedTuple):
+    """Describes a diagnostic sensor reading one measurement from the coordinator."""
+
+    key: str
+    name: str
+    unit: Optional[str]
+    device_class: Optional[str]
+    state_class: Optional[str]
+    value: Callable[[NordigenDataUpdateCoordinator], Any]
+    attributes: Callable[[NordigenDataUpdateCoordinator], Dict[str, Any]]
+
+
+def _mean_latency_ms(coordinator: NordigenDataUpdateCoordinator) -> Optional[float]:
+    """
+    Get the mean latency of all API calls in milliseconds.
+    """
+    mean = coordinator.wrapper.metrics.mean_latency
+    return round(mean * 1000, 1) if mean is not None else None
+
+
+def _endpoint_latency_ms(coordinator: NordigenDataUpdateCoordinator) -> Dict[str, Any]:
+    """
+    Get the mean and maximum latency of every endpoint in milliseconds.
+    """
+    return {
+        endpoint: {"mean": round(histogram.mean * 1000, 1), "max": round(histogram.max * 1000, 1)}
+        for endpoint, histogram in coordinator.wrapper.metrics.latency.items()
+        if histogram.count
+    }
+
+
+def _cache_hit_ratio(coordinator: NordigenDataUpdateCoordinator) -> Optional[float]:
+    """
+    Get the share of account details served from the cache in percent.
+    """
+    ratio = coordinator.wrapper.metrics.cache_hit_ratio
+    return round(ratio * 100, 1) if ratio is not None else None
+
+
+def _oldest_success(coordinator: NordigenDataUpdateCoordinator) -> Optional[datetime]:
+    """
+    Get the time of the least recent successful balances fetch over all accounts.
+    """
+    last_success = coordinator.wrapper.last_success
+    timestamps = [last_success.get(acc.account_id) for acc in coordinator.wrapper.accounts]
+    if not timestamps or None in timestamps:
+        return None
+    return dt_util.utc_from_timestamp(min(timestamps))
+
+
+def _success_per_account(coordinator: NordigenDataUpdateCoordinator) -> Dict[str, Any]:
+    """
+    Get the time of the last successful balances fetch of every account.
+    """
+    return {
+        account_id: dt_util.utc_from_timestamp(timestamp).isoformat()
+        for account_id, timestamp in coordinator.wrapper.last_success.items()
+    }
+
+
+DIAGNOSTIC_SENSORS: List[DiagnosticDescription] = [
+    DiagnosticDescription(
+        "api_calls", "API calls", None, None, SensorStateClass.TOTAL_INCREASING,
+        lambda coordinator: coordinator.wrapper.metrics.total_calls,
+        lambda coordinator: dict(coordinator.wrapper.metrics.calls),
+    ),
+    DiagnosticDescription(
+        "api_latency", "API latency", UnitOfTime.MILLISECONDS, SensorDeviceClass.DURATION,
+        SensorStateClass.MEASUREMENT, _mean_latency_ms, _endpoint_latency_ms,
+    ),
+    DiagnosticDescription(
+        "refresh_errors", "refresh errors", None, None, SensorStateClass.TOTAL_INCREASING,
+        lambda coordinator: sum(coordinator.error_counts.values()),
+        lambda coordinator: {str(status): count for status, count in coordinator.error_counts.items()},
+    ),
+    DiagnosticDescription(
+        "deadlines_exceeded", "deadlines exceeded", None, None, SensorStateClass.TOTAL_INCREASING,
+        lambda coordinator: sum(coordinator.wrapper.metrics.deadlines_exceeded.values()),
+        lambda coordinator: dict(coordinator.wrapper.metrics.deadlines_exceeded),
+    ),
+    DiagnosticDescription(
+        "token_refreshes", "token refreshes", None, None, SensorStateClass.TOTAL_INCREASING,
+        lambda coordinator: coordinator.wrapper.token_refresh_count,
+        lambda coordinator: {},
+    ),
+    DiagnosticDescription(
+        "metadata_cache_hit_ratio", "account details cache hit ratio", PERCENTAGE, None,
+        SensorStateClass.MEASUREMENT, _cache_hit_ratio,
+        lambda coordinator: {
+            "hits": coordinator.wrapper.metrics.cache_hits,
+            "misses": coordinator.wrapper.metrics.cache_misses,
+        },
+    ),
+    DiagnosticDescription(
+        "last_successful_fetch", "last successful fetch", None, SensorDeviceClass.TIMESTAMP, None,
+        _oldest_success, _success_per_account,
+    ),
+]
+
+
+class NordigenDiagnosticSensor(SensorEntity):
+    """
+    Exposes one API call measurement of the coordinator as a diagnostic sensor.
+
+    The sensors are disabled by default and belong to one service device per config entry.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = False
+
+    def __init__(
+            self, coordinator: NordigenDataUpdateCoordinator, config_entry_id: str, description: DiagnosticDescription
+    ) -> None:
+        self.coordinator = coordinator
+        self._description = description
+        self._attr_unique_id = f"{config_entry_id}_{description.key}"
+        self._attr_name = f"Nordigen {description.name}"
+        self._attr_native_unit_of_measurement = description.unit
+        self._attr_device_class = description.device_class
+        self._attr_state_class = description.state_class
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, config_entry_id)},
+            name="Nordigen API",
+            manufacturer="Nordigen",
+            model="API client",
+            entry_type=dr.DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def native_value(self) -> Any:
+        """
+        Read the measurement from the coordinator.
+        """
+        return self._description.value(self.coordinator)
+
+    @property
+    def extra_state_attributes(self) -> Dict[str, Any]:
+        """
+        Return the breakdown of the measurement, e.g. per endpoint or per account.
+        """
+        return self._description.attributes(self.coordinator)
+
+    async def async_added_to_hass(self) -> None:
+        """
+        Write the state after every coordinator refresh, successful or not.
+        """
+        self.async_on_remove(self.coordinator.async_add_listener(self.async_write_ha_state))
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+from typing import Dict, Set
+
+import voluptuous as vol
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import ATTR_AREA_ID, ATTR_DEVICE_ID, ATTR_ENTITY_ID, ENTITY_MATCH_ALL
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+
+from .const import DOMAIN, SERVICE_REFRESH, ATTR_ACCOUNT_ID
+from .coordinator import NordigenDataUpdateCoordinator
+from .nordigen_wrapper import NordigenAPIError
+from .sensor import requisition_device_id, totals_device_id
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_REFRESH_SCHEMA = vol.Schema(
+    {
+        **cv.ENTITY_SERVICE_FIELDS,
+        vol.Optional(ATTR_ACCOUNT_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """
+    Register the services of the integration.
+
+    Args:
+        hass (HomeAssistant): The Home Assistant instance.
+    """
+    async def async_handle_refresh(call: ServiceCall) -> None:
+        """
+        Refresh the targeted accounts, or every account when no target is given.
+
+        Raises:
+            HomeAssistantError: If no account matches the targets or the refresh fails.
+        """
+        coordinators: Dict[str, NordigenDataUpdateCoordinator] = {
+            entry_id: data["coordinator"]
+            for entry_id, data in hass.data.get(DOMAIN, {}).items()
+            if _entry_loaded(hass, entry_id)
+        }
+        targets = _async_resolve_accounts(hass, call, coordinators)
+        if not any(targets.values()):
+            raise HomeAssistantError("No Nordigen accounts match the given targets")
+
+        _LOGGER.debug("Refreshing Nordigen accounts on request: %s", targets)
+        results = await asyncio.gather(
+            *(
+                coordinators[entry_id].async_refresh_accounts(account_ids)
+                for entry_id, account_ids in targets.items()
+                if account_ids
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, NordigenAPIError):
+                raise HomeAssistantError(f"Failed to refresh Nordigen accounts: {result}") from result
+            if isinstance(result, BaseException):
+                raise result
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_REFRESH, async_handle_refresh, schema=SERVICE_REFRESH_SCHEMA
+    )
+
+
+def _entry_loaded(hass: HomeAssistant, entry_id: str) -> bool:
+    """
+    Check whether a config entry is loaded, so its coordinator may still call the API.
+
+    Args:
+        hass (HomeAssistant): The Home Assistant instance.
+        entry_id (str): The config entry ID.
+
+    Returns:
+        bool: True if the entry is loaded.
+    """
+    entry = hass.config_entries.async_get_entry(entry_id)
+    return entry is not None and entry.state is ConfigEntryState.LOADED
+
+
+@callback
+def _async_resolve_accounts(
+        hass: HomeAssistant, call: ServiceCall, coordinators: Dict[str, NordigenDataUpdateCoordinator]
+) -> Dict[str, Set[str]]:
+    """
+    Map the entity, device and account targets of a service call to account IDs.
+
+    Args:
+        hass (HomeAssistant): The Home Assistant instance.
+        call (ServiceCall): The service call.
+        coordinators (Dict[str, NordigenDataUpdateCoordinator]): The coordinators keyed by config entry ID.
+
+    Returns:
+        Dict[str, Set[str]]: The targeted account IDs keyed by config entry ID.
+    """
+    account_ids = set(call.data.get(ATTR_ACCOUNT_ID, []))
+    has_target = any(key in call.data for key in (ATTR_ENTITY_ID, ATTR_DEVICE_ID, ATTR_AREA_ID))
+
+    if (not has_target and not account_ids) or call.data.get(ATTR_ENTITY_ID) == ENTITY_MATCH_ALL:
+        return {
+            entry_id: {acc.account_id for acc in coordinator.wrapper.accounts}
+            for entry_id, coordinator in coordinators.items()
+        }
+
+    selected = async_extract_referenced_entity_ids(hass, call)
+    device_ids = set(selected.referenced_devices)
+    entity_registry = er.async_get(hass)
+    for entity_id in selected.referenced | selected.indirectly_referenced:
+        entity = entity_registry.async_get(entity_id)
+        if entity is not None and entity.platform == DOMAIN and entity.device_id:
+            device_ids.add(entity.device_id)
+
+    targets: Dict[str, Set[str]] = {entry_id: set() for entry_id in coordinators}
+    device_registry = dr.async_get(hass)
+    for device_id in device_ids:
+        device = device_registry.async_get(device_id)
+        if device is None:
+            continue
+        for identifier in device.identifiers:
+            for entry_id, coordinator in coordinators.items():
+                targets[entry_id].update(_account_ids_for_device(entry_id, coordinator, identifier))
+
+    for entry_id, coordinator in coordinators.items():
+        targets[entry_id].update(account_ids & coordinator.wrapper.account_requisitions.keys())
+
+    return targets
+
+
+def _account_ids_for_device(
+        entry_id: str, coordinator: NordigenDataUpdateCoordinator, identifier: tuple
+) -> Set[str]:
+    """
+    Get the accounts represented by a device of a config entry.
+
+    Account devices cover one account, requisition devices cover the accounts of that bank and
+    the API and totals devices cover every account of the entry.
+
+    Args:
+        entry_id (str): The config entry ID.
+        coordinator (NordigenDataUpdateCoordinator): The coordinator of the config entry.
+        identifier (tuple): One of the device identifiers.
+
+    Returns:
+        Set[str]: The account IDs.
+    """
+    if identifier[0] != DOMAIN:
+        return set()
+
+    wrapper = coordinator.wrapper
+    if len(identifier) == 3 and identifier[1] == entry_id:
+        return {acc.account_id for acc in wrapper.accounts if acc.account_id == identifier[2]}
+    if identifier[1] in (entry_id, totals_device_id(entry_id)):
+        return {acc.account_id for acc in wrapper.accounts}
+    for requisition_id, requisition in wrapper.requisitions.items():
+        if identifier[1] == requisition_device_id(entry_id, requisition_id):
+            return set(requisition.get("accounts", []))
+    return set()
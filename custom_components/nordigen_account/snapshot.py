@@ -0,0 +1,133 @@
+import logging
+from decimal import Decimal, InvalidOperation
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, Mapping, NamedTuple, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BalanceSnapshot(NamedTuple):
+    """A balance of an account, parsed once per refresh."""
+
+    balance_type: str
+    amount: Optional[Decimal]
+    currency: Optional[str]
+    reference_date: Optional[str] = None
+    last_change: Optional[str] = None
+
+    @property
+    def valid(self) -> bool:
+        """
+        Check whether the balance has both an amount and a currency.
+        """
+        return self.amount is not None and self.currency is not None
+
+
+class AccountSnapshot(NamedTuple):
+    """An account with the details and balances read by the sensors."""
+
+    account_id: str
+    name: Optional[str]
+    status: Optional[str]
+    currency: Optional[str]
+    balances: Tuple[BalanceSnapshot, ...] = ()
+
+
+class AccountsSnapshot:
+    """
+    The accounts and balances published by one refresh.
+
+    A snapshot is built once and never changed, so readers always see the balances of a single
+    refresh. A refresh publishes its data by replacing the previous snapshot as a whole.
+    """
+
+    __slots__ = ("accounts", "balances")
+
+    accounts: Tuple[AccountSnapshot, ...]
+    balances: Mapping[Tuple[str, str], BalanceSnapshot]
+
+    def __init__(self, accounts: Iterable[AccountSnapshot] = ()) -> None:
+        """
+        Build a snapshot and index its balances by account ID and balance type.
+
+        Args:
+            accounts (Iterable[AccountSnapshot]): The accounts, in the order they are shown.
+        """
+        accounts = tuple(accounts)
+        object.__setattr__(self, "accounts", accounts)
+        object.__setattr__(
+            self,
+            "balances",
+            MappingProxyType(
+                {(acc.account_id, bal.balance_type): bal for acc in accounts for bal in acc.balances}
+            ),
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __iter__(self) -> Iterator[AccountSnapshot]:
+        return iter(self.accounts)
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self.accounts)} accounts, {len(self.balances)} balances)"
+
+
+def parse_amount(value: Any) -> Optional[Decimal]:
+    """
+    Parse a balance amount from the API or from disk.
+
+    Args:
+        value (Any): The amount as a string or number.
+
+    Returns:
+        Optional[Decimal]: The amount, or None if it is missing or invalid.
+    """
+    if value in (None, ""):
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        _LOGGER.debug("Invalid amount format: %s", value)
+        return None
+
+
+def balance_from_dict(balance: Dict[str, Any]) -> BalanceSnapshot:
+    """
+    Build a balance from its persisted form.
+
+    Args:
+        balance (Dict[str, Any]): The balance, as returned by balance_to_dict.
+
+    Returns:
+        BalanceSnapshot: The balance.
+    """
+    return BalanceSnapshot(
+        balance_type=balance.get("balanceType", "Unknown"),
+        amount=parse_amount(balance.get("amount")),
+        currency=balance.get("currency") or None,
+        reference_date=balance.get("referenceDate"),
+        last_change=balance.get("lastChangeDateTime"),
+    )
+
+
+def balance_to_dict(balance: BalanceSnapshot) -> Dict[str, Any]:
+    """
+    Get the persisted form of a balance, using the field names of the API.
+
+    Args:
+        balance (BalanceSnapshot): The balance.
+
+    Returns:
+        Dict[str, Any]: The balance, suitable for JSON storage.
+    """
+    return {
+        "balanceType": balance.balance_type,
+        "amount": str(balance.amount) if balance.amount is not None else None,
+        "currency": balance.currency,
+        "referenceDate": balance.reference_date,
+        "lastChangeDateTime": balance.last_change,
+    }
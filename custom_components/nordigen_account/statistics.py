@@ -0,0 +1,219 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+from .const import DOMAIN, STORAGE_VERSION, STORAGE_KEY_STATISTICS
+from .snapshot import AccountSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Delay before the import progress is written to disk, so bursts of changes are batched
+STATISTICS_SAVE_DELAY_SECONDS = 10
+
+
+class BalancePoint(NamedTuple):
+    """A balance of an account at a point in time."""
+
+    balance_type: str
+    amount: float
+    currency: Optional[str]
+    timestamp: datetime
+
+
+def statistic_id_for(account_id: str, balance_type: str) -> str:
+    """
+    Get the external statistic ID of an account balance.
+
+    Args:
+        account_id (str): The account ID.
+        balance_type (str): The balance type, e.g. "interimAvailable".
+
+    Returns:
+        str: The statistic ID in the "nordigen_account:<object_id>" format.
+    """
+    return f"{DOMAIN}:{slugify(f'{account_id}_{balance_type}')}"
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an ISO date or date-time from the API into an aware UTC datetime.
+
+    Dates are taken as midnight in the local time zone.
+
+    Args:
+        value (Optional[str]): The ISO date or date-time.
+
+    Returns:
+        Optional[datetime]: The parsed timestamp, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+
+    parsed = dt_util.parse_datetime(value)
+    if parsed is None:
+        date = dt_util.parse_date(value)
+        if date is None:
+            return None
+        return dt_util.as_utc(dt_util.start_of_local_day(date))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return dt_util.as_utc(parsed)
+
+
+def balance_points(account: AccountSnapshot, now: datetime) -> List[BalancePoint]:
+    """
+    Get the current balances of an account as timestamped points.
+
+    A balance is placed at its "lastChangeDateTime", falling back to its "referenceDate" and
+    then to the time of the refresh. Balances without a valid amount are left out.
+
+    Args:
+        account (AccountSnapshot): The account holding the balances.
+        now (datetime): The time of the refresh.
+
+    Returns:
+        List[BalancePoint]: The balance points.
+    """
+    points = []
+    for bal in account.balances:
+        if bal.amount is None:
+            continue
+        timestamp = _parse_timestamp(bal.last_change) or _parse_timestamp(bal.reference_date) or now
+        points.append(BalancePoint(bal.balance_type, float(bal.amount), bal.currency, min(timestamp, now)))
+    return points
+
+
+def history_points(transactions: Iterable[Dict[str, Any]]) -> List[BalancePoint]:
+    """
+    Get the historical balances reported with booked transactions.
+
+    Many banks return the balance after every transaction, which allows the balance history
+    before the first refresh to be backfilled.
+
+    Args:
+        transactions (Iterable[Dict[str, Any]]): Booked transactions in Berlin Group PSD2 format.
+
+    Returns:
+        List[BalancePoint]: The balance points of the transactions that report a balance.
+    """
+    points = []
+    for transaction in transactions:
+        balance = transaction.get("balanceAfterTransaction")
+        timestamp = _parse_timestamp(transaction.get("bookingDateTime")) or _parse_timestamp(
+            transaction.get("bookingDate")
+        )
+        if not balance or timestamp is None:
+            continue
+
+        amount = balance.get("balanceAmount", {})
+        try:
+            value = float(amount.get("amount"))
+        except (TypeError, ValueError):
+            continue
+        points.append(
+            BalancePoint(balance.get("balanceType", "Unknown"), value, amount.get("currency"), timestamp)
+        )
+    return points
+
+
+class BalanceStatisticsImporter:
+    """
+    Import balance points into the recorder's long-term statistics.
+
+    Points are grouped by statistic and hour, so each refresh results in one batched insert per
+    balance. The hour of the last imported point is kept on disk, so points that were already
+    imported are not sent again after a restart.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """
+        Initialize the importer.
+
+        Args:
+            hass (HomeAssistant): The Home Assistant instance.
+            entry_id (str): The ID of the config entry owning the accounts.
+        """
+        self.hass: HomeAssistant = hass
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{STORAGE_KEY_STATISTICS}.{entry_id}")
+        self._last_imported: Dict[str, float] = {}
+
+    async def async_load(self) -> None:
+        """
+        Load the import progress saved by a previous run.
+        """
+        stored = await self._store.async_load()
+        if stored:
+            self._last_imported = dict(stored.get("last_imported", {}))
+
+    def last_imported(self, account_id: str, balance_types: Iterable[str]) -> Optional[datetime]:
+        """
+        Get the oldest hour up to which all balances of an account were imported.
+
+        Args:
+            account_id (str): The account ID.
+            balance_types (Iterable[str]): The balance types of the account.
+
+        Returns:
+            Optional[datetime]: The start of that hour, or None if a balance was never imported.
+        """
+        timestamps = [
+            self._last_imported.get(statistic_id_for(account_id, balance_type))
+            for balance_type in balance_types
+        ]
+        if not timestamps or None in timestamps:
+            return None
+        return dt_util.utc_from_timestamp(min(timestamps))
+
+    @callback
+    def async_import(self, account: AccountSnapshot, points: Iterable[BalancePoint]) -> int:
+        """
+        Queue the balance points of an account for import into the recorder.
+
+        Args:
+            account (AccountSnapshot): The account the points belong to.
+            points (Iterable[BalancePoint]): The balance points, in any order.
+
+        Returns:
+            int: The number of hourly statistics queued.
+        """
+        account_id = account.account_id
+        grouped: Dict[str, Dict[datetime, BalancePoint]] = {}
+
+        for point in sorted(points, key=lambda p: p.timestamp):
+            statistic_id = statistic_id_for(account_id, point.balance_type)
+            start = point.timestamp.replace(minute=0, second=0, microsecond=0)
+            last_imported = self._last_imported.get(statistic_id)
+            if last_imported is not None and start.timestamp() < last_imported:
+                continue
+            # The latest point inside an hour wins
+            grouped.setdefault(statistic_id, {})[start] = point
+
+        queued = 0
+        for statistic_id, hours in grouped.items():
+            latest = hours[max(hours)]
+            metadata = StatisticMetaData(
+                has_mean=False,
+                has_sum=True,
+                name=f"{account.name or account_id} {latest.balance_type}",
+                source=DOMAIN,
+                statistic_id=statistic_id,
+                unit_of_measurement=latest.currency,
+            )
+            statistics = [
+                StatisticData(start=start, state=point.amount, sum=point.amount)
+                for start, point in sorted(hours.items())
+            ]
+            async_add_external_statistics(self.hass, metadata, statistics)
+            self._last_imported[statistic_id] = max(hours).timestamp()
+            queued += len(statistics)
+
+        if queued:
+            self._store.async_delay_save(
+                lambda: {"last_imported": dict(self._last_imported)}, STATISTICS_SAVE_DELAY_SECONDS
+            )
+        return queued
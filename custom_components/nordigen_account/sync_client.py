@@ -0,0 +1,154 @@
+import asyncio
+from typing import Any, Dict, Iterable, Optional
+
+from aiohttp import ClientError, ClientSession, ClientTimeout, UnixConnector
+from nordigen_account import NordigenAPIError
+
+from .const import (
+    REQUEST_TIMEOUT_SECONDS,
+    SYNC_REFRESH_PATH,
+    SYNC_SNAPSHOT_FORMAT,
+    SYNC_SNAPSHOT_PATH,
+)
+
+# URL scheme of a sync daemon listening on a Unix socket, e.g. "unix:///run/nordigen.sock"
+UNIX_SCHEME = "unix:"
+
+
+class SyncDaemonClient:
+    """
+    Read the account snapshots served by a sync daemon instead of calling the Nordigen API.
+
+    Every poll sends the version of the last snapshot received, so an unchanged snapshot costs
+    an empty 304 response. Errors are raised as NordigenAPIError, like the errors of the API
+    itself, so callers handle both the same way.
+    """
+
+    def __init__(
+            self,
+            session: ClientSession,
+            url: str,
+            token: Optional[str] = None,
+            timeout: float = REQUEST_TIMEOUT_SECONDS,
+    ) -> None:
+        """
+        Initialize the client.
+
+        Args:
+            session (ClientSession): The shared aiohttp session, used for daemons reached over HTTP.
+            url (str): The base URL of the daemon, or "unix:" followed by the path of its socket.
+            token (Optional[str]): The bearer token the daemon requires, if any.
+            timeout (float): Timeout in seconds of every request. A refresh waits for the daemon
+                to call the API, so it gets the refresh deadline of the daemon instead.
+        """
+        self._owns_session: bool = url.startswith(UNIX_SCHEME)
+        if self._owns_session:
+            path = url[len(UNIX_SCHEME):]
+            self._session: ClientSession = ClientSession(
+                connector=UnixConnector(path=path[2:] if path.startswith("//") else path)
+            )
+            self._base_url: str = "http://localhost"
+        else:
+            self._session = session
+            self._base_url = url.rstrip("/")
+        self._headers: Dict[str, str] = {"accept": "application/json"}
+        if token:
+            self._headers["Authorization"] = f"Bearer {token}"
+        self._timeout: ClientTimeout = ClientTimeout(total=timeout)
+        self.version: Optional[int] = None
+
+    async def async_get_snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest snapshot if it changed since the last one received.
+
+        Returns:
+            Optional[Dict[str, Any]]: The snapshot, in the format of NordigenWrapper.accounts_snapshot
+                with the failed accounts and its version, or None if it did not change.
+
+        Raises:
+            NordigenAPIError: If the daemon cannot be reached, fails or serves an unknown format.
+        """
+        headers = {"If-None-Match": f'"{self.version}"'} if self.version is not None else {}
+        return await self._request("GET", SYNC_SNAPSHOT_PATH, headers=headers)
+
+    async def async_refresh(self, account_ids: Iterable[str], timeout: float) -> Dict[str, Any]:
+        """
+        Ask the daemon to refresh accounts now and get the resulting snapshot.
+
+        The daemon still only calls the API for accounts with remaining quota.
+
+        Args:
+            account_ids (Iterable[str]): The accounts to refresh.
+            timeout (float): Seconds to wait for the refresh.
+
+        Returns:
+            Dict[str, Any]: The snapshot after the refresh.
+
+        Raises:
+            NordigenAPIError: If the daemon cannot be reached or the refresh fails.
+        """
+        snapshot = await self._request(
+            "POST",
+            SYNC_REFRESH_PATH,
+            payload={"account_ids": list(account_ids)},
+            timeout=ClientTimeout(total=timeout),
+        )
+        if snapshot is None:
+            raise NordigenAPIError(message="The sync daemon returned no snapshot after a refresh")
+        return snapshot
+
+    async def async_close(self) -> None:
+        """
+        Close the connection to a daemon reached over a Unix socket.
+        """
+        if self._owns_session:
+            await self._session.close()
+
+    async def _request(
+            self,
+            method: str,
+            path: str,
+            payload: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[ClientTimeout] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Send a request to the daemon and decode the snapshot it returns.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path relative to the base URL.
+            payload (Optional[Dict[str, Any]]): JSON body sent with the request.
+            headers (Optional[Dict[str, str]]): Headers sent in addition to the default ones.
+            timeout (Optional[ClientTimeout]): The timeout; the client's timeout when omitted.
+
+        Returns:
+            Optional[Dict[str, Any]]: The snapshot, or None if the daemon answered 304.
+
+        Raises:
+            NordigenAPIError: If the request fails, or the daemon answers an error or an unknown format.
+        """
+        try:
+            async with self._session.request(
+                    method,
+                    f"{self._base_url}{path}",
+                    json=payload,
+                    headers={**self._headers, **(headers or {})},
+                    timeout=timeout or self._timeout,
+            ) as response:
+                if response.status == 304:
+                    return None
+                if response.status >= 400:
+                    raise NordigenAPIError(
+                        message=f"Sync daemon error on {path}: {await response.text()}",
+                        status_code=response.status,
+                    )
+                snapshot = await response.json(content_type=None)
+
+        except (ClientError, asyncio.TimeoutError, ValueError) as err:
+            raise NordigenAPIError(message=f"Unexpected error calling the sync daemon: {err!r}") from err
+
+        if not isinstance(snapshot, dict) or snapshot.get("format") != SYNC_SNAPSHOT_FORMAT:
+            raise NordigenAPIError(message="The sync daemon serves an unsupported snapshot format")
+        self.version = snapshot.get("version")
+        return snapshot
@@ -0,0 +1,483 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from datetime import datetime, tzinfo
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+from aiohttp import ClientSession, web
+
+from .const import (
+    API_BASE_URL,
+    DEFAULT_MAX_CONCURRENCY,
+    MIN_UPDATE_INTERVAL_MINUTES,
+    SYNC_DAEMON_HOST,
+    SYNC_DAEMON_PORT,
+    SYNC_DAEMON_STATE_FILE,
+    SYNC_REFRESH_PATH,
+    SYNC_SNAPSHOT_FORMAT,
+    SYNC_SNAPSHOT_PATH,
+    UPDATE_INTERVAL_HOURS,
+)
+from .nordigen_wrapper import NordigenAPIError, NordigenWrapper
+from .posting_schedule import PostingSchedule, next_fetch_time
+from .quota import QuotaLedger
+
+_LOGGER = logging.getLogger(__name__)
+
+# Environment variables holding the credentials, so they do not show up in the process list
+ENV_SECRET_ID = "NORDIGEN_SECRET_ID"
+ENV_SECRET_KEY = "NORDIGEN_SECRET_KEY"
+ENV_REFRESH_TOKEN = "NORDIGEN_REFRESH_TOKEN"
+ENV_SYNC_TOKEN = "NORDIGEN_SYNC_TOKEN"
+
+
+class SyncDaemon:
+    """
+    Refresh the linked accounts on a single schedule and serve their snapshot to any number of
+    Home Assistant instances.
+
+    The daemon owns the authentication, the quota ledger, the cached account details and the
+    learned posting schedule, so several instances reading the same bank links cost one set of
+    API calls. Every snapshot whose content changed gets a new version, which is sent as its
+    ETag: consumers poll with the version they have and get an empty 304 response until the
+    next refresh changed something. The state is saved to a JSON file after every refresh, so
+    a restart neither authenticates again nor forgets the quota already spent.
+    """
+
+    def __init__(
+            self,
+            session: ClientSession,
+            secret_id: str,
+            secret_key: str,
+            requisition_ids: List[str],
+            state_path: str,
+            state: Optional[Dict[str, Any]] = None,
+            refresh_token: Optional[str] = None,
+            max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+            base_url: str = API_BASE_URL,
+            tz: Optional[tzinfo] = None,
+    ) -> None:
+        """
+        Initialize the daemon and restore the state saved by a previous run.
+
+        Args:
+            session (ClientSession): The aiohttp session used for every API call.
+            secret_id (str): API secret ID for authentication.
+            secret_key (str): API secret key for authentication.
+            requisition_ids (List[str]): The requisition IDs whose accounts are refreshed.
+            state_path (str): The file the state is saved to.
+            state (Optional[Dict[str, Any]]): The state saved by a previous run, as returned by read_state.
+            refresh_token (Optional[str]): A refresh token, used when the saved state holds none.
+            max_concurrency (int): Maximum number of API calls made at the same time during a refresh.
+            base_url (str): Base URL of the Nordigen API.
+            tz (Optional[tzinfo]): The time zone posting hours are learned in; the system time
+                zone when omitted.
+        """
+        state = state or {}
+        tokens = state.get("tokens", {})
+        self.quota: QuotaLedger = QuotaLedger()
+        self.posting: PostingSchedule = PostingSchedule(tz=tz or datetime.now().astimezone().tzinfo)
+        self.wrapper: NordigenWrapper = NordigenWrapper(
+            session,
+            secret_id,
+            secret_key,
+            requisition_ids,
+            tokens.get("refresh_token") or refresh_token,
+            max_concurrency,
+            quota=self.quota,
+            access_token=tokens.get("access_token"),
+            access_expires_at=tokens.get("access_expires_at"),
+            refresh_expires_at=tokens.get("refresh_expires_at"),
+            base_url=base_url,
+        )
+        self.version: int = 0
+        self.failed_accounts: List[str] = []
+        self._state_path: str = state_path
+        self._content: Optional[str] = None
+        self._body: Optional[bytes] = None
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+        self.quota.load(state.get("quota", {}))
+        self.posting.load(state.get("posting", {}))
+        self.wrapper.load_metadata_cache(state.get("metadata", {}))
+        snapshot = state.get("snapshot")
+        if snapshot and snapshot.get("requisition_ids") == self.wrapper.requisition_ids:
+            self.wrapper.restore_accounts(snapshot)
+            self.failed_accounts = list(snapshot.get("failed_accounts", []))
+            self.version = state.get("version", 0)
+            self._publish(bump=False)
+
+    @property
+    def snapshot(self) -> Optional[bytes]:
+        """
+        Get the encoded snapshot served to consumers, or None before the first refresh.
+        """
+        return self._body
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Get the state of the daemon, suitable for persisting.
+
+        Returns:
+            Dict[str, Any]: The tokens, quota ledger, account details, posting schedule and the
+                last snapshot with its version.
+        """
+        return {
+            "tokens": self.wrapper.token_state,
+            "quota": self.quota.as_dict(),
+            "metadata": self.wrapper.metadata_cache,
+            "posting": self.posting.as_dict(),
+            "snapshot": {**self.wrapper.accounts_snapshot(), "failed_accounts": self.failed_accounts},
+            "version": self.version,
+        }
+
+    async def async_save_state(self) -> None:
+        """
+        Write the state to the state file, readable by the owner only.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, write_state, self._state_path, self.state())
+
+    async def async_refresh(self, account_ids: Optional[Iterable[str]] = None) -> None:
+        """
+        Refresh some or all accounts and publish a new snapshot if anything changed.
+
+        Overlapping calls share one fetch: accounts fetched while a call waited for the previous
+        one are not fetched again, so several consumers asking for the same account at once
+        cost one call. Accounts without remaining quota keep their balances. The state is saved
+        whether the refresh succeeded or not, so the quota spent is never lost.
+
+        Args:
+            account_ids (Optional[Iterable[str]]): The accounts to refresh; all linked accounts
+                when omitted.
+
+        Raises:
+            NordigenAPIError: If authentication fails, or if none of the accounts could be refreshed.
+        """
+        requested_at = time.time()
+        async with self._lock:
+            if self.wrapper.accounts:
+                wanted = set(account_ids) if account_ids is not None else None
+                account_ids = [
+                    acc.account_id for acc in self.wrapper.accounts
+                    if (wanted is None or acc.account_id in wanted)
+                    and self.wrapper.last_success.get(acc.account_id, 0) < requested_at
+                ]
+                if not account_ids:
+                    return
+
+            before = {acc.account_id: acc for acc in self.wrapper.accounts}
+            try:
+                results = await self.wrapper.async_update_accounts(account_ids)
+            except NordigenAPIError as e:
+                if e.status_code != 401:
+                    await self.async_save_state()
+                    raise
+                _LOGGER.warning("Nordigen access token expired, refreshing it")
+                try:
+                    await self.wrapper.async_refresh_access_token()
+                    results = await self.wrapper.async_update_accounts(account_ids)
+                except NordigenAPIError:
+                    await self.async_save_state()
+                    raise
+
+            failed = set(self.failed_accounts)
+            for account_id, result in results.items():
+                if result.ok:
+                    failed.discard(account_id)
+                    self.posting.observe_account(
+                        before.get(account_id), result.account, self.wrapper.last_success.get(account_id)
+                    )
+                else:
+                    failed.add(account_id)
+            self.failed_accounts = sorted(failed & {acc.account_id for acc in self.wrapper.accounts})
+            self.posting.retain(acc.account_id for acc in self.wrapper.accounts)
+            self._publish()
+            await self.async_save_state()
+
+    def next_refresh_time(self, now: float) -> Optional[float]:
+        """
+        Get the time at which the first account is due for its next balances call.
+
+        Args:
+            now (float): The current time.
+
+        Returns:
+            Optional[float]: The timestamp, or None if every requisition has expired.
+        """
+        if not self.wrapper.accounts and not self.wrapper.suspended:
+            return now
+
+        next_calls = [
+            self._next_fetch_time(acc.account_id, now)
+            for acc in self.wrapper.accounts
+            if not self.wrapper.is_suspended(acc.account_id)
+        ]
+        return min(next_calls) if next_calls else None
+
+    def due_accounts(self, now: float) -> Optional[List[str]]:
+        """
+        Get the accounts due within the shortest refresh interval.
+
+        Args:
+            now (float): The current time.
+
+        Returns:
+            Optional[List[str]]: The account IDs, or None for every account before the first refresh.
+        """
+        if not self.wrapper.accounts:
+            return None
+        return [
+            acc.account_id for acc in self.wrapper.accounts
+            if not self.wrapper.is_suspended(acc.account_id)
+            and self._next_fetch_time(acc.account_id, now) <= now + MIN_UPDATE_INTERVAL_MINUTES * 60
+        ]
+
+    def _next_fetch_time(self, account_id: str, now: float) -> float:
+        """
+        Get the time at which an account is due, after the cool-off of an open circuit.
+        """
+        return max(
+            next_fetch_time(self.posting, self.quota, account_id, now),
+            self.wrapper.breaker.open_until(account_id) or now,
+        )
+
+    async def async_run(self) -> None:
+        """
+        Refresh the accounts whenever one of them is due, until cancelled.
+
+        Failed refreshes are logged and retried at the shortest refresh interval. Once every
+        requisition has expired no more calls are made; the daemon keeps serving the last
+        snapshot until it is restarted with new requisitions.
+        """
+        while True:
+            now = time.time()
+            next_refresh = self.next_refresh_time(now)
+            if next_refresh is None:
+                _LOGGER.error("All Nordigen requisitions have expired, restart the daemon with new requisitions")
+                await asyncio.sleep(UPDATE_INTERVAL_HOURS * 3600)
+                continue
+
+            if next_refresh <= now + MIN_UPDATE_INTERVAL_MINUTES * 60:
+                try:
+                    await self.async_refresh(self.due_accounts(now))
+                except NordigenAPIError as e:
+                    _LOGGER.warning("Failed to refresh Nordigen accounts: %s", e)
+                    await asyncio.sleep(MIN_UPDATE_INTERVAL_MINUTES * 60)
+                    continue
+                next_refresh = self.next_refresh_time(time.time()) or now
+
+            delay = max(MIN_UPDATE_INTERVAL_MINUTES * 60, next_refresh - time.time())
+            _LOGGER.debug("Next Nordigen refresh in %.0f seconds", delay)
+            await asyncio.sleep(delay)
+
+    def build_app(self, token: Optional[str] = None) -> web.Application:
+        """
+        Build the HTTP application serving the snapshot.
+
+        GET on the snapshot path returns the last snapshot, or 304 when the If-None-Match header
+        holds its current version. POST on the refresh path refreshes the accounts listed in the
+        "account_ids" of its JSON body, or all of them, and returns the new snapshot.
+
+        Args:
+            token (Optional[str]): A bearer token every request must send; no authentication
+                when omitted.
+
+        Returns:
+            web.Application: The application.
+        """
+
+        @web.middleware
+        async def _authenticate(request: web.Request, handler: Any) -> web.StreamResponse:
+            if token and request.headers.get("Authorization") != f"Bearer {token}":
+                raise web.HTTPUnauthorized()
+            return await handler(request)
+
+        app = web.Application(middlewares=[_authenticate])
+        app.router.add_get(SYNC_SNAPSHOT_PATH, self._handle_snapshot)
+        app.router.add_post(SYNC_REFRESH_PATH, self._handle_refresh)
+        return app
+
+    async def _handle_snapshot(self, request: web.Request) -> web.Response:
+        """
+        Serve the last snapshot, unless the consumer already has its version.
+        """
+        if self._body is None:
+            raise web.HTTPServiceUnavailable(text="No snapshot yet")
+
+        etag = f'"{self.version}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=self._body, content_type="application/json", headers={"ETag": etag})
+
+    async def _handle_refresh(self, request: web.Request) -> web.Response:
+        """
+        Refresh the requested accounts now and serve the resulting snapshot.
+        """
+        try:
+            body = await request.json() if request.can_read_body else {}
+        except ValueError:
+            raise web.HTTPBadRequest(text="The request body must be JSON")
+        account_ids = body.get("account_ids") if isinstance(body, dict) else None
+        if account_ids is not None and (
+                not isinstance(account_ids, list) or not all(isinstance(item, str) for item in account_ids)
+        ):
+            raise web.HTTPBadRequest(text="account_ids must be a list of account IDs")
+
+        try:
+            await self.async_refresh(account_ids)
+        except NordigenAPIError as e:
+            raise web.HTTPBadGateway(text=f"Failed to refresh Nordigen accounts: {e}")
+        return await self._handle_snapshot(request)
+
+    def _publish(self, bump: bool = True) -> None:
+        """
+        Encode the current accounts as the served snapshot, with a new version if they changed.
+
+        Args:
+            bump (bool): Whether a change increments the version; False when restoring the
+                snapshot a previous run already published.
+        """
+        snapshot = {**self.wrapper.accounts_snapshot(), "failed_accounts": self.failed_accounts}
+        content = json.dumps(snapshot, sort_keys=True)
+        if content == self._content:
+            return
+
+        if bump:
+            self.version += 1
+        self._content = content
+        self._body = json.dumps(
+            {**snapshot, "format": SYNC_SNAPSHOT_FORMAT, "version": self.version, "saved_at": time.time()}
+        ).encode()
+        _LOGGER.debug("Published snapshot version %d of %d accounts", self.version, len(self.wrapper.accounts))
+
+
+def read_state(path: str) -> Dict[str, Any]:
+    """
+    Read the state saved by a previous run of the daemon.
+
+    Args:
+        path (str): The state file.
+
+    Returns:
+        Dict[str, Any]: The state, empty if the file does not exist or is not valid JSON.
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        _LOGGER.warning("Ignoring the unreadable Nordigen sync state in %s", path)
+        return {}
+
+
+def write_state(path: str, state: Dict[str, Any]) -> None:
+    """
+    Replace the state file in one step, so a crash never leaves half a file behind.
+
+    The file holds the API tokens, so only its owner may read it.
+
+    Args:
+        path (str): The state file.
+        state (Dict[str, Any]): The state, as returned by SyncDaemon.state.
+    """
+    temporary = f"{path}.tmp"
+    with open(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w", encoding="utf-8") as file:
+        json.dump(state, file)
+    os.replace(temporary, path)
+
+
+async def _async_serve(args: argparse.Namespace, secret_id: str, secret_key: str) -> None:
+    """
+    Serve the snapshot and refresh the accounts until the process is asked to stop.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+
+    state = await loop.run_in_executor(None, read_state, args.state_file)
+    async with ClientSession() as session:
+        daemon = SyncDaemon(
+            session,
+            secret_id,
+            secret_key,
+            args.requisition_ids,
+            args.state_file,
+            state,
+            refresh_token=os.environ.get(ENV_REFRESH_TOKEN),
+            max_concurrency=args.max_concurrency,
+            base_url=args.base_url,
+            tz=ZoneInfo(args.time_zone) if args.time_zone else None,
+        )
+        runner = web.AppRunner(daemon.build_app(os.environ.get(ENV_SYNC_TOKEN)))
+        await runner.setup()
+        if args.socket:
+            site: web.BaseSite = web.UnixSite(runner, args.socket)
+            await site.start()
+            os.chmod(args.socket, 0o660)
+        else:
+            site = web.TCPSite(runner, args.host, args.port)
+            await site.start()
+        _LOGGER.info("Serving Nordigen snapshots on %s", site.name)
+
+        refreshing = asyncio.create_task(daemon.async_run())
+        await stop.wait()
+        refreshing.cancel()
+        await asyncio.gather(refreshing, return_exceptions=True)
+        await runner.cleanup()
+        await daemon.async_save_state()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the sync daemon from the command line.
+
+    The API credentials are read from the NORDIGEN_SECRET_ID and NORDIGEN_SECRET_KEY
+    environment variables, and the optional bearer token consumers must send from
+    NORDIGEN_SYNC_TOKEN.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command line arguments; sys.argv when omitted.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m custom_components.nordigen_account.sync_daemon",
+        description="Refresh Nordigen accounts once and serve their balances to several Home Assistant instances.",
+    )
+    parser.add_argument(
+        "-r", "--requisition", dest="requisition_ids", action="append", required=True,
+        help="a requisition ID whose accounts are refreshed; repeat for several banks",
+    )
+    parser.add_argument("--host", default=SYNC_DAEMON_HOST, help="address to listen on")
+    parser.add_argument("--port", type=int, default=SYNC_DAEMON_PORT, help="port to listen on")
+    parser.add_argument("--socket", help="Unix socket to listen on instead of a TCP port")
+    parser.add_argument("--state-file", default=SYNC_DAEMON_STATE_FILE, help="file the state is kept in")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--time-zone", help="IANA time zone posting hours are learned in")
+    parser.add_argument("--base-url", default=API_BASE_URL, help=argparse.SUPPRESS)
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every refresh")
+    args = parser.parse_args(argv)
+
+    secret_id = os.environ.get(ENV_SECRET_ID)
+    secret_key = os.environ.get(ENV_SECRET_KEY)
+    if not secret_id or not secret_key:
+        parser.error(f"set the {ENV_SECRET_ID} and {ENV_SECRET_KEY} environment variables")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    asyncio.run(_async_serve(args, secret_id, secret_key))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,280 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .const import TRANSACTION_BATCH_SIZE
+
+STATUS_BOOKED = "booked"
+STATUS_PENDING = "pending"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    account_id TEXT NOT NULL,
+    transaction_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    booking_date TEXT,
+    value_date TEXT,
+    amount TEXT NOT NULL,
+    currency TEXT,
+    description TEXT,
+    raw TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (account_id, transaction_id)
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_booking_date
+    ON transactions (account_id, booking_date);
+CREATE TABLE IF NOT EXISTS sync_state (
+    account_id TEXT PRIMARY KEY,
+    last_sync REAL NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO transactions (
+    account_id, transaction_id, status, booking_date, value_date,
+    amount, currency, description, raw, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (account_id, transaction_id) DO UPDATE SET
+    status = excluded.status,
+    booking_date = excluded.booking_date,
+    value_date = excluded.value_date,
+    amount = excluded.amount,
+    currency = excluded.currency,
+    description = excluded.description,
+    raw = excluded.raw,
+    updated_at = excluded.updated_at
+WHERE transactions.raw != excluded.raw
+"""
+
+
+class TransactionStore:
+    """
+    Local SQLite store for the transactions of the linked accounts.
+
+    All methods block on disk I/O and must run in an executor. Writes are serialized, so several
+    accounts can be synced at the same time.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            path (str): Path of the SQLite database file; it is created on first use.
+        """
+        self._path: str = path
+        self._lock: threading.Lock = threading.Lock()
+        self._schema_ready: bool = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the database, creating the schema on first use.
+
+        Returns:
+            sqlite3.Connection: The open connection.
+        """
+        connection = sqlite3.connect(self._path)
+        if not self._schema_ready:
+            connection.executescript(_SCHEMA)
+            self._schema_ready = True
+        return connection
+
+    def get_high_water_mark(self, account_id: str) -> Optional[str]:
+        """
+        Get the latest booking date stored for an account.
+
+        Args:
+            account_id (str): The account ID.
+
+        Returns:
+            Optional[str]: The latest booking date as an ISO date, the date of the last sync if no
+                booked transaction is stored yet, or None if the account has never been synced.
+        """
+        with self._lock:
+            connection = self._connect()
+            try:
+                synced = connection.execute(
+                    "SELECT last_sync FROM sync_state WHERE account_id = ?", (account_id,)
+                ).fetchone()
+                if synced is None:
+                    return None
+
+                row = connection.execute(
+                    "SELECT MAX(booking_date) FROM transactions WHERE account_id = ? AND status = ?",
+                    (account_id, STATUS_BOOKED),
+                ).fetchone()
+                if row and row[0]:
+                    return row[0]
+                return datetime.fromtimestamp(synced[0], timezone.utc).date().isoformat()
+            finally:
+                connection.close()
+
+    def get_booked_transactions(self, account_id: str, date_from: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the stored booked transactions of an account, oldest first.
+
+        Args:
+            account_id (str): The account ID.
+            date_from (Optional[str]): ISO date of the oldest booking date to return; all booked
+                transactions are returned when omitted.
+
+        Returns:
+            List[Dict[str, Any]]: The transactions in Berlin Group PSD2 format.
+        """
+        query = "SELECT raw FROM transactions WHERE account_id = ? AND status = ?"
+        params: Tuple[Any, ...] = (account_id, STATUS_BOOKED)
+        if date_from is not None:
+            query += " AND booking_date >= ?"
+            params += (date_from,)
+        query += " ORDER BY booking_date"
+
+        with self._lock:
+            connection = self._connect()
+            try:
+                return [json.loads(row[0]) for row in connection.execute(query, params)]
+            finally:
+                connection.close()
+
+    def upsert(
+            self, account_id: str, transactions: Dict[str, List[Dict[str, Any]]], date_from: Optional[str]
+    ) -> int:
+        """
+        Store the transactions returned by one sync of an account.
+
+        Pending transactions inside the synced window are replaced, so transactions that moved
+        from pending to booked are not kept twice. Rows are written in batches, and rows whose
+        content did not change are left untouched.
+
+        Args:
+            account_id (str): The account ID.
+            transactions (Dict[str, List[Dict[str, Any]]]): The "booked" and "pending" transactions
+                from the API response.
+            date_from (Optional[str]): Start of the synced window, or None for a full sync.
+
+        Returns:
+            int: The number of inserted or changed rows.
+        """
+        now = time.time()
+        rows = [
+            _to_row(account_id, status, transaction, now)
+            for status in (STATUS_BOOKED, STATUS_PENDING)
+            for transaction in transactions.get(status, [])
+        ]
+
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    if date_from is None:
+                        connection.execute(
+                            "DELETE FROM transactions WHERE account_id = ? AND status = ?",
+                            (account_id, STATUS_PENDING),
+                        )
+                    else:
+                        connection.execute(
+                            "DELETE FROM transactions WHERE account_id = ? AND status = ? "
+                            "AND (booking_date IS NULL OR booking_date >= ?)",
+                            (account_id, STATUS_PENDING, date_from),
+                        )
+
+                    changed = 0
+                    for batch in _batches(rows, TRANSACTION_BATCH_SIZE):
+                        before = connection.total_changes
+                        connection.executemany(_UPSERT, batch)
+                        changed += connection.total_changes - before
+
+                    connection.execute(
+                        "INSERT INTO sync_state (account_id, last_sync) VALUES (?, ?) "
+                        "ON CONFLICT (account_id) DO UPDATE SET last_sync = excluded.last_sync",
+                        (account_id, now),
+                    )
+                return changed
+            finally:
+                connection.close()
+
+
+def _to_row(account_id: str, status: str, transaction: Dict[str, Any], now: float) -> Tuple[Any, ...]:
+    """
+    Convert an API transaction into a database row.
+
+    Args:
+        account_id (str): The account ID.
+        status (str): "booked" or "pending".
+        transaction (Dict[str, Any]): The transaction in Berlin Group PSD2 format.
+        now (float): Timestamp of the sync.
+
+    Returns:
+        Tuple[Any, ...]: The row values in the order of the upsert statement.
+    """
+    raw = _serialize(transaction)
+    transaction_id = transaction_key(status, transaction, raw)
+    amount = transaction.get("transactionAmount", {})
+    description = transaction.get("remittanceInformationUnstructured") or " ".join(
+        transaction.get("remittanceInformationUnstructuredArray", [])
+    )
+
+    return (
+        account_id,
+        transaction_id,
+        status,
+        transaction.get("bookingDate"),
+        transaction.get("valueDate"),
+        str(amount.get("amount", "0")),
+        amount.get("currency"),
+        description or None,
+        raw,
+        now,
+    )
+
+
+def transaction_key(status: str, transaction: Dict[str, Any], raw: Optional[str] = None) -> str:
+    """
+    Get the ID a transaction is stored under.
+
+    Transactions without an ID from the bank are identified by a hash of their content.
+
+    Args:
+        status (str): "booked" or "pending".
+        transaction (Dict[str, Any]): The transaction in Berlin Group PSD2 format.
+        raw (Optional[str]): The serialized transaction, if already available.
+
+    Returns:
+        str: The transaction ID.
+    """
+    return (
+        transaction.get("transactionId")
+        or transaction.get("internalTransactionId")
+        or f"{status}-{hashlib.sha1((raw or _serialize(transaction)).encode()).hexdigest()}"
+    )
+
+
+def _serialize(transaction: Dict[str, Any]) -> str:
+    """
+    Serialize a transaction in a stable form, so unchanged transactions compare equal.
+
+    Args:
+        transaction (Dict[str, Any]): The transaction in Berlin Group PSD2 format.
+
+    Returns:
+        str: The compact JSON of the transaction with sorted keys.
+    """
+    return json.dumps(transaction, sort_keys=True, separators=(",", ":"))
+
+
+def _batches(rows: List[Tuple[Any, ...]], size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    """
+    Split rows into batches.
+
+    Args:
+        rows (List[Tuple[Any, ...]]): The rows to split.
+        size (int): The maximum batch size.
+
+    Yields:
+        List[Tuple[Any, ...]]: The next batch of rows.
+    """
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]